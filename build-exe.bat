@@ -310,6 +310,13 @@ if %ERRORLEVEL% NEQ 0 (
 echo   [OK] Frontend compiled successfully!
 cd /d %~dp0
 
+REM Write .br/.gz copies of the build, served instead of compressing per request
+echo Precompressing frontend assets...
+call node server\utils\precompress.js client\build
+if %ERRORLEVEL% NEQ 0 (
+    echo   [WARNING] Precompression failed, the server will compress the files at startup.
+)
+
 REM Copy client/build folder to dist
 echo.
 echo ========================================
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import LogForm from './components/LogForm';
 import LogList from './components/LogList';
 import Filters from './components/Filters';
@@ -8,12 +8,20 @@ import UserLoginForm from './components/UserLoginForm';
 import DeleteConfirmationModal from './components/DeleteConfirmationModal';
 import ArchiveConfirmationModal from './components/ArchiveConfirmationModal';
 import Footer from './components/Footer';
-import { fetchLogs, createLog, updateLog, archiveLog, deleteLog } from './services/api';
+import { fetchLogs, createLog, updateLog, archiveLog, deleteLog, subscribeToLogEvents } from './services/api';
 import { formatDateCompact } from './utils/dateFormat';
 import { parseMarkdown } from './utils/markdownParser';
 import { fetchPublicConfig } from './services/configApi';
 import { userLogin, verifyUserToken } from './services/authApi';
 
+const LOGS_PER_PAGE = 20;
+
+// Newest first, same order as the server (log_date, then id)
+const compareLogs = (a, b) => {
+  if (a.log_date !== b.log_date) return a.log_date < b.log_date ? 1 : -1;
+  return b.id - a.id;
+};
+
 function App() {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [loginError, setLoginError] = useState('');
@@ -31,11 +39,14 @@ function App() {
     archived: false
   });
   const [pagination, setPagination] = useState({
-    current_page: 1,
     total_pages: 1,
-    total_entries: 0
+    total_entries: 0,
+    next_cursor: null
   });
-  const [currentPage, setCurrentPage] = useState(1);
+  // Cursor of every page visited so far ('' is the first page), so Previous
+  // can go back without the server counting offsets
+  const [pageCursors, setPageCursors] = useState(['']);
+  const currentPage = pageCursors.length;
   const [flashId, setFlashId] = useState(null);
   const [pageName, setPageName] = useState('Shift Handover Log');
   // headerColor is used to update CSS variable, but not directly in JSX
@@ -79,17 +90,38 @@ function App() {
   useEffect(() => {
     if (isAuthenticated) {
       loadLogs();
-      // Poll every 2 minutes to check for expired reminders
-      const reminderPollingInterval = setInterval(() => {
-        loadLogs();
-      }, 2 * 60 * 1000);
-
-      return () => {
-        clearInterval(reminderPollingInterval);
-      };
     }
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [filters, currentPage, isAuthenticated]);
+  }, [filters, pageCursors, isAuthenticated]);
+
+  // Live updates: changes from other desks (and reminders coming back) arrive
+  // as events and are applied to the visible page without refetching it
+  const viewRef = useRef({});
+  const logsRef = useRef([]);
+  const reloadTimerRef = useRef(null);
+  const feedConnectedRef = useRef(false);
+
+  useEffect(() => {
+    if (!isAuthenticated) return undefined;
+
+    const unsubscribe = subscribeToLogEvents({
+      onEvent: (event) => viewRef.current.applyLogEvent(event),
+      // Missed too many events while disconnected
+      onReset: () => viewRef.current.loadLogs(true),
+      onOpen: () => {
+        feedConnectedRef.current = true;
+      },
+      onError: () => {
+        feedConnectedRef.current = false;
+      }
+    });
+
+    return () => {
+      feedConnectedRef.current = false;
+      clearTimeout(reloadTimerRef.current);
+      unsubscribe();
+    };
+  }, [isAuthenticated]);
 
   const checkLoginStatus = async () => {
     setCheckingAuth(true);
@@ -144,14 +176,16 @@ function App() {
     }
     setError(null);
     try {
+      // The total only needs counting on the first page
       const response = await fetchLogs({
         ...filters,
-        page: currentPage,
-        limit: 20
+        cursor: pageCursors[pageCursors.length - 1],
+        with_total: currentPage === 1,
+        limit: LOGS_PER_PAGE
       });
       
       setLogs(response.data);
-      setPagination(response.pagination);
+      setPagination((prev) => ({ ...prev, ...response.pagination }));
     } catch (err) {
       setError(err.message || 'Failed to load logs');
     } finally {
@@ -161,11 +195,69 @@ function App() {
     }
   };
 
+  // Does the entry belong in the current view (active or archive)?
+  const belongsInView = (log) => {
+    if (!log || log.is_deleted) return false;
+    const hasFutureReminder = log.reminder_date && new Date(log.reminder_date) > new Date();
+    return filters.archived
+      ? Boolean(log.is_archived || hasFutureReminder)
+      : !log.is_archived && !hasFutureReminder;
+  };
+
+  // One quiet reload for a burst of events (e.g. several reminders at once)
+  const scheduleReload = () => {
+    clearTimeout(reloadTimerRef.current);
+    reloadTimerRef.current = setTimeout(() => viewRef.current.loadLogs(true), 300);
+  };
+
+  const applyLogEvent = (event) => {
+    // Search, worker and date filters are matched by the server
+    if (filters.search || filters.worker_name || filters.start_date || filters.end_date) {
+      scheduleReload();
+      return;
+    }
+
+    // Several events can arrive before the next render
+    const current = logsRef.current;
+    const shown = current.some((log) => log.id === event.id);
+    const others = current.filter((log) => log.id !== event.id);
+
+    if (!belongsInView(event.log)) {
+      if (shown) {
+        logsRef.current = others;
+        setLogs(others);
+      }
+      return;
+    }
+
+    // New entries only appear on the first page; later pages keep their cursor
+    if (!shown && currentPage > 1) return;
+
+    const updated = [...others, event.log].sort(compareLogs);
+    if (updated.length > LOGS_PER_PAGE) {
+      // The page overflows, so the next page cursor has moved
+      scheduleReload();
+      return;
+    }
+    logsRef.current = updated;
+    setLogs(updated);
+  };
+
+  logsRef.current = logs;
+  viewRef.current = { applyLogEvent, loadLogs };
+
+  // After our own changes the event feed updates the list; without it, reload
+  const refreshAfterChange = () => {
+    if (!feedConnectedRef.current) {
+      loadLogs();
+    }
+  };
+
   const handleCreateLog = async (logData) => {
     try {
       await createLog(logData);
       setShowForm(false);
-      loadLogs();
+      refreshAfterChange();
     } catch (err) {
       throw err;
     }
@@ -176,7 +268,7 @@ function App() {
       await updateLog(id, logData);
       setShowForm(false);
       setEditingLog(null);
-      loadLogs();
+      refreshAfterChange();
       // Trigger flash animation on updated item for 3 seconds
       setFlashId(id);
     } catch (err) {
@@ -195,7 +287,7 @@ function App() {
   const handleArchiveLog = async (id, isArchived) => {
     try {
       await archiveLog(id, isArchived);
-      loadLogs();
+      refreshAfterChange();
     } catch (err) {
       setError(err.message || 'Failed to archive log');
     }
@@ -217,7 +309,7 @@ function App() {
     if (archiveModal.logId) {
       try {
         await archiveLog(archiveModal.logId, true);
-        loadLogs();
+        refreshAfterChange();
         setArchiveModal({ isOpen: false, logId: null, logInfo: null });
         setArchiveSuccessMessage(true);
         setBlinkArchivedCheckbox(true);
@@ -252,7 +344,7 @@ function App() {
     if (deleteModal.logId) {
       try {
         await deleteLog(deleteModal.logId);
-        loadLogs();
+        refreshAfterChange();
         setDeleteModal({ isOpen: false, logId: null, logInfo: null });
       } catch (err) {
         setError(err.message || 'Failed to delete log');
@@ -277,11 +369,17 @@ function App() {
 
   const handleFilterChange = (newFilters) => {
     setFilters(newFilters);
-    setCurrentPage(1);
+    setPageCursors(['']);
+  };
+
+  const handleNextPage = () => {
+    if (!pagination.next_cursor) return;
+    setPageCursors((cursors) => [...cursors, pagination.next_cursor]);
+    window.scrollTo({ top: 0, behavior: 'smooth' });
   };
 
-  const handlePageChange = (page) => {
-    setCurrentPage(page);
+  const handlePreviousPage = () => {
+    setPageCursors((cursors) => (cursors.length > 1 ? cursors.slice(0, -1) : cursors));
     window.scrollTo({ top: 0, behavior: 'smooth' });
   };
 
@@ -493,21 +591,21 @@ function App() {
           logInfo={archiveModal.logInfo}
         />
 
-        {pagination.total_pages > 1 && (
+        {(currentPage > 1 || pagination.next_cursor) && (
           <div className="mt-6 flex justify-center items-center gap-2">
             <button
-              onClick={() => handlePageChange(currentPage - 1)}
+              onClick={handlePreviousPage}
               disabled={currentPage === 1}
               className="btn btn-secondary disabled:opacity-50 disabled:cursor-not-allowed"
             >
               Previous
             </button>
             <span style={{ padding: '0.5rem 1rem', color: 'var(--text-secondary)' }}>
-              Page {pagination.current_page} of {pagination.total_pages}
+              Page {currentPage} of {Math.max(pagination.total_pages, currentPage)}
             </span>
             <button
-              onClick={() => handlePageChange(currentPage + 1)}
-              disabled={currentPage >= pagination.total_pages}
+              onClick={handleNextPage}
+              disabled={!pagination.next_cursor}
               className="btn btn-secondary disabled:opacity-50 disabled:cursor-not-allowed"
             >
               Next
@@ -109,6 +109,17 @@ export const clearReminder = async (id) => {
   }
 };
 
+// Live log changes (server-sent events)
+// EventSource reconnects by itself and resumes from the last event id it saw
+export const subscribeToLogEvents = ({ onEvent, onReset, onOpen, onError }) => {
+  const source = new EventSource(`${API_BASE_URL}/logs/events`);
+  source.addEventListener('log', (e) => onEvent(JSON.parse(e.data)));
+  source.addEventListener('reset', () => onReset());
+  source.addEventListener('open', () => onOpen && onOpen());
+  source.addEventListener('error', () => onError && onError());
+  return () => source.close();
+};
+
 // Note: searchLogs is available but not currently used - kept for future use
 // The search functionality is handled via fetchLogs with search parameter
 // export const searchLogs = async (query, params = {}) => {
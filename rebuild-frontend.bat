@@ -77,6 +77,9 @@ if %ERRORLEVEL% EQU 0 (
     echo Frontend compiled successfully!
     echo ========================================
     echo.
+    echo Precompressing frontend assets...
+    call node ..\server\utils\precompress.js build
+    echo.
     echo The API now uses relative URLs (/api) and will work on any port.
     echo.
     echo Next steps:
@@ -8,17 +8,31 @@ Simple terminal-only version without GUI
 import os
 import sys
 import json
+import argparse
+import random
 import secrets
-import subprocess
+import shutil
+import tempfile
 import signal
 import socket
 import time
 from pathlib import Path
 
+from server_supervisor import ServerSupervisor, READY_TIMEOUT, probe_health, format_startup, record_startup
+from server_proxy import Backend, LoadBalancingProxy
+from server_bench import DEFAULT_MIX, parse_mix, seed_logs, run_load
+import server_transfer
+from server_backup import BackupScheduler, backup_settings, describe_backup, run_backup, compress_backup, rotate_backups
+from server_metrics import (MetricsPoller, scrape_metrics, headline, format_headline,
+                            save_launcher_token, load_launcher_token)
+from server_monitor import ResourceMonitor, monitor_settings, monitoring_available, format_summary
+from server_logsink import LogSink
+
 # Configuration
 CONFIG_FILE = "server_config.json"
 DEFAULT_CONFIG_FILE = "server_default_config.json"
 DEFAULT_PORT = 8500
+METRICS_PRINT_INTERVAL = 300  # Seconds between headline metrics lines in the terminal
 
 # Detect if running from dist folder (executable)
 # When running as PyInstaller exe: use executable's directory (cwd can be wrong)
@@ -57,6 +71,21 @@ else:
 
 NODEJS_EXE = NODEJS_DIR / "node.exe"
 
+def parse_args(argv):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="Command-line server launcher for Shift Handover Log",
+                                     epilog="Other commands: server-cli.py bench | export | import | backup | status --help")
+    parser.add_argument('port', nargs='?', help="Port to listen on (prompts if omitted)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of Node.js worker processes behind a front proxy (default: 1)")
+    return parser.parse_args(argv)
+
+def find_free_port():
+    """Ask the OS for a free local port (used for internal worker ports)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
 def check_port_available(port):
     """Check if port is available"""
     try:
@@ -95,6 +124,21 @@ def load_config():
         jwt_secret = secrets.token_hex(32)
     return port, jwt_secret
 
+def load_saved_config():
+    """The whole saved configuration as a dict (empty if there is none)"""
+    config_path = BASE_DIR / CONFIG_FILE
+    if config_path.exists():
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {}
+
+def load_backup_settings():
+    """Backup settings from the saved configuration, with defaults"""
+    return backup_settings(load_saved_config())
+
 def save_config(port, jwt_secret=None):
     """Save configuration"""
     try:
@@ -139,6 +183,15 @@ def check_directories():
 
 def main():
     """Main function"""
+    if sys.argv[1:2] and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+    
+    args = parse_args(sys.argv[1:])
+    if args.workers < 1:
+        print("ERROR: --workers must be 1 or more.")
+        sys.exit(1)
+    
     print("=" * 50)
     print("Shift Handover Log - Command Line Server")
     print("=" * 50)
@@ -160,17 +213,17 @@ def main():
     print()
     
     # Get port
-    default_port = load_config()
+    default_port, jwt_secret = load_config()
     port = default_port
     
-    if len(sys.argv) > 1:
+    if args.port is not None:
         # Port provided as command-line argument
         try:
-            port = int(sys.argv[1])
+            port = int(args.port)
             if port < 1 or port > 65535:
                 raise ValueError("Invalid port")
         except ValueError:
-            print(f"ERROR: Invalid port '{sys.argv[1]}'. Must be between 1 and 65535.")
+            print(f"ERROR: Invalid port '{args.port}'. Must be between 1 and 65535.")
             sys.exit(1)
     else:
         # Prompt user with 10-second timeout
@@ -230,6 +283,13 @@ def main():
     env['PORT'] = str(port)
     env['FRONTEND_URL'] = f'http://localhost:{port}'
     env['JWT_SECRET'] = jwt_secret
+    # Lets the launcher read /api/metrics and the resource monitor ask for a
+    # heap snapshot; saved for `server-cli.py status` (see server_metrics.py)
+    env['LAUNCHER_TOKEN'] = secrets.token_hex(16)
+    if not save_launcher_token(DATA_DIR, env['LAUNCHER_TOKEN']):
+        print("WARNING: Could not save data/launcher.token; 'server-cli.py status' will not work")
+    # Compiled code is cached on disk between starts (Node.js 22.1+, ignored before)
+    env['NODE_COMPILE_CACHE'] = str(DATA_DIR / "compile-cache")
     
     # Server path
     server_path = SERVER_DIR / "index.js"
@@ -244,56 +304,489 @@ def main():
     print()
     print(f"Server will be available at: http://localhost:{port}")
     print(f"API endpoint: http://localhost:{port}/api")
+    if args.workers > 1:
+        print(f"Workers: {args.workers} (least-connections front proxy)")
     print()
     print("Press Ctrl+C to stop the server")
     print("=" * 50)
     print()
     
-    # Start Node.js process
+    backups = start_backups()
+    services = [backups] if backups else []
+    if args.workers > 1:
+        run_workers(server_path, env, port, args.workers, services)
+    else:
+        run_single(server_path, env, port, services)
+
+def make_event_printer(name, port):
+    """Returns a supervisor event callback that prints to the terminal"""
+    def on_event(event, detail):
+        if event == 'ready':
+            print(f"✓ {name} ready in {detail:.2f}s at http://localhost:{port}")
+        elif event == 'startup':
+            print(f"  {name} startup: {format_startup(detail)}")
+            record_startup(DATA_DIR / "logs", name, detail)
+        elif event == 'crashed':
+            print(f"WARNING: {name} exited unexpectedly (code {detail})")
+        elif event == 'restarting':
+            print(f"Restarting {name.lower()} in {detail:.0f}s...")
+        elif event == 'failed':
+            print(f"ERROR: {detail}")
+    return on_event
+
+def start_backups():
+    """Starts the scheduled backups unless disabled, returns the scheduler or None"""
+    settings = load_backup_settings()
+    if not settings['backup_enabled']:
+        return None
+    
+    def on_event(event, detail):
+        if event == 'finished':
+            print(f"✓ Backup saved: {describe_backup(detail)}")
+        elif event == 'failed':
+            print(f"WARNING: Backup failed: {detail}")
+        elif event == 'busy':
+            print(f"WARNING: Backup skipped: {detail}")
+    
+    scheduler = BackupScheduler.from_settings(DATA_DIR, settings, on_event=on_event)
+    scheduler.start()
+    print(f"✓ Backups every {settings['backup_interval_hours']}h to {scheduler.backup_dir}")
+    return scheduler
+
+def start_metrics_printer(supervisors, token):
+    """Prints headline metrics of all workers every METRICS_PRINT_INTERVAL seconds"""
+    def on_update(numbers):
+        if numbers:
+            print(f"[Metrics] {format_headline(numbers)}")
+    
+    poller = MetricsPoller([supervisor.port for supervisor in supervisors], token, on_update,
+                           interval=METRICS_PRINT_INTERVAL)
+    poller.start()
+    return poller
+
+def start_resource_monitors(supervisors, names, token):
+    """Samples CPU and memory of every worker; prints a summary every METRICS_PRINT_INTERVAL seconds"""
+    if not monitoring_available():
+        print("Resource monitor unavailable (install psutil to enable it)")
+        return []
+    settings = monitor_settings(load_saved_config())
+    monitors = []
+    for supervisor, name in zip(supervisors, names):
+        def on_event(event, detail, name=name):
+            if event == 'summary':
+                print(f"[Resources] {name}: {format_summary(detail)}")
+            elif event == 'alarm':
+                print(f"WARNING: {name}: {detail}")
+        monitor = ResourceMonitor.from_settings(supervisor, settings, on_event, snapshot_token=token,
+                                                summary_interval=METRICS_PRINT_INTERVAL)
+        monitor.start()
+        monitors.append(monitor)
+    return monitors
+
+def start_log_sink():
+    """Persists server output to data/logs and prints it; a slow terminal skips lines instead of blocking Node.js"""
+    sink = LogSink(DATA_DIR / "logs").start()
+    sink.subscribe(lambda source, line: print(f"[{source}] {line}" if source else line))
+    return sink
+
+def wait_for_shutdown(supervisors, proxy=None, services=()):
+    """Installs Ctrl+C handling and blocks until all supervisors have stopped
+    
+    services: background helpers (backups, metrics, log sink) to stop after the server,
+    so its last lines are still written
+    """
+    def signal_handler(sig, frame):
+        print("\n\nStopping server...")
+        if proxy:
+            proxy.stop()
+        for supervisor in supervisors:
+            supervisor.stop()
+        for service in services:
+            service.stop()
+        print("Server stopped.")
+        sys.exit(0)
+    
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    
+    # Wait until the server stops for good (restarts happen in the background)
     try:
-        node_path = str(NODEJS_EXE)
-        server_script = str(server_path)
-        working_dir = str(BASE_DIR)
-        
-        process = subprocess.Popen(
-            [node_path, server_script],
-            cwd=working_dir,
+        while any(supervisor.is_alive() for supervisor in supervisors):
+            time.sleep(0.5)
+        if proxy:
+            proxy.stop()
+        for service in services:
+            service.stop()
+    except KeyboardInterrupt:
+        signal_handler(None, None)
+
+def run_single(server_path, env, port, services=()):
+    """Runs one Node.js process under the supervisor (readiness probe + crash restart)"""
+    sink = start_log_sink()
+    try:
+        supervisor = ServerSupervisor(
+            [str(NODEJS_EXE), str(server_path)],
+            cwd=str(BASE_DIR),
             env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            port=port,
+            on_output=lambda line: sink.write("Server", line),
+            on_event=make_event_printer("Server", port)
         )
+        supervisor.start()
+    except Exception as e:
+        sink.stop()
+        print(f"ERROR: Failed to start server: {e}")
+        sys.exit(1)
+    
+    services = list(services) + [sink, start_metrics_printer([supervisor], env.get('LAUNCHER_TOKEN'))]
+    services += start_resource_monitors([supervisor], ["Server"], env.get('LAUNCHER_TOKEN'))
+    wait_for_shutdown([supervisor], services=services)
+
+def start_workers(server_path, env, port, workers, on_output=None, on_event=None, log=print):
+    """Starts Node.js workers on internal ports and the front proxy on port
+    
+    on_output(name, line) / on_event(name, port) -> callback are optional.
+    Returns (supervisors, proxy); stops what was started and raises on failure.
+    """
+    supervisors = []
+    backends = []
+    try:
+        for worker_id in range(1, workers + 1):
+            internal_port = find_free_port()
+            worker_env = env.copy()
+            worker_env['PORT'] = str(internal_port)
+            worker_env['HOST'] = '127.0.0.1'
+            worker_env['WORKER_ID'] = str(worker_id)
+            name = f"Worker {worker_id}"
+            supervisor = ServerSupervisor(
+                [str(NODEJS_EXE), str(server_path)],
+                cwd=str(BASE_DIR),
+                env=worker_env,
+                port=internal_port,
+                on_output=(lambda line, name=name: on_output(name, line)) if on_output else None,
+                on_event=on_event(name, internal_port) if on_event else None
+            )
+            supervisor.start()
+            supervisors.append(supervisor)
+            backends.append(Backend(name, '127.0.0.1', internal_port))
+            
+            # Worker 1 initializes the database; start the others once it is ready
+            if worker_id == 1 and not supervisor.wait_ready(READY_TIMEOUT):
+                raise RuntimeError("Worker 1 did not become ready")
         
-        # Handle Ctrl+C
-        def signal_handler(sig, frame):
-            print("\n\nStopping server...")
-            process.terminate()
-            try:
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                process.wait()
-            print("Server stopped.")
-            sys.exit(0)
+        proxy = LoadBalancingProxy('0.0.0.0', port, backends, log=log)
+        proxy.start()
+    except Exception:
+        for supervisor in supervisors:
+            supervisor.stop()
+        raise
+    return supervisors, proxy
+
+def run_workers(server_path, env, port, workers, services=()):
+    """Runs several Node.js workers on internal ports behind the front proxy"""
+    sink = start_log_sink()
+    try:
+        supervisors, proxy = start_workers(
+            server_path, env, port, workers,
+            on_output=sink.write,
+            on_event=make_event_printer,
+            log=lambda message: print(message)
+        )
+        print(f"✓ Front proxy listening on port {port}")
+    except Exception as e:
+        sink.stop()
+        print(f"ERROR: Failed to start server: {e}")
+        sys.exit(1)
+    
+    services = list(services) + [sink, start_metrics_printer(supervisors, env.get('LAUNCHER_TOKEN'))]
+    services += start_resource_monitors(supervisors, [f"Worker {i}" for i in range(1, workers + 1)],
+                                        env.get('LAUNCHER_TOKEN'))
+    wait_for_shutdown(supervisors, proxy, services)
+
+def parse_bench_args(argv):
+    """Parse arguments of the bench subcommand"""
+    parser = argparse.ArgumentParser(
+        prog="server-cli.py bench",
+        description="Seeds a scratch database, starts the server against it and reports "
+                    "throughput and p50/p95/p99 latency per request type as JSON"
+    )
+    parser.add_argument('--rows', type=int, default=5000,
+                        help="Log entries to seed (default: 5000)")
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help="Simultaneous client connections (default: 8)")
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help="Seconds to run the load (default: 30)")
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f"Weighted request mix of list, search, create, archive and login (default: {DEFAULT_MIX})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Node.js workers behind the front proxy, as for normal runs (default: 1)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Random seed, for repeatable data and request order")
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--verbose', action='store_true', help="Show server output")
+    return parser.parse_args(argv)
+
+def read_version():
+    """Application version from package.json (None if not found)"""
+    try:
+        with open(BASE_DIR / "package.json", 'r', encoding='utf-8') as f:
+            return json.load(f).get('version')
+    except Exception:
+        return None
+
+def run_bench(argv):
+    """Load test against a scratch database; the JSON report goes to stdout, progress to stderr"""
+    args = parse_bench_args(argv)
+    
+    def status(message):
+        print(message, file=sys.stderr, flush=True)
+    
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        status(f"ERROR: {e}")
+        sys.exit(1)
+    if args.rows < 1 or args.concurrency < 1 or args.workers < 1 or args.duration <= 0:
+        status("ERROR: --rows, --concurrency, --workers and --duration must be positive.")
+        sys.exit(1)
+    if not check_nodejs():
+        sys.exit(1)
+    server_path = SERVER_DIR / "index.js"
+    if not server_path.exists():
+        status(f"ERROR: Server file not found: {server_path}")
+        sys.exit(1)
+    
+    # The real data folder is never touched: the server runs on a scratch database
+    scratch_dir = Path(tempfile.mkdtemp(prefix="handover-bench-"))
+    db_path = scratch_dir / "shift_logs.db"
+    port = find_free_port()
+    env = os.environ.copy()
+    env.pop('WORKER_ID', None)
+    env['NODE_ENV'] = 'production'
+    env['HOST'] = '127.0.0.1'
+    env['PORT'] = str(port)
+    env['JWT_SECRET'] = secrets.token_hex(32)
+    env['DB_PATH'] = str(db_path)
+    on_output = (lambda name, line: status(f"[{name}] {line}")) if args.verbose else None
+    startups = {}
+    
+    def on_event(name, _port=None):
+        def record(event, detail):
+            if event == 'startup':
+                startups[name] = detail
+        return record
+    
+    supervisors = []
+    proxy = None
+    started_at = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    try:
+        status(f"Starting server ({args.workers} worker(s)) on a scratch database...")
+        if args.workers > 1:
+            supervisors, proxy = start_workers(server_path, env, port, args.workers,
+                                               on_output=on_output, on_event=on_event,
+                                               log=status if args.verbose else (lambda message: None))
+        else:
+            supervisors.append(ServerSupervisor(
+                [str(NODEJS_EXE), str(server_path)],
+                cwd=str(BASE_DIR),
+                env=env,
+                port=port,
+                on_output=(lambda line: on_output("Server", line)) if on_output else None,
+                on_event=on_event("Server"),
+                restart=False
+            ))
+            supervisors[0].start()
+        for supervisor in supervisors:
+            if not supervisor.wait_ready(READY_TIMEOUT):
+                raise RuntimeError("Server did not become ready")
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        status(f"Seeding {args.rows} log entries...")
+        log_ids = seed_logs(str(db_path), args.rows, random.Random(args.seed))
         
-        # Read and print output
+        status(f"Running for {args.duration:g}s with {args.concurrency} connection(s)...")
+        results = run_load(port, mix, log_ids, args.concurrency, args.duration, args.seed)
+    except Exception as e:
+        status(f"ERROR: Benchmark failed: {e}")
+        sys.exit(1)
+    finally:
+        if proxy:
+            proxy.stop()
+        for supervisor in supervisors:
+            supervisor.stop()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    
+    report = {
+        'version': read_version(),
+        'started_at': started_at,
+        'config': {
+            'rows': args.rows,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'workers': args.workers,
+            'mix': mix,
+            'seed': args.seed,
+        },
+        # Cold start of each process on the scratch database (see server/utils/startupTimings.js)
+        'startup': startups,
+        **results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        status(f"Report written to {args.output}")
+
+def parse_export_args(argv):
+    """Parse arguments of the export subcommand"""
+    parser = argparse.ArgumentParser(
+        prog="server-cli.py export",
+        description="Exports log entries to CSV or JSON lines, streamed in chunks (safe while the server runs)"
+    )
+    parser.add_argument('file', help="Output file (.csv or .jsonl), or - for stdout")
+    parser.add_argument('--format', choices=server_transfer.FORMATS, help="Default: from the file extension")
+    parser.add_argument('--since', help="Only entries on or after this day (YYYY-MM-DD)")
+    parser.add_argument('--until', help="Only entries on or before this day (YYYY-MM-DD)")
+    parser.add_argument('--worker', help="Only entries of this worker (initials)")
+    archived = parser.add_mutually_exclusive_group()
+    archived.add_argument('--archived', dest='archived', action='store_const', const=True,
+                          help="Only archived entries")
+    archived.add_argument('--active', dest='archived', action='store_const', const=False,
+                          help="Only entries that are not archived")
+    parser.add_argument('--include-deleted', action='store_true', help="Also export deleted entries")
+    parser.add_argument('--db', default=str(DATA_DIR / "shift_logs.db"), help="Database file (default: data/shift_logs.db)")
+    return parser.parse_args(argv)
+
+def parse_import_args(argv):
+    """Parse arguments of the import subcommand"""
+    parser = argparse.ArgumentParser(
+        prog="server-cli.py import",
+        description="Adds log entries from an export to the database in one transaction "
+                    "(stop the server first)"
+    )
+    parser.add_argument('file', help="File written by export (.csv or .jsonl), or - for stdin")
+    parser.add_argument('--format', choices=server_transfer.FORMATS, help="Default: from the file extension")
+    parser.add_argument('--batch-size', type=int, default=server_transfer.CHUNK_SIZE,
+                        help=f"Rows per insert batch (default: {server_transfer.CHUNK_SIZE})")
+    parser.add_argument('--db', default=str(DATA_DIR / "shift_logs.db"), help="Database file (default: data/shift_logs.db)")
+    parser.add_argument('--force', action='store_true', help="Import even if the server seems to be running")
+    return parser.parse_args(argv)
+
+def run_export(argv):
+    """Exports log entries; the count goes to stderr so stdout can be the data"""
+    args = parse_export_args(argv)
+    try:
+        fmt = server_transfer.format_from_path(args.file, args.format)
+        if not Path(args.db).exists():
+            raise ValueError(f"Database not found: {args.db}")
+        out = server_transfer.open_output(args.file)
         try:
-            for line in iter(process.stdout.readline, ''):
-                if line:
-                    print(f"[Server] {line.rstrip()}")
-            process.stdout.close()
-            process.wait()
-        except KeyboardInterrupt:
-            signal_handler(None, None)
-        
+            count = server_transfer.export_logs(
+                args.db, out, fmt,
+                since=args.since, until=args.until, worker=args.worker,
+                archived=args.archived, include_deleted=args.include_deleted
+            )
+        finally:
+            if out is not sys.stdout:
+                out.close()
     except Exception as e:
-        print(f"ERROR: Failed to start server: {e}")
+        print(f"ERROR: Export failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"✓ Exported {count} log entries", file=sys.stderr)
+
+def run_import(argv):
+    """Imports log entries from an export file"""
+    args = parse_import_args(argv)
+    if args.batch_size < 1:
+        print("ERROR: --batch-size must be 1 or more.")
+        sys.exit(1)
+    # Records are checked and cleaned by the server's own validation
+    if not check_nodejs():
+        sys.exit(1)
+    
+    # The import holds the write lock for its whole transaction
+    port, _ = load_config()
+    if probe_health(port) and not args.force:
+        print(f"ERROR: The server is running on port {port}. Stop it before importing (or use --force).")
+        sys.exit(1)
+    
+    try:
+        fmt = server_transfer.format_from_path(args.file, args.format)
+        if not Path(args.db).exists():
+            raise ValueError(f"Database not found: {args.db} (start the server once to create it)")
+        infile = server_transfer.open_input(args.file)
+        try:
+            count = server_transfer.import_logs(
+                args.db, infile, fmt, NODEJS_EXE, batch_size=args.batch_size,
+                progress=lambda done: print(f"  {done} rows...", flush=True)
+            )
+        finally:
+            if infile is not sys.stdin:
+                infile.close()
+    except Exception as e:
+        print(f"ERROR: Import failed, nothing was imported: {e}")
+        sys.exit(1)
+    print(f"✓ Imported {count} log entries")
+
+def parse_backup_args(argv):
+    """Parse arguments of the backup subcommand"""
+    settings = load_backup_settings()
+    parser = argparse.ArgumentParser(
+        prog="server-cli.py backup",
+        description="Backs up the databases and data/config.json now (safe while the server runs), "
+                    "then deletes the oldest backups"
+    )
+    parser.add_argument('--dir', default=settings['backup_dir'] or str(DATA_DIR / "backups"),
+                        help="Backup folder (default: backup_dir from server_config.json, else data/backups)")
+    parser.add_argument('--keep', type=int, default=settings['backup_keep'],
+                        help=f"Backups to keep (default: {settings['backup_keep']})")
+    parser.add_argument('--no-compress', dest='compress', action='store_false', default=settings['backup_compress'],
+                        help="Keep the backup as a folder instead of a .zip")
+    return parser.parse_args(argv)
+
+def run_backup_command(argv):
+    """Runs one backup in the foreground"""
+    args = parse_backup_args(argv)
+    if args.keep < 1:
+        print("ERROR: --keep must be 1 or more.")
+        sys.exit(1)
+    try:
+        started = time.time()
+        result = run_backup(DATA_DIR, args.dir)
+        print(f"✓ Backup saved: {describe_backup(result)}")
+        if args.compress:
+            result['path'] = compress_backup(result['path'])
+        print(f"  {result['path']}")
+        for name in rotate_backups(args.dir, args.keep, started):
+            print(f"  Removed old backup {name}")
+    except Exception as e:
+        print(f"ERROR: Backup failed: {e}")
+        sys.exit(1)
+
+def run_status(argv):
+    """Prints the headline metrics of the running server"""
+    parser = argparse.ArgumentParser(
+        prog="server-cli.py status",
+        description="Shows request rate, latency, errors, memory and event loop lag of the running server "
+                    "(from /api/metrics)"
+    )
+    parser.add_argument('--port', type=int, help="Server port (default: the saved port)")
+    args = parser.parse_args(argv)
+    port = args.port or load_config()[0]
+    
+    samples = scrape_metrics(port, load_launcher_token(DATA_DIR))
+    if samples is None:
+        print(f"ERROR: No server started by this launcher answering on port {port}.")
         sys.exit(1)
+    print(f"Server on port {port}: {format_headline(headline(samples))}")
+
+SUBCOMMANDS = {
+    'bench': run_bench,
+    'export': run_export,
+    'import': run_import,
+    'backup': run_backup_command,
+    'status': run_status,
+}
 
 if __name__ == "__main__":
     main()
@@ -10,14 +10,20 @@ import sys
 import json
 import secrets
 import subprocess
-import threading
 import socket
 import webbrowser
-import re
+from collections import deque
 from pathlib import Path
-from tkinter import Tk, Label, Entry, Button, Text, Scrollbar, Frame, messagebox, Toplevel, Radiobutton, IntVar
+from tkinter import Tk, Label, Entry, Button, Text, Scrollbar, Frame, messagebox, Toplevel, Radiobutton, IntVar, Checkbutton, BooleanVar, StringVar
 from tkinter.scrolledtext import ScrolledText
 
+from server_supervisor import ServerSupervisor, format_startup, record_startup
+from server_backup import BackupScheduler, backup_settings, describe_backup
+from server_metrics import MetricsPoller, format_headline, save_launcher_token
+from server_monitor import ResourceMonitor, monitor_settings, monitoring_available, format_sample
+from server_logsink import LogSink
+from server_probes import ProbeRunner, DEFAULT_TTL
+
 # Debug flag - set to True to enable verbose logging
 DEBUG = True
 
@@ -26,6 +32,10 @@ CONFIG_FILE = "server_config.json"
 DEFAULT_CONFIG_FILE = "server_default_config.json"
 DEFAULT_PORT = 8500
 
+# Logs area limits - keep the GUI cost flat whatever the server output rate
+LOG_MAX_LINES = 2000      # Lines kept in the ring buffer (and shown in the widget)
+LOG_PUMP_INTERVAL_MS = 100  # How often the Tk main loop drains pending log lines
+
 # Detect if running from dist folder (executable)
 # When running as PyInstaller exe: use executable's directory (cwd can be wrong with shortcuts)
 # When running as Python script: use cwd
@@ -74,7 +84,7 @@ NODEJS_EXE = NODEJS_DIR / "node.exe"
 
 class ServerManager:
     def __init__(self):
-        self.process = None
+        self.supervisor = None
         self.port = DEFAULT_PORT
         self.is_running = False
         self.root = None
@@ -90,6 +100,21 @@ class ServerManager:
         self.firewall_port = None
         self.local_ip = None
         self.jwt_secret = None
+        self.backup_settings = backup_settings({})
+        self.backups = None
+        self.metrics = None
+        self.launcher_token = None
+        self.monitor_settings = monitor_settings({})
+        self.monitor = None
+        self.log_sink = None
+        
+        # Auto-start, firewall and IP probes run on a thread pool, results
+        # are handled on the Tk main loop (see handle_probe_result)
+        self.probes = None
+        self.probe_cache = {}
+        self.probe_cache_ttl = DEFAULT_TTL
+        self.probes_pending = set()
+        self.show_ip_when_probed = False
         
         # UI elements for server config
         self.auto_start_status_label = None
@@ -98,15 +123,87 @@ class ServerManager:
         self.firewall_button = None
         self.ip_label = None
         self.refresh_ip_button = None
+        self.backup_status_label = None
+        self.backup_button = None
+        self.metrics_label = None
+        self.resource_label = None
+        
+        # Log pump state: any thread appends to log_pending, only the Tk main
+        # loop touches the widget (see pump_logs). Both deques are bounded, so
+        # the oldest lines are evicted when the server is chatty.
+        self.log_pending = deque(maxlen=LOG_MAX_LINES)
+        self.log_lines = deque(maxlen=LOG_MAX_LINES)
+        self.log_paused = None
+        self.log_filter = None
+        
+        # Supervisor events are raised on background threads and handled on
+        # the Tk main loop by pump_logs
+        self.server_events = deque()
+        self.browser_opened = False
         
     def log(self, message):
-        """Adds message to the logs area"""
-        if self.log_text:
-            self.log_text.insert("end", f"{message}\n")
-            self.log_text.see("end")
-            self.root.update_idletasks()
+        """Queues message for the logs area (safe to call from any thread)"""
+        self.log_pending.append(str(message))
         print(message)
     
+    def log_matches_filter(self, line):
+        """Checks if a log line matches the current filter text"""
+        if not self.log_filter:
+            return True
+        text = self.log_filter.get().strip().lower()
+        return not text or text in line.lower()
+    
+    def pump_logs(self):
+        """Drains pending log lines into the logs area in one batch"""
+        if not self.root:
+            return
+        try:
+            while True:
+                self.handle_server_event(*self.server_events.popleft())
+        except IndexError:
+            pass
+        
+        batch = []
+        try:
+            while True:
+                batch.append(self.log_pending.popleft())
+        except IndexError:
+            pass
+        
+        if batch:
+            self.log_lines.extend(batch)
+            if self.log_text and not (self.log_paused and self.log_paused.get()):
+                visible = [line for line in batch[-LOG_MAX_LINES:] if self.log_matches_filter(line)]
+                if visible:
+                    self.log_text.insert("end", "\n".join(visible) + "\n")
+                    self.trim_log_widget()
+                    self.log_text.see("end")
+        
+        self.root.after(LOG_PUMP_INTERVAL_MS, self.pump_logs)
+    
+    def trim_log_widget(self):
+        """Removes the oldest lines so the widget never exceeds LOG_MAX_LINES"""
+        line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        excess = line_count - LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+    
+    def render_logs(self, *args):
+        """Redraws the logs area from the ring buffer (after filter change or resume)"""
+        if not self.log_text or (self.log_paused and self.log_paused.get()):
+            return
+        self.log_text.delete("1.0", "end")
+        visible = [line for line in self.log_lines if self.log_matches_filter(line)]
+        if visible:
+            self.log_text.insert("end", "\n".join(visible) + "\n")
+        self.log_text.see("end")
+    
+    def clear_logs(self):
+        """Clears the logs area and the ring buffer"""
+        self.log_lines.clear()
+        if self.log_text:
+            self.log_text.delete("1.0", "end")
+    
     def check_nodejs(self):
         """Checks if portable Node.js is available"""
         if not NODEJS_EXE.exists():
@@ -147,6 +244,10 @@ class ServerManager:
                     self.auto_start_delay = config.get('auto_start_delay', 0)
                     self.firewall_port = config.get('firewall_port', None)
                     self.jwt_secret = config.get('jwt_secret')
+                    self.backup_settings = backup_settings(config)
+                    self.monitor_settings = monitor_settings(config)
+                    self.probe_cache = config.get('probe_cache', {})
+                    self.probe_cache_ttl = config.get('probe_cache_ttl', DEFAULT_TTL)
                 # Ensure JWT_SECRET exists for Node.js production mode
                 if not self.jwt_secret:
                     self.jwt_secret = secrets.token_hex(32)
@@ -170,10 +271,23 @@ class ServerManager:
             self.port = DEFAULT_PORT
             self.jwt_secret = secrets.token_hex(32)
         
-        # Check actual status
-        self.auto_start_enabled = self.check_auto_start_status()
-        self.firewall_port = self.get_firewall_port()
-        self.local_ip = self.get_local_ip()
+        # Cached status until the probes report (refresh_status)
+        self.probes = ProbeRunner(
+            on_result=lambda name, value, error: self.server_events.append((self.probes, name, (value, error))),
+            cache=self.probe_cache,
+            ttl=self.probe_cache_ttl
+        )
+        if self.probes.cached('auto_start') is not None:
+            self.auto_start_enabled = self.probes.cached('auto_start')
+        if 'firewall_port' in self.probes.cache:
+            self.firewall_port = self.probes.cached('firewall_port')
+        self.local_ip = self.probes.cached('local_ip')
+        
+        # Events are handled on the Tk main loop like the supervisor's
+        self.backups = BackupScheduler.from_settings(
+            DATA_DIR, self.backup_settings,
+            on_event=lambda event, detail: self.server_events.append((self.backups, event, detail))
+        )
     
     def save_config(self):
         """Saves configuration"""
@@ -184,7 +298,11 @@ class ServerManager:
                 'auto_start_mode': self.auto_start_mode,
                 'auto_start_delay': self.auto_start_delay,
                 'firewall_port': self.firewall_port,
-                'jwt_secret': self.jwt_secret
+                'jwt_secret': self.jwt_secret,
+                **self.backup_settings,
+                **self.monitor_settings,
+                'probe_cache': self.probes.cache if self.probes else self.probe_cache,
+                'probe_cache_ttl': self.probe_cache_ttl
             }
             with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2)
@@ -232,6 +350,14 @@ class ServerManager:
         env['PORT'] = str(self.port)
         env['FRONTEND_URL'] = f'http://localhost:{self.port}'
         env['JWT_SECRET'] = self.jwt_secret or secrets.token_hex(32)
+        # Lets the launcher read /api/metrics and the resource monitor ask for a
+        # heap snapshot; saved for `server-cli.py status` (see server_metrics.py)
+        env['LAUNCHER_TOKEN'] = secrets.token_hex(16)
+        self.launcher_token = env['LAUNCHER_TOKEN']
+        if not save_launcher_token(DATA_DIR, self.launcher_token):
+            self.log("Could not save data/launcher.token; 'server-cli.py status' will not work")
+        # Compiled code is cached on disk between starts (Node.js 22.1+, ignored before)
+        env['NODE_COMPILE_CACHE'] = str(DATA_DIR / "compile-cache")
         # Note: REACT_APP_API_URL is defined at build time, but since we serve everything on the same port,
         # relative requests /api will work correctly
         
@@ -300,59 +426,136 @@ class ServerManager:
             
             self.log(f"==================")
             
-            self.process = subprocess.Popen(
+            self.browser_opened = False
+            # Server output goes to data/logs; the logs area is a lossy
+            # subscriber, so a busy Tk loop never stalls the pipe
+            if not self.log_sink:
+                self.log_sink = LogSink(DATA_DIR / "logs").start()
+                self.log_sink.subscribe(
+                    lambda source, line: self.log_pending.append(f"[{source}] {line}" if source else line)
+                )
+            log_sink = self.log_sink
+            supervisor = ServerSupervisor(
                 [node_path, server_script],
                 cwd=working_dir,
                 env=env,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                port=self.port,
+                on_output=lambda line: log_sink.write("Server", line),
+                on_event=lambda event, detail: self.server_events.append((supervisor, event, detail))
             )
+            self.supervisor = supervisor
+            supervisor.start()
             
             self.is_running = True
             self.update_ui_state()
+            self.log(f"Server process started, waiting for it to become ready...")
             
-            # Thread to read process output
-            def read_output():
-                try:
-                    for line in iter(self.process.stdout.readline, ''):
-                        if line:
-                            self.log(f"[Server] {line.strip()}")
-                    self.process.stdout.close()
-                    self.process.wait()
-                    self.is_running = False
-                    self.update_ui_state()
-                    self.log("Server stopped.")
-                except Exception as e:
-                    self.log(f"Error reading output: {e}")
-                    self.is_running = False
-                    self.update_ui_state()
-            
-            thread = threading.Thread(target=read_output, daemon=True)
-            thread.start()
-            
-            # Wait a bit and check if the process is still running
-            threading.Timer(2.0, self.check_server_started).start()
+            if monitoring_available():
+                self.monitor = ResourceMonitor.from_settings(
+                    supervisor, self.monitor_settings,
+                    on_event=lambda event, detail: self.server_events.append((self.monitor, event, detail)),
+                    snapshot_token=env['LAUNCHER_TOKEN']
+                )
+                self.monitor.start()
+            else:
+                self.log("Resource monitor unavailable (install psutil to enable it)")
             
-            self.log(f"Server started! Access: http://localhost:{self.port}")
+            if self.backup_settings['backup_enabled']:
+                self.backups.start()
+                self.log(f"Backups every {self.backup_settings['backup_interval_hours']}h to {self.backups.backup_dir}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Error starting server:\n{str(e)}")
+            self.supervisor = None
             self.is_running = False
             self.update_ui_state()
     
-    def check_server_started(self):
-        """Checks if the server started correctly"""
-        if self.process and self.process.poll() is not None:
-            # Process terminated
+    def handle_server_event(self, source, event, detail):
+        """Handles a supervisor event on the Tk main loop"""
+        if source is self.backups:
+            self.handle_backup_event(event, detail)
+            return
+        if source is self.metrics:
+            self.update_metrics_label(detail)
+            return
+        if source is self.monitor:
+            self.handle_monitor_event(event, detail)
+            return
+        if source is self.probes:
+            self.handle_probe_result(event, *detail)
+            return
+        if source is not self.supervisor:
+            # Late event from a server that was stopped before a restart
+            return
+        if event == 'ready':
+            self.log(f"Server ready in {detail:.2f}s! Access: http://localhost:{self.port}")
+            if not self.metrics:
+                self.metrics = MetricsPoller(
+                    [self.port], self.launcher_token,
+                    on_update=lambda numbers: self.server_events.append((self.metrics, 'metrics', numbers))
+                )
+                self.metrics.start()
+            if not self.browser_opened:
+                self.browser_opened = True
+                self.open_browser()
+        elif event == 'startup':
+            self.log(f"Startup: {format_startup(detail)}")
+            record_startup(DATA_DIR / "logs", "Server", detail)
+        elif event == 'crashed':
+            self.log(f"[WARNING] Server exited unexpectedly (code {detail})")
+        elif event == 'restarting':
+            self.log(f"Restarting server in {detail:.0f}s...")
+        elif event == 'failed':
+            self.log(f"[ERROR] {detail}")
+            messagebox.showerror("Error", f"{detail}. Check the logs.")
+        elif event == 'stopped':
             self.is_running = False
             self.update_ui_state()
-            messagebox.showerror("Error", "The server terminated unexpectedly. Check the logs.")
-        elif self.is_running:
-            # Server is running, open browser after a few seconds
-            threading.Timer(3.0, self.open_browser).start()
+            self.log("Server stopped.")
+    
+    def handle_backup_event(self, event, detail):
+        """Handles a backup scheduler event on the Tk main loop"""
+        if event == 'started':
+            self.log("Backup started...")
+            if self.backup_button:
+                self.backup_button.config(state='disabled')
+        elif event == 'finished':
+            self.log(f"✓ Backup saved: {describe_backup(detail)}")
+        elif event == 'compressed':
+            self.log(f"Backup compressed: {detail}")
+        elif event == 'failed':
+            self.log(f"[ERROR] Backup failed: {detail}")
+        elif event == 'busy':
+            self.log(f"Backup skipped: {detail}")
+        # A skipped backup leaves the button as the running one set it
+        if event not in ('started', 'busy') and self.backup_button:
+            self.backup_button.config(state='normal')
+        self.update_server_config_ui()
+    
+    def update_metrics_label(self, numbers):
+        """Shows the headline numbers of the last metrics scrape"""
+        if not self.metrics_label:
+            return
+        if numbers is None:
+            self.metrics_label.config(text="Metrics: Server not answering", fg="gray")
+        else:
+            self.metrics_label.config(text=f"Metrics: {format_headline(numbers)}",
+                                      fg="red" if numbers['errors'] else "black")
+    
+    def handle_monitor_event(self, event, detail):
+        """Shows the latest resource sample; logs RSS growth alarms"""
+        if event == 'sample' and self.resource_label:
+            self.resource_label.config(text=f"Resources: {format_sample(detail)}")
+            if self.resource_label.cget('fg') == 'gray':
+                self.resource_label.config(fg="black")
+        elif event == 'alarm':
+            self.log(f"[WARNING] {detail}")
+            if self.resource_label:
+                self.resource_label.config(fg="red")
+    
+    def handle_backup_now(self):
+        """Runs a backup now (the server may be running or stopped)"""
+        self.backups.backup_now()
     
     def open_browser(self):
         """Opens the browser at the server address"""
@@ -366,22 +569,29 @@ class ServerManager:
     
     def stop_server(self):
         """Stops the Node.js server"""
-        if not self.is_running or not self.process:
+        if not self.is_running or not self.supervisor:
             messagebox.showinfo("Info", "The server is not running.")
             return
         
         try:
             self.log("Stopping server...")
-            self.process.terminate()
-            
-            # Wait up to 5 seconds for graceful termination
-            try:
-                self.process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                # Force termination
-                self.log("Forcing server termination...")
-                self.process.kill()
-                self.process.wait()
+            # Terminates gracefully, kills after 5 seconds, and disables restarts
+            self.supervisor.stop()
+            self.supervisor = None
+            self.backups.stop()
+            if self.metrics:
+                self.metrics.stop()
+                self.metrics = None
+            if self.metrics_label:
+                self.metrics_label.config(text="Metrics: -", fg="gray")
+            if self.monitor:
+                self.monitor.stop()
+                self.monitor = None
+            if self.log_sink:
+                self.log_sink.stop()
+                self.log_sink = None
+            if self.resource_label:
+                self.resource_label.config(text="Resources: -", fg="gray")
             
             self.is_running = False
             self.update_ui_state()
@@ -392,105 +602,6 @@ class ServerManager:
             self.is_running = False
             self.update_ui_state()
     
-    def check_auto_start_status(self):
-        """Checks if auto-start is configured"""
-        try:
-            result = subprocess.run(
-                ['schtasks', '/Query', '/TN', 'HandoverServer'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except Exception as e:
-            if DEBUG:
-                self.log(f"Error checking auto-start status: {e}")
-            return False
-    
-    def get_firewall_port(self):
-        """Gets the port from firewall rule if it exists"""
-        try:
-            # Check if firewall rule exists
-            result = subprocess.run(
-                ['powershell', '-Command', 
-                 'Get-NetFirewallRule -DisplayName "Handover Server" -ErrorAction SilentlyContinue | Select-Object -ExpandProperty DisplayName'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                # Try to get the port from the rule
-                port_result = subprocess.run(
-                    ['powershell', '-Command',
-                     'Get-NetFirewallRule -DisplayName "Handover Server" | Get-NetFirewallPortFilter | Select-Object -ExpandProperty LocalPort'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if port_result.returncode == 0:
-                    port_str = port_result.stdout.strip()
-                    try:
-                        return int(port_str)
-                    except ValueError:
-                        pass
-            return None
-        except Exception as e:
-            if DEBUG:
-                self.log(f"Error checking firewall: {e}")
-            return None
-    
-    def check_firewall_status(self):
-        """Checks if firewall rule exists"""
-        return self.get_firewall_port() is not None
-    
-    def get_local_ip(self):
-        """Gets the local IP address"""
-        try:
-            # Method 1: Try using socket
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            try:
-                # Connect to a remote address (doesn't actually send data)
-                s.connect(('8.8.8.8', 80))
-                ip = s.getsockname()[0]
-                s.close()
-                if ip and ip != '127.0.0.1':
-                    return ip
-            except Exception:
-                try:
-                    s.close()
-                except:
-                    pass
-            
-            # Method 2: Use ipconfig
-            result = subprocess.run(
-                ['ipconfig'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                # Find IPv4 addresses
-                lines = result.stdout.split('\n')
-                ips_found = []
-                for line in lines:
-                    if 'IPv4' in line or 'IPv4 Address' in line:
-                        # Extract IP address
-                        match = re.search(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})', line)
-                        if match:
-                            ip = match.group(1)
-                            if ip != '127.0.0.1' and not ip.startswith('169.254'):
-                                ips_found.append(ip)
-                
-                # Return first valid IP found
-                if ips_found:
-                    return ips_found[0]
-            
-            return None
-        except Exception as e:
-            if DEBUG:
-                self.log(f"Error getting local IP: {e}")
-            return None
-    
     def setup_auto_start(self, gui_mode=True, delay=0):
         """Sets up auto-start using Windows Task Scheduler"""
         try:
@@ -566,7 +677,7 @@ class ServerManager:
             return False, f"Error removing auto-start: {str(e)}"
     
     def open_firewall_port(self, port):
-        """Opens firewall port using PowerShell"""
+        """Opens firewall port using PowerShell; returns (success, message), success None while elevation is pending"""
         try:
             # Check if rule already exists
             check_cmd = ['powershell', '-Command',
@@ -618,13 +729,13 @@ class ServerManager:
                 ['powershell', '-Command', ps_script],
                 timeout=15
             )
-            # We can't easily check if it succeeded with RunAs, so we'll check after
-            if self.check_firewall_status():
-                self.firewall_port = port
-                self.save_config()
-                return True, f"Firewall port {port} opened successfully (elevated)"
-            else:
-                return False, "Please run as administrator to open firewall port"
+            # RunAs doesn't report whether the rule was created: the firewall
+            # probe checks in the background and updates the status label
+            self.probes_pending.update(self.probes.refresh(['firewall_port'], force=True))
+            self.update_server_config_ui()
+            return None, ("Confirm the administrator prompt to open the port. "
+                          "The firewall status is checked in the background; "
+                          "use Refresh All Status if it does not show the port yet.")
         except Exception as e:
             return False, f"Error opening firewall port with elevation: {str(e)}"
     
@@ -643,6 +754,10 @@ class ServerManager:
         # Update server config UI
         self.update_server_config_ui()
     
+    def is_probing(self, name):
+        """True while a probe runs that has no earlier result to show"""
+        return name in self.probes_pending and name not in self.probes.cache
+    
     def update_server_config_ui(self):
         """Updates the server configuration UI elements"""
         if not self.root:
@@ -650,7 +765,9 @@ class ServerManager:
         
         # Update auto-start status
         if self.auto_start_status_label:
-            if self.auto_start_enabled:
+            if self.is_probing('auto_start'):
+                self.auto_start_status_label.config(text="Status: Checking...", fg="gray")
+            elif self.auto_start_enabled:
                 self.auto_start_status_label.config(
                     text="Status: Configured",
                     fg="green"
@@ -670,7 +787,9 @@ class ServerManager:
         
         # Update firewall status
         if self.firewall_status_label:
-            if self.firewall_port:
+            if self.is_probing('firewall_port'):
+                self.firewall_status_label.config(text="Status: Checking...", fg="gray")
+            elif self.firewall_port:
                 self.firewall_status_label.config(
                     text=f"Status: Port {self.firewall_port} is open",
                     fg="green"
@@ -690,18 +809,53 @@ class ServerManager:
         
         # Update IP label
         if self.ip_label:
-            if self.local_ip:
+            if self.is_probing('local_ip'):
+                self.ip_label.config(text="Local IP: Checking...")
+            elif self.local_ip:
                 self.ip_label.config(text=f"Local IP: {self.local_ip}")
             else:
                 self.ip_label.config(text="Local IP: Not available")
+        
+        # Update last backup
+        if self.backup_status_label:
+            if self.backups and self.backups.last:
+                self.backup_status_label.config(
+                    text=f"Last backup: {describe_backup(self.backups.last)}",
+                    fg="green"
+                )
+            elif not self.backup_settings['backup_enabled']:
+                self.backup_status_label.config(text="Scheduled backups: Off", fg="gray")
+            else:
+                self.backup_status_label.config(text="Last backup: None this session", fg="gray")
     
-    def refresh_status(self):
-        """Refreshes all status information"""
-        self.auto_start_enabled = self.check_auto_start_status()
-        self.firewall_port = self.get_firewall_port()
-        self.local_ip = self.get_local_ip()
+    def refresh_status(self, force=True):
+        """Probes auto-start, firewall and IP in the background; labels update as results arrive
+        
+        Without force, results younger than probe_cache_ttl are kept as they are
+        """
+        started = self.probes.refresh(force=force)
+        self.probes_pending.update(started)
+        self.update_server_config_ui()
+    
+    def handle_probe_result(self, name, value, error):
+        """Applies one probe result on the Tk main loop"""
+        self.probes_pending.discard(name)
+        if error is not None:
+            if DEBUG:
+                self.log(f"Error checking {name.replace('_', ' ')}: {error}")
+        elif name == 'auto_start':
+            self.auto_start_enabled = value
+        elif name == 'firewall_port':
+            self.firewall_port = value
+        elif name == 'local_ip':
+            self.local_ip = value
+            if self.show_ip_when_probed:
+                self.show_ip_when_probed = False
+                self.show_local_ip()
         self.update_server_config_ui()
-        self.log("Status refreshed")
+        if not self.probes_pending:
+            self.save_config()
+            self.log("Status refreshed")
     
     def handle_auto_start(self):
         """Handles auto-start setup/removal"""
@@ -818,6 +972,11 @@ class ServerManager:
                                   "You may be prompted for administrator privileges.\n\n"
                                   "Continue?"):
                 success, message = self.open_firewall_port(port)
+                if success is None:
+                    # Elevated: the firewall probe is already running
+                    messagebox.showinfo("Open Firewall Port", message)
+                    self.log(f"Firewall: {message}")
+                    return
                 if success:
                     messagebox.showinfo("Success", message)
                     self.log(f"Firewall configured: {message}")
@@ -827,9 +986,14 @@ class ServerManager:
                 self.refresh_status()
     
     def handle_refresh_ip(self):
-        """Refreshes local IP address"""
-        self.local_ip = self.get_local_ip()
-        self.update_server_config_ui()
+        """Refreshes local IP address; the answer is shown when the probe returns"""
+        self.show_ip_when_probed = True
+        self.probes_pending.update(self.probes.refresh(['local_ip'], force=True))
+        if self.ip_label:
+            self.ip_label.config(text="Local IP: Checking...")
+    
+    def show_local_ip(self):
+        """Shows the local IP address and the URL for other computers"""
         if self.local_ip:
             self.log(f"Local IP: {self.local_ip}")
             messagebox.showinfo("Local IP", 
@@ -905,6 +1069,16 @@ class ServerManager:
                                      padx=15, pady=10)
         open_browser_button.pack(side='left')
         
+        # Headline numbers from /api/metrics, refreshed while the server runs
+        self.metrics_label = Label(main_frame, text="Metrics: -", font=("Arial", 9), fg="gray",
+                                   anchor='w', justify='left')
+        self.metrics_label.pack(fill='x', pady=(0, 5))
+        
+        # CPU and memory of the Node.js process (server_monitor.py)
+        self.resource_label = Label(main_frame, text="Resources: -", font=("Arial", 9), fg="gray",
+                                    anchor='w', justify='left')
+        self.resource_label.pack(fill='x', pady=(0, 5))
+        
         # Server Configuration Section
         config_section_frame = Frame(main_frame, relief='groove', borderwidth=2, padx=10, pady=10)
         config_section_frame.pack(fill='x', pady=(10, 10))
@@ -947,6 +1121,23 @@ class ServerManager:
                                      padx=10, pady=5)
         self.firewall_button.pack(side='left')
         
+        # Backups
+        backup_frame = Frame(config_section_frame)
+        backup_frame.pack(fill='x', pady=(0, 10))
+        
+        backup_label = Label(backup_frame, text="Backups:", font=("Arial", 10, "bold"))
+        backup_label.pack(side='left', padx=(0, 10))
+        
+        self.backup_status_label = Label(backup_frame, text="Last backup: None this session",
+                                         font=("Arial", 9), fg="gray")
+        self.backup_status_label.pack(side='left', padx=(0, 10))
+        
+        self.backup_button = Button(backup_frame, text="Backup Now",
+                                    command=self.handle_backup_now,
+                                    font=("Arial", 9),
+                                    padx=10, pady=5)
+        self.backup_button.pack(side='left')
+        
         # IP Address
         ip_frame = Frame(config_section_frame)
         ip_frame.pack(fill='x', pady=(0, 5))
@@ -968,14 +1159,40 @@ class ServerManager:
         refresh_all_button.pack(side='right')
         
         # Logs area
-        log_label = Label(main_frame, text="Logs:", font=("Arial", 10, "bold"))
-        log_label.pack(anchor='w', pady=(10, 5))
+        log_header_frame = Frame(main_frame)
+        log_header_frame.pack(fill='x', pady=(10, 5))
+        
+        log_label = Label(log_header_frame, text="Logs:", font=("Arial", 10, "bold"))
+        log_label.pack(side='left')
+        
+        clear_logs_button = Button(log_header_frame, text="Clear",
+                                   command=self.clear_logs,
+                                   font=("Arial", 9),
+                                   padx=10)
+        clear_logs_button.pack(side='right')
+        
+        self.log_paused = BooleanVar(value=False)
+        pause_check = Checkbutton(log_header_frame, text="Pause",
+                                  variable=self.log_paused,
+                                  command=self.render_logs,
+                                  font=("Arial", 9))
+        pause_check.pack(side='right', padx=(0, 10))
+        
+        self.log_filter = StringVar()
+        self.log_filter.trace_add('write', self.render_logs)
+        filter_entry = Entry(log_header_frame, textvariable=self.log_filter,
+                             width=25, font=("Arial", 9))
+        filter_entry.pack(side='right', padx=(0, 10))
+        Label(log_header_frame, text="Filter:", font=("Arial", 9)).pack(side='right', padx=(0, 5))
         
         self.log_text = ScrolledText(main_frame, height=20, width=80,
                                      font=("Consolas", 9),
                                      wrap='word')
         self.log_text.pack(fill='both', expand=True)
         
+        # Start draining queued log lines on the Tk main loop
+        self.pump_logs()
+        
         # Initial status
         self.log("Server ready. Configure the port and click 'Start Server'.")
         
@@ -994,8 +1211,9 @@ class ServerManager:
         else:
             self.log("✓ All necessary folders found")
         
-        # Refresh server configuration status
-        self.refresh_status()
+        # Refresh server configuration status in the background (cached
+        # results younger than probe_cache_ttl are shown as they are)
+        self.refresh_status(force=False)
         
         # Update UI state
         self.update_ui_state()
@@ -0,0 +1,34 @@
+// Moves old archived and deleted log entries to cold storage now, instead of
+// waiting for the server's daily run (see database/coldStorage.js).
+// Safe while the server is running.
+//
+// Usage: npm run archive-logs [-- days]
+// (default: archive_cold_after_days from data/config.json)
+const db = require('./db');
+const { getColdAfterDays, runColdArchive, closeColdStorage } = require('./coldStorage');
+
+async function archiveLogs() {
+  const days = process.argv[2] !== undefined ? parseInt(process.argv[2], 10) : getColdAfterDays();
+  if (isNaN(days) || days < 0) {
+    console.error('Usage: npm run archive-logs [-- days]  (days: 0 or more)');
+    process.exit(1);
+  }
+
+  try {
+    await db.initialize();
+    const start = Date.now();
+    const { moved, years } = await runColdArchive(days);
+    Object.keys(years).forEach((year) => {
+      console.log(`  ${year}: ${years[year]} log(s)`);
+    });
+    console.log(`Moved ${moved} log(s) archived or deleted more than ${days} days ago to cold storage (${Date.now() - start} ms)`);
+    await closeColdStorage();
+    await db.close();
+    process.exit(0);
+  } catch (error) {
+    console.error('Moving logs to cold storage failed:', error);
+    process.exit(1);
+  }
+}
+
+archiveLogs();
@@ -0,0 +1,304 @@
+// Schema migration check
+// Builds a scratch database in every historical schema shape (releases from
+// before migrations existed, at user_version 0, and each migration version),
+// upgrades it with database/migrations.js and compares its schema with that
+// of a new database. Also checks that the rows survive and are found by the
+// search index, that a current schema only costs one PRAGMA and that a
+// schema from a newer release is refused.
+//
+// Usage: npm run check-migrations
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const SCRATCH_DIR = fs.mkdtempSync(path.join(os.tmpdir(), 'shift_logs_migrations_'));
+process.env.DB_PATH = path.join(SCRATCH_DIR, 'unused.db');
+process.env.NODE_ENV = process.env.NODE_ENV || 'production';
+
+const sqlite3 = require('sqlite3');
+const db = require('./db');
+const { MIGRATIONS, LATEST_VERSION, getSchemaVersion, migrate } = require('./migrations');
+const { noteToText } = require('../utils/fullTextSearch');
+
+const quiet = () => {};
+
+// Schema created by the releases before migrations, oldest first; each shape
+// adds to the previous one the way that release's startup did
+const FIRST_RELEASE = [
+  `CREATE TABLE shift_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    short_description VARCHAR(50) NOT NULL,
+    note TEXT NOT NULL,
+    worker_name VARCHAR(3) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_archived BOOLEAN DEFAULT 0,
+    is_deleted BOOLEAN DEFAULT 0
+  )`,
+  'CREATE INDEX idx_log_date ON shift_logs(log_date)',
+  'CREATE INDEX idx_worker_name ON shift_logs(worker_name)',
+  'CREATE INDEX idx_archived ON shift_logs(is_archived)'
+];
+const LOG_COLORS = [
+  ...FIRST_RELEASE,
+  'ALTER TABLE shift_logs ADD COLUMN color VARCHAR(20) DEFAULT NULL'
+];
+const USERS = [
+  ...LOG_COLORS,
+  `CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    email VARCHAR(255) DEFAULT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    is_admin BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+  )`,
+  'CREATE INDEX idx_username ON users(username)',
+  'CREATE INDEX idx_is_admin ON users(is_admin)'
+];
+const REMINDERS = [
+  ...USERS,
+  'ALTER TABLE shift_logs ADD COLUMN reminder_date DATETIME DEFAULT NULL',
+  'CREATE INDEX idx_reminder_date ON shift_logs(reminder_date)',
+  'ALTER TABLE users ADD COLUMN display_order INTEGER DEFAULT 0',
+  'CREATE INDEX idx_display_order ON users(display_order)'
+];
+const RESTORED_REMINDERS = [
+  ...REMINDERS,
+  'ALTER TABLE shift_logs ADD COLUMN original_log_date DATETIME DEFAULT NULL'
+];
+// The same release, installed new: color and display_order in CREATE TABLE
+const RESTORED_REMINDERS_NEW_INSTALL = [
+  `CREATE TABLE shift_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    short_description VARCHAR(50) NOT NULL,
+    note TEXT NOT NULL,
+    worker_name VARCHAR(3) NOT NULL,
+    color VARCHAR(20) DEFAULT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_archived BOOLEAN DEFAULT 0,
+    is_deleted BOOLEAN DEFAULT 0
+  )`,
+  'CREATE INDEX idx_log_date ON shift_logs(log_date)',
+  'CREATE INDEX idx_worker_name ON shift_logs(worker_name)',
+  'CREATE INDEX idx_archived ON shift_logs(is_archived)',
+  'ALTER TABLE shift_logs ADD COLUMN reminder_date DATETIME DEFAULT NULL',
+  'CREATE INDEX idx_reminder_date ON shift_logs(reminder_date)',
+  'ALTER TABLE shift_logs ADD COLUMN original_log_date DATETIME DEFAULT NULL',
+  `CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    email VARCHAR(255) DEFAULT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    is_admin BOOLEAN DEFAULT 0,
+    display_order INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+  )`,
+  'CREATE INDEX idx_username ON users(username)',
+  'CREATE INDEX idx_is_admin ON users(is_admin)',
+  'CREATE INDEX idx_display_order ON users(display_order)'
+];
+
+// Each case: SQL of the old shape, then the migrations that release had
+// already applied (without recording a version unless versioned is set)
+function buildCases() {
+  const cases = [
+    { name: 'new database', sql: [], applied: 0 },
+    { name: 'first release', sql: FIRST_RELEASE, applied: 0 },
+    { name: 'log colors', sql: LOG_COLORS, applied: 0 },
+    { name: 'users', sql: USERS, applied: 0 },
+    { name: 'reminders and user order', sql: REMINDERS, applied: 0 },
+    { name: 'restored reminders', sql: RESTORED_REMINDERS, applied: 0 },
+    { name: 'restored reminders, new install', sql: RESTORED_REMINDERS_NEW_INSTALL, applied: 0 }
+  ];
+  // Later releases before migrations existed built the next steps on startup,
+  // up to the cold storage index (migration 5)
+  for (let applied = 2; applied <= 5; applied++) {
+    cases.push({ name: `${MIGRATIONS[applied - 1].name}, unversioned`, sql: RESTORED_REMINDERS, applied });
+  }
+  for (let version = 1; version < LATEST_VERSION; version++) {
+    cases.push({ name: `version ${version}`, sql: [], applied: version, versioned: true });
+  }
+  return cases;
+}
+
+function open(file) {
+  return new Promise((resolve, reject) => {
+    const connection = new sqlite3.Database(file, sqlite3.OPEN_READWRITE | sqlite3.OPEN_CREATE,
+      (err) => (err ? reject(err) : resolve(connection)));
+  });
+}
+
+function close(connection) {
+  return new Promise((resolve) => connection.close(() => resolve()));
+}
+
+async function hasTable(connection, name) {
+  const rows = await db.allAsync(connection, "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", [name]);
+  return rows.length > 0;
+}
+
+// A few rows in whatever columns the old shape has, written the way its routes did
+async function seedRows(connection) {
+  if (await hasTable(connection, 'shift_logs')) {
+    const columns = (await db.allAsync(connection, 'PRAGMA table_info(shift_logs)')).map((column) => column.name);
+    const withText = columns.includes('note_text');
+    const notes = ['<p>Elevator <b>repaired</b></p>', 'Room 203 noise', 'Late check-out 412'];
+    for (const [i, note] of notes.entries()) {
+      await db.runAsync(connection,
+        `INSERT INTO shift_logs (short_description, note, worker_name, is_archived${withText ? ', note_text' : ''})
+         VALUES (?, ?, ?, ?${withText ? ', ?' : ''})`,
+        [`Entry ${i}`, note, 'MAR', i === 2 ? 1 : 0, ...(withText ? [noteToText(note)] : [])]);
+    }
+  }
+  if (await hasTable(connection, 'users')) {
+    const columns = (await db.allAsync(connection, 'PRAGMA table_info(users)')).map((column) => column.name);
+    const ordered = columns.includes('display_order');
+    for (const [i, username] of ['admin', 'FO'].entries()) {
+      await db.runAsync(connection,
+        `INSERT INTO users (username, password_hash${ordered ? ', display_order' : ''}) VALUES (?, ?${ordered ? ', ?' : ''})`,
+        [username, 'x', ...(ordered ? [i + 1] : [])]);
+    }
+  }
+}
+
+async function buildDatabase(file, testCase) {
+  const connection = await open(file);
+  for (const sql of testCase.sql) {
+    await db.runAsync(connection, sql);
+  }
+  for (let version = 1; version <= testCase.applied; version++) {
+    await MIGRATIONS[version - 1].up(connection);
+  }
+  await seedRows(connection);
+  if (testCase.versioned) {
+    await db.runAsync(connection, `PRAGMA user_version = ${testCase.applied}`);
+  }
+  return connection;
+}
+
+// Tables with their columns, indexes with their columns, triggers; ignores
+// column order and CREATE statement text, which differ between old and new
+async function schemaOf(connection) {
+  const objects = await db.allAsync(connection,
+    "SELECT type, name, tbl_name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name");
+  const lines = [];
+  for (const { type, name, tbl_name: table } of objects) {
+    if (type === 'table') {
+      const columns = await db.allAsync(connection, `PRAGMA table_info("${name}")`);
+      const described = columns
+        .map((c) => `${c.name} ${c.type}${c.notnull ? ' NOT NULL' : ''}${c.dflt_value !== null ? ` DEFAULT ${c.dflt_value}` : ''}${c.pk ? ' PK' : ''}`)
+        .sort();
+      lines.push(`table ${name} (${described.join(', ')})`);
+    } else if (type === 'index') {
+      const columns = await db.allAsync(connection, `PRAGMA index_info("${name}")`);
+      lines.push(`index ${name} ON ${table}(${columns.map((c) => c.name).join(', ')})`);
+    } else {
+      lines.push(`${type} ${name} ON ${table}`);
+    }
+  }
+  return lines;
+}
+
+function diff(expected, actual) {
+  const missing = expected.filter((line) => !actual.includes(line)).map((line) => `missing: ${line}`);
+  const extra = actual.filter((line) => !expected.includes(line)).map((line) => `unexpected: ${line}`);
+  return [...missing, ...extra];
+}
+
+async function checkCase(testCase, expectedSchema, file) {
+  const problems = [];
+  const connection = await buildDatabase(file, testCase);
+  try {
+    const seeded = await hasTable(connection, 'shift_logs');
+    await migrate(connection, quiet);
+
+    const version = await getSchemaVersion(connection);
+    if (version !== LATEST_VERSION) {
+      problems.push(`user_version is ${version}, expected ${LATEST_VERSION}`);
+    }
+    problems.push(...diff(expectedSchema, await schemaOf(connection)));
+
+    if (seeded) {
+      const [{ count }] = await db.allAsync(connection, 'SELECT COUNT(*) AS count FROM shift_logs WHERE note_text IS NOT NULL');
+      if (count !== 3) problems.push(`${count} of 3 log entries have note_text`);
+      const found = await db.allAsync(connection, "SELECT rowid FROM shift_logs_fts WHERE shift_logs_fts MATCH 'repaired'");
+      if (found.length !== 1) problems.push(`search index finds ${found.length} entries, expected 1`);
+    }
+    if (await hasTable(connection, 'users')) {
+      const unordered = await db.allAsync(connection, 'SELECT id FROM users WHERE display_order = 0 OR display_order IS NULL');
+      if (unordered.length > 0) problems.push(`${unordered.length} user(s) without display_order`);
+    }
+
+    // A current schema: the version is read and nothing else runs
+    const statements = [];
+    connection.on('trace', (sql) => statements.push(sql));
+    const applied = await migrate(connection, quiet);
+    connection.removeAllListeners('trace');
+    if (applied !== 0 || statements.length !== 1) {
+      problems.push(`second run applied ${applied} migration(s) with ${statements.length} statement(s), expected 0 with 1`);
+    }
+  } finally {
+    await close(connection);
+  }
+  return problems;
+}
+
+async function checkNewerSchema(file) {
+  const connection = await open(file);
+  try {
+    await db.runAsync(connection, `PRAGMA user_version = ${LATEST_VERSION + 1}`);
+    await migrate(connection, quiet);
+    return ['a schema from a newer release was not refused'];
+  } catch (error) {
+    return [];
+  } finally {
+    await close(connection);
+  }
+}
+
+async function checkMigrations() {
+  let failures = 0;
+
+  try {
+    const fresh = await open(path.join(SCRATCH_DIR, 'expected.db'));
+    await migrate(fresh, quiet);
+    const expectedSchema = await schemaOf(fresh);
+    await close(fresh);
+
+    const cases = buildCases();
+    for (const [i, testCase] of cases.entries()) {
+      const problems = await checkCase(testCase, expectedSchema, path.join(SCRATCH_DIR, `case${i}.db`));
+      if (problems.length === 0) {
+        console.log(`✓ ${testCase.name}`);
+      } else {
+        failures += 1;
+        console.log(`✗ ${testCase.name}`);
+        problems.forEach((problem) => console.log(`    ${problem}`));
+      }
+    }
+
+    const problems = await checkNewerSchema(path.join(SCRATCH_DIR, 'newer.db'));
+    console.log(`${problems.length === 0 ? '✓' : '✗'} newer schema refused`);
+    failures += problems.length;
+  } catch (error) {
+    console.error('Migration check failed:', error);
+    failures += 1;
+  } finally {
+    fs.rmSync(SCRATCH_DIR, { recursive: true, force: true });
+  }
+
+  if (failures > 0) {
+    console.log(`\n${failures} migration check(s) failed`);
+    process.exit(1);
+  }
+  console.log(`\nAll schema shapes migrate to version ${LATEST_VERSION}`);
+  process.exit(0);
+}
+
+checkMigrations();
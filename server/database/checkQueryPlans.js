@@ -0,0 +1,139 @@
+// Query plan regression check for the log routes
+// Seeds a scratch database with many rows, runs EXPLAIN QUERY PLAN on the
+// queries used by routes/logs.js and fails if any of them falls back to a
+// full table scan (or to a sort where the index should give the order).
+//
+// Usage: npm run check-plans [-- rows]
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
+const SCRATCH_DB = path.join(os.tmpdir(), `shift_logs_plans_${process.pid}.db`);
+process.env.DB_PATH = SCRATCH_DB;
+process.env.NODE_ENV = process.env.NODE_ENV || 'production';
+
+const db = require('./db');
+const { LOG_COLUMNS, buildListQuery, buildSearchQuery } = require('../utils/logQueries');
+
+const DEFAULT_ROWS = 20000;
+const WORKERS = ['MAR', 'JDO', 'ANA', 'TOM', 'LIS'];
+
+function run(database, sql, params = []) {
+  return new Promise((resolve, reject) => {
+    database.run(sql, params, (err) => (err ? reject(err) : resolve()));
+  });
+}
+
+function all(database, sql, params = []) {
+  return new Promise((resolve, reject) => {
+    database.all(sql, params, (err, rows) => (err ? reject(err) : resolve(rows)));
+  });
+}
+
+// Mostly archived history with a small active set, like a long-running install
+async function seedRows(database, count) {
+  const start = Date.UTC(2020, 0, 1);
+  await run(database, 'BEGIN');
+  for (let i = 0; i < count; i++) {
+    const logDate = new Date(start + i * 15 * 60 * 1000).toISOString();
+    const isArchived = i < count * 0.95 ? 1 : 0;
+    const isDeleted = i % 97 === 0 ? 1 : 0;
+    const reminderDate = i % 211 === 0 ? '2099-01-01 00:00:00' : null;
+    await run(database,
+      `INSERT INTO shift_logs (log_date, short_description, note, note_text, worker_name, is_archived, is_deleted, reminder_date)
+       VALUES (?, ?, ?, ?, ?, ?, ?, ?)`,
+      [logDate, `Entry ${i}`, `<p>Room ${i % 400} checked</p>`, `Room ${i % 400} checked`,
+        WORKERS[i % WORKERS.length], isArchived, isDeleted, reminderDate]);
+  }
+  await run(database, 'COMMIT');
+}
+
+// Each case: the SQL and params, and whether the index must provide the order
+function buildCases() {
+  const cases = [];
+  const cursor = { logDate: '2020-03-01T00:00:00.000Z', id: 5000 };
+  const filterSets = {
+    'no filters': {},
+    'worker': { worker_name: 'MAR' },
+    'date range': { start_date: '2020-02-01', end_date: '2020-06-01' },
+    'full-text search': { search: 'room 12' },
+    'substring search': { search: '#' }
+  };
+
+  for (const archived of [false, true]) {
+    const view = archived ? 'archive' : 'active';
+    for (const [name, filters] of Object.entries(filterSets)) {
+      const pageQuery = buildListQuery({ archived, ...filters, limit: 20, offset: 40 });
+      const cursorQuery = buildListQuery({ archived, ...filters, after: cursor, limit: 21 });
+      cases.push({ name: `${view} list, ${name}`, sql: pageQuery.query, params: pageQuery.params, sorted: true });
+      cases.push({ name: `${view} list, ${name}, cursor`, sql: cursorQuery.query, params: cursorQuery.params, sorted: true });
+      cases.push({ name: `${view} count, ${name}`, sql: pageQuery.countQuery, params: pageQuery.countParams });
+    }
+  }
+
+  for (const query of ['room 12', '#']) {
+    const search = buildSearchQuery({ query, worker_name: 'MAR' });
+    cases.push({ name: `search route, "${query}"`, sql: search.query, params: search.params });
+  }
+
+  // Single entry lookups and updates
+  cases.push({ name: 'get by id', sql: `SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ? AND is_deleted = 0`, params: [1] });
+  cases.push({ name: 'update by id', sql: 'UPDATE shift_logs SET is_archived = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?', params: [1, 1] });
+
+  return cases;
+}
+
+function checkPlan(testCase, plan) {
+  const problems = [];
+  for (const step of plan) {
+    if (/^SCAN shift_logs( |$)/.test(step.detail)) {
+      problems.push(`full scan: ${step.detail}`);
+    }
+    if (testCase.sorted && /USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY/.test(step.detail)) {
+      problems.push(`sort instead of index order: ${step.detail}`);
+    }
+  }
+  return problems;
+}
+
+async function checkQueryPlans() {
+  const rowCount = parseInt(process.argv[2]) || DEFAULT_ROWS;
+  let failures = 0;
+
+  try {
+    await db.initialize();
+    const database = db.getDb();
+
+    console.log(`Seeding ${rowCount} rows into ${SCRATCH_DB}...`);
+    await seedRows(database, rowCount);
+
+    for (const testCase of buildCases()) {
+      const plan = await all(database, `EXPLAIN QUERY PLAN ${testCase.sql}`, testCase.params);
+      const problems = checkPlan(testCase, plan);
+      if (problems.length === 0) {
+        console.log(`✓ ${testCase.name}`);
+      } else {
+        failures += 1;
+        console.log(`✗ ${testCase.name}`);
+        problems.forEach((problem) => console.log(`    ${problem}`));
+      }
+    }
+  } catch (error) {
+    console.error('Query plan check failed:', error);
+    failures += 1;
+  } finally {
+    await db.close().catch(() => {});
+    for (const suffix of ['', '-wal', '-shm']) {
+      fs.rmSync(SCRATCH_DB + suffix, { force: true });
+    }
+  }
+
+  if (failures > 0) {
+    console.log(`\n${failures} query plan check(s) failed`);
+    process.exit(1);
+  }
+  console.log('\nAll query plans use indexes');
+  process.exit(0);
+}
+
+checkQueryPlans();
@@ -0,0 +1,466 @@
+const fs = require('fs');
+const path = require('path');
+const db = require('./db');
+const { LOG_COLUMNS, buildListQuery, buildSearchQuery } = require('../utils/logQueries');
+const { DEFAULT_CONFIG, getConfig } = require('../utils/configLoader');
+const { notifyLogChange } = require('../utils/logEvents');
+
+// Hot/cold storage of old log entries
+// Entries archived or deleted more than archive_cold_after_days ago
+// (config.json) are moved out of shift_logs into one database file per year
+// of their log date, data/archive/shift_logs_<year>.db, with the same
+// columns, list index and search index. shift_logs keeps only the recent
+// history, however old the install is.
+// - The archive list and search ATTACH the year files their date range
+//   needs (see utils/logQueries.js); the active list never reads them
+// - Changing a cold entry moves it back to shift_logs first (restoreColdLog)
+// - A move copies a batch into the year file, then deletes it from
+//   shift_logs in a second transaction: SQLite does not commit attached WAL
+//   databases atomically together. cold_log_ids (database/db.js) decides
+//   which copy counts; a copy left behind is never read, and the next move
+//   into that year file removes it.
+
+const COLD_DIR = path.join(db.DB_DIR, 'archive');
+const MAX_ATTACHED = 10;                   // SQLite's default limit per connection
+const MOVE_BATCH_SIZE = 500;               // Rows per transaction, keeps the writer lock short
+const FIRST_RUN_DELAY_MS = 5 * 60 * 1000;  // Out of the way of the server start
+const RUN_INTERVAL_MS = 24 * 60 * 60 * 1000;
+
+// Stored columns: the ones sent to clients plus the search text
+const COLUMNS = [
+  'id', 'log_date', 'short_description', 'note', 'worker_name', 'color', 'created_at', 'updated_at',
+  'is_archived', 'is_deleted', 'reminder_date', 'original_log_date', 'note_text'
+];
+const COLUMN_LIST = COLUMNS.join(', ');
+const SAME_ROW = COLUMNS.map((column) => `cold.${column} IS hot.${column}`).join(' AND ');
+
+// Archived without a pending reminder (those come back by themselves), or deleted
+const MOVABLE = `(is_deleted = 1 OR (is_archived = 1 AND reminder_date IS NULL))
+  AND updated_at <= datetime('now', ?)
+  AND log_date GLOB '[0-9][0-9][0-9][0-9]-*'`;
+
+let reader = null;
+let writer = null;
+let archiving = null;
+let archiveTimer = null;
+let scheduled = false;
+
+function coldSchema(year) {
+  return `cold_${year}`;
+}
+
+function coldFile(year) {
+  return path.join(COLD_DIR, `shift_logs_${year}.db`);
+}
+
+// Runs tasks one after another; ATTACH/DETACH and transactions on a shared
+// connection must not interleave with another request's statements
+function createLock() {
+  let tail = Promise.resolve();
+  return (task) => {
+    const result = tail.then(task);
+    tail = result.catch(() => {});
+    return result;
+  };
+}
+
+function openHandle(label, readOnly) {
+  return {
+    connection: db.openSerializedConnection(label, readOnly),
+    attached: new Set(), // Years, least recently used first
+    lock: createLock()
+  };
+}
+
+function getReader() {
+  if (!reader) reader = openHandle('cold storage reader', true);
+  return reader;
+}
+
+function getWriter() {
+  if (!writer) writer = openHandle('cold storage writer', false);
+  return writer;
+}
+
+// Attach the year files (at most MAX_ATTACHED), detaching the least recently used
+async function attachYears(handle, years) {
+  for (const year of years) {
+    if (handle.attached.has(year)) {
+      handle.attached.delete(year);
+      handle.attached.add(year);
+      continue;
+    }
+    if (handle.attached.size >= MAX_ATTACHED) {
+      const unused = [...handle.attached].find((attachedYear) => !years.includes(attachedYear));
+      await db.runAsync(handle.connection, `DETACH DATABASE ${coldSchema(unused)}`);
+      handle.attached.delete(unused);
+    }
+    await db.runAsync(handle.connection, `ATTACH DATABASE ? AS ${coldSchema(year)}`, [coldFile(year)]);
+    handle.attached.add(year);
+  }
+}
+
+// Same columns as shift_logs, but rows are only ever inserted and deleted.
+// Ids are kept: AUTOINCREMENT in shift_logs never hands them out again.
+async function createColdTables(connection, schema) {
+  await db.runAsync(connection, `PRAGMA ${schema}.journal_mode = WAL`);
+  await db.runAsync(connection, `
+    CREATE TABLE IF NOT EXISTS ${schema}.shift_logs (
+      id INTEGER PRIMARY KEY,
+      log_date DATETIME NOT NULL,
+      short_description VARCHAR(50) NOT NULL,
+      note TEXT NOT NULL,
+      worker_name VARCHAR(3) NOT NULL,
+      color VARCHAR(20) DEFAULT NULL,
+      created_at TIMESTAMP,
+      updated_at TIMESTAMP,
+      is_archived BOOLEAN DEFAULT 0,
+      is_deleted BOOLEAN DEFAULT 0,
+      reminder_date DATETIME DEFAULT NULL,
+      original_log_date DATETIME DEFAULT NULL,
+      note_text TEXT DEFAULT NULL
+    )
+  `);
+  await db.runAsync(connection,
+    `CREATE INDEX IF NOT EXISTS ${schema}.idx_logs_visible ON shift_logs(is_deleted, is_archived, log_date)`);
+  await db.runAsync(connection, `
+    CREATE VIRTUAL TABLE IF NOT EXISTS ${schema}.shift_logs_fts USING fts5(
+      short_description, note_text, worker_name,
+      content = 'shift_logs', content_rowid = 'id',
+      tokenize = 'unicode61 remove_diacritics 2'
+    )
+  `);
+  await db.runAsync(connection, `
+    CREATE TRIGGER IF NOT EXISTS ${schema}.shift_logs_fts_ai AFTER INSERT ON shift_logs BEGIN
+      INSERT INTO shift_logs_fts(rowid, short_description, note_text, worker_name)
+      VALUES (new.id, new.short_description, new.note_text, new.worker_name);
+    END
+  `);
+  await db.runAsync(connection, `
+    CREATE TRIGGER IF NOT EXISTS ${schema}.shift_logs_fts_ad AFTER DELETE ON shift_logs BEGIN
+      INSERT INTO shift_logs_fts(shift_logs_fts, rowid, short_description, note_text, worker_name)
+      VALUES ('delete', old.id, old.short_description, old.note_text, old.worker_name);
+    END
+  `);
+}
+
+async function inTransaction(connection, work) {
+  await db.runAsync(connection, 'BEGIN');
+  try {
+    const result = await work();
+    await db.runAsync(connection, 'COMMIT');
+    return result;
+  } catch (err) {
+    await db.runAsync(connection, 'ROLLBACK').catch(() => {});
+    throw err;
+  }
+}
+
+// Attach and create a year file, and drop copies left by an interrupted
+// move or restore (the shift_logs row is the one that counts)
+async function prepareYear(handle, year) {
+  const schema = coldSchema(year);
+  await fs.promises.mkdir(COLD_DIR, { recursive: true });
+  await attachYears(handle, [year]);
+  await createColdTables(handle.connection, schema);
+  await db.runAsync(handle.connection,
+    `DELETE FROM ${schema}.shift_logs WHERE id IN (SELECT id FROM main.shift_logs)`);
+}
+
+// Move the next batch of one year, after lastId; resolves with the batch ids and moved count
+async function moveBatch(handle, year, cutoff, lastId) {
+  const { connection } = handle;
+  const schema = coldSchema(year);
+
+  const rows = await db.allAsync(connection,
+    `SELECT id FROM main.shift_logs
+     WHERE ${MOVABLE} AND log_date >= ? AND log_date < ? AND id > ?
+     ORDER BY id LIMIT ${MOVE_BATCH_SIZE}`,
+    // 'YYYY-' bounds: a bare year would be compared as a number (DATETIME affinity)
+    [cutoff, `${year}-`, `${year + 1}-`, lastId]);
+  const ids = rows.map((row) => row.id);
+  if (ids.length === 0) return { ids, moved: 0 };
+  const idList = ids.join(', ');
+
+  // 1. Copy into the year file
+  await inTransaction(connection, async () => {
+    await db.runAsync(connection, `DELETE FROM ${schema}.shift_logs WHERE id IN (${idList})`);
+    await db.runAsync(connection,
+      `INSERT INTO ${schema}.shift_logs (${COLUMN_LIST}) SELECT ${COLUMN_LIST} FROM main.shift_logs WHERE id IN (${idList})`);
+  });
+
+  // 2. Delete from shift_logs the rows copied unchanged; one edited in the
+  //    meantime stays hot, and the next run drops its copy
+  const moved = await inTransaction(connection, async () => {
+    await db.runAsync(connection,
+      `INSERT OR REPLACE INTO main.cold_log_ids (id, year)
+       SELECT hot.id, ? FROM main.shift_logs AS hot
+       JOIN ${schema}.shift_logs AS cold ON cold.id = hot.id
+       WHERE hot.id IN (${idList}) AND ${SAME_ROW}`,
+      [year]);
+    const result = await db.runAsync(connection,
+      `DELETE FROM main.shift_logs WHERE id IN (SELECT id FROM main.cold_log_ids WHERE id IN (${idList}))`);
+    await db.runAsync(connection, 'INSERT OR IGNORE INTO main.cold_years (year) VALUES (?)', [year]);
+    return result.changes;
+  });
+
+  return { ids, moved };
+}
+
+async function moveToCold(olderThanDays) {
+  const handle = getWriter();
+  const cutoff = `-${olderThanDays} days`;
+  const years = await handle.lock(() => db.allAsync(handle.connection,
+    `SELECT DISTINCT CAST(substr(log_date, 1, 4) AS INTEGER) AS year FROM main.shift_logs
+     WHERE ${MOVABLE} ORDER BY year`,
+    [cutoff]));
+
+  const result = { moved: 0, years: {} };
+  for (const { year } of years) {
+    await handle.lock(() => prepareYear(handle, year));
+    let lastId = 0;
+    for (;;) {
+      // Lock per batch, so a restore waits for one batch, not the whole run
+      const batch = await handle.lock(() => moveBatch(handle, year, cutoff, lastId));
+      if (batch.ids.length === 0) break;
+      lastId = batch.ids[batch.ids.length - 1];
+      result.moved += batch.moved;
+      result.years[year] = (result.years[year] || 0) + batch.moved;
+    }
+  }
+
+  if (result.moved > 0) {
+    notifyLogChange();
+  }
+  return result;
+}
+
+/**
+ * Days after which archived and deleted entries go to cold storage (0 = never)
+ */
+function getColdAfterDays() {
+  const days = parseInt(getConfig().archive_cold_after_days, 10);
+  return isNaN(days) ? DEFAULT_CONFIG.archive_cold_after_days : days;
+}
+
+/**
+ * Move entries archived or deleted more than olderThanDays days ago to cold storage
+ * Only one run at a time per process; resolves with { moved, years: { year: count } }
+ */
+function runColdArchive(olderThanDays = getColdAfterDays()) {
+  if (!archiving) {
+    archiving = moveToCold(olderThanDays).finally(() => {
+      archiving = null;
+    });
+  }
+  return archiving;
+}
+
+/**
+ * Cold years the archive list or search has to read for a date range
+ * (all of them without a range)
+ */
+async function coldYearsFor({ start_date, end_date } = {}) {
+  const rows = await db.allAsync(db.getReadDb(), 'SELECT year FROM cold_years ORDER BY year');
+  const first = parseInt(String(start_date || '').slice(0, 4), 10);
+  const last = parseInt(String(end_date || '').slice(0, 4), 10);
+  return rows
+    .map((row) => row.year)
+    .filter((year) => (isNaN(first) || year >= first) && (isNaN(last) || year <= last));
+}
+
+// Groups of years that can be attached at once
+function inBatches(years) {
+  const batches = [];
+  for (let i = 0; i < years.length; i += MAX_ATTACHED) {
+    batches.push(years.slice(i, i + MAX_ATTACHED));
+  }
+  return batches;
+}
+
+function readCold(years, work) {
+  const handle = getReader();
+  return handle.lock(async () => {
+    await attachYears(handle, years);
+    return work(handle.connection);
+  });
+}
+
+function newestFirst(a, b) {
+  if (a.log_date !== b.log_date) return a.log_date < b.log_date ? 1 : -1;
+  return b.id - a.id;
+}
+
+/**
+ * Archive list page over shift_logs and the given cold years
+ * Takes the options of buildListQuery and resolves with { rows, total }
+ * (total is null unless withTotal). More years than can be attached at
+ * once are read in batches and merged.
+ */
+async function listColdLogs(years, options, withTotal) {
+  const batches = inBatches(years);
+  const merge = batches.length > 1;
+  const offset = options.offset || 0;
+  let rows = [];
+  let total = withTotal ? 0 : null;
+
+  for (const [index, batch] of batches.entries()) {
+    const { query, params, countQuery, countParams } = buildListQuery({
+      ...options,
+      coldSchemas: batch.map(coldSchema),
+      includeHot: index === 0,
+      // Any batch may hold the whole page
+      limit: merge ? offset + options.limit : options.limit,
+      offset: merge ? undefined : options.offset
+    });
+    await readCold(batch, async (connection) => {
+      if (withTotal) {
+        total += (await db.allAsync(connection, countQuery, countParams))[0].total;
+      }
+      rows = rows.concat(await db.allAsync(connection, query, params));
+    });
+  }
+
+  if (merge) {
+    rows = rows.sort(newestFirst).slice(offset, offset + options.limit);
+  }
+  return { rows, total };
+}
+
+/**
+ * Search over shift_logs and the given cold years, ranked like buildSearchQuery
+ */
+async function searchColdLogs(years, options) {
+  const batches = inBatches(years);
+  let rows = [];
+
+  for (const [index, batch] of batches.entries()) {
+    const { query, params } = buildSearchQuery({
+      ...options,
+      coldSchemas: batch.map(coldSchema),
+      includeHot: index === 0
+    });
+    rows = rows.concat(await readCold(batch, (connection) => db.allAsync(connection, query, params)));
+  }
+
+  if (batches.length > 1) {
+    rows.sort((a, b) => a.search_rank - b.search_rank || newestFirst(a, b));
+  }
+  return rows.map(({ search_rank, ...row }) => row);
+}
+
+function findColdYear(id) {
+  return db.allAsync(db.getReadDb(), 'SELECT year FROM cold_log_ids WHERE id = ?', [id])
+    .then((rows) => (rows.length > 0 ? rows[0].year : null));
+}
+
+/**
+ * A log entry in cold storage (not deleted), or null
+ */
+async function getColdLog(id) {
+  const year = await findColdYear(id);
+  if (year === null) return null;
+
+  const rows = await readCold([year], (connection) => db.allAsync(connection,
+    `SELECT ${LOG_COLUMNS} FROM ${coldSchema(year)}.shift_logs WHERE id = ? AND is_deleted = 0`, [id]));
+  return rows[0] || null;
+}
+
+/**
+ * Move a log entry back from cold storage to shift_logs, before it is changed
+ * Resolves with true if it was in cold storage
+ */
+async function restoreColdLog(id) {
+  const year = await findColdYear(id);
+  if (year === null) return false;
+
+  const handle = getWriter();
+  const schema = coldSchema(year);
+  const restored = await handle.lock(async () => {
+    const { connection } = handle;
+    await attachYears(handle, [year]);
+
+    const changes = await inTransaction(connection, async () => {
+      // No longer listed: restored by another worker in the meantime
+      const unlisted = await db.runAsync(connection, 'DELETE FROM main.cold_log_ids WHERE id = ?', [id]);
+      if (unlisted.changes === 0) return 0;
+      const inserted = await db.runAsync(connection,
+        `INSERT INTO main.shift_logs (${COLUMN_LIST}) SELECT ${COLUMN_LIST} FROM ${schema}.shift_logs WHERE id = ?`, [id]);
+      if (inserted.changes === 0) {
+        throw new Error(`Log entry ${id} is missing from ${path.basename(coldFile(year))}`);
+      }
+      return inserted.changes;
+    });
+
+    // The cold copy no longer counts; removing it is a transaction of its own
+    await db.runAsync(connection, `DELETE FROM ${schema}.shift_logs WHERE id = ?`, [id]);
+    return changes > 0;
+  });
+
+  if (restored) {
+    notifyLogChange();
+  }
+  return restored;
+}
+
+function scheduleArchive(delay) {
+  archiveTimer = setTimeout(async () => {
+    const days = getColdAfterDays();
+    try {
+      if (days > 0) {
+        const { moved } = await runColdArchive(days);
+        if (moved > 0) {
+          console.log(`Cold storage: moved ${moved} log(s) archived more than ${days} days ago`);
+        }
+      }
+    } catch (err) {
+      console.error('Error moving logs to cold storage:', err);
+    }
+    if (scheduled) scheduleArchive(RUN_INTERVAL_MS);
+  }, delay);
+  // Don't keep the process alive just for the archive timer
+  archiveTimer.unref();
+}
+
+/**
+ * Move old entries to cold storage once a day (first run a few minutes after start)
+ * Returns a function to stop it
+ */
+function startColdArchiver() {
+  scheduled = true;
+  scheduleArchive(FIRST_RUN_DELAY_MS);
+
+  return () => {
+    scheduled = false;
+    clearTimeout(archiveTimer);
+    archiveTimer = null;
+  };
+}
+
+function closeHandle(handle) {
+  return handle.lock(() => new Promise((resolve, reject) => {
+    handle.connection.close((err) => (err ? reject(err) : resolve()));
+  }));
+}
+
+/**
+ * Close the cold storage connections (scripts)
+ */
+async function closeColdStorage() {
+  const handles = [reader, writer].filter(Boolean);
+  reader = null;
+  writer = null;
+  await Promise.all(handles.map(closeHandle));
+}
+
+module.exports = {
+  getColdAfterDays,
+  runColdArchive,
+  startColdArchiver,
+  coldYearsFor,
+  listColdLogs,
+  searchColdLogs,
+  getColdLog,
+  restoreColdLog,
+  closeColdStorage
+};
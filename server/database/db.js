@@ -1,8 +1,10 @@
 const sqlite3 = require('sqlite3').verbose();
 const path = require('path');
 const fs = require('fs');
+const { recordQuery } = require('../utils/metrics');
 
-const DB_PATH = path.join(__dirname, '../../data/shift_logs.db');
+// DB_PATH can point scripts (e.g. checkQueryPlans.js) at a scratch database
+const DB_PATH = process.env.DB_PATH || path.join(__dirname, '../../data/shift_logs.db');
 const DB_DIR = path.dirname(DB_PATH);
 
 // Ensure data directory exists
@@ -10,177 +12,145 @@ if (!fs.existsSync(DB_DIR)) {
   fs.mkdirSync(DB_DIR, { recursive: true });
 }
 
+// Connection tuning (applied to every connection)
+// - WAL lets readers run while the writer commits (set once, persisted in the file)
+// - synchronous=NORMAL is safe in WAL mode and avoids an fsync per commit
+// - busy_timeout waits for a lock instead of failing with SQLITE_BUSY
+const BUSY_TIMEOUT_MS = 5000;
+const CONNECTION_PRAGMAS = [
+  'PRAGMA cache_size = -16000', // 16 MB page cache
+  'PRAGMA mmap_size = 268435456', // 256 MB memory-mapped I/O
+  'PRAGMA temp_store = MEMORY'
+];
+const WRITER_PRAGMAS = [
+  'PRAGMA journal_mode = WAL',
+  'PRAGMA synchronous = NORMAL',
+  ...CONNECTION_PRAGMAS
+];
+const READER_PRAGMAS = [
+  ...CONNECTION_PRAGMAS,
+  'PRAGMA query_only = 1'
+];
+
+// Read-only connections for GET routes; sqlite3 runs each connection's
+// queries on libuv's thread pool, so several readers can work in parallel
+const READ_POOL_SIZE = parseInt(process.env.DB_READ_POOL_SIZE, 10) || 4;
+
 let db = null;
+let readPool = [];
+let nextReader = 0;
+
+function openConnection(mode, pragmas, label) {
+  const connection = new sqlite3.Database(DB_PATH, mode, (err) => {
+    if (err) {
+      console.error(`Error opening database (${label}):`, err.message);
+    } else if (process.env.NODE_ENV !== 'production') {
+      console.log(`Connected to SQLite database (${label})`);
+    }
+  });
+  connection.configure('busyTimeout', BUSY_TIMEOUT_MS);
+  // Statement timings for /api/metrics (utils/metrics.js)
+  connection.on('profile', recordQuery);
+  connection.serialize(() => {
+    pragmas.forEach((pragma) => {
+      connection.run(pragma, (err) => {
+        if (err) console.error(`Error applying "${pragma}" (${label}):`, err.message);
+      });
+    });
+  });
+  return connection;
+}
 
+// Dedicated writer connection - used for every INSERT/UPDATE/DELETE and for
+// reads that must see the caller's own uncommitted work
 function getDb() {
   if (!db) {
-    db = new sqlite3.Database(DB_PATH, (err) => {
-      if (err) {
-        console.error('Error opening database:', err.message);
-      } else if (process.env.NODE_ENV !== 'production') {
-        console.log('Connected to SQLite database');
-      }
-    });
+    db = openConnection(sqlite3.OPEN_READWRITE | sqlite3.OPEN_CREATE, WRITER_PRAGMAS, 'writer');
   }
   return db;
 }
 
+// Connection of its own for work that changes connection state (ATTACH of
+// the cold storage files, see database/coldStorage.js); its statements run
+// one at a time, in the order they were queued
+function openSerializedConnection(label, readOnly = false) {
+  getDb();
+  const connection = readOnly
+    ? openConnection(sqlite3.OPEN_READONLY, READER_PRAGMAS, label)
+    : openConnection(sqlite3.OPEN_READWRITE, CONNECTION_PRAGMAS, label);
+  connection.serialize();
+  return connection;
+}
+
+// Read-only connection from the pool (round-robin)
+// Opened lazily, after initialize() has created the database file
+function getReadDb() {
+  if (readPool.length === 0) {
+    getDb();
+    for (let i = 0; i < READ_POOL_SIZE; i++) {
+      readPool.push(openConnection(sqlite3.OPEN_READONLY, READER_PRAGMAS, `reader ${i + 1}`));
+    }
+  }
+  const connection = readPool[nextReader];
+  nextReader = (nextReader + 1) % readPool.length;
+  return connection;
+}
+
+// Creates the schema or brings it up to date (see database/migrations.js)
 function initialize() {
+  // Required here: migrations.js uses this module's helpers
+  const { migrate } = require('./migrations');
+  return migrate(getDb());
+}
+
+function runAsync(connection, sql, params = []) {
   return new Promise((resolve, reject) => {
-    const database = getDb();
-    
-    database.serialize(() => {
-      database.run(`
-        CREATE TABLE IF NOT EXISTS shift_logs (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          log_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-          short_description VARCHAR(50) NOT NULL,
-          note TEXT NOT NULL,
-          worker_name VARCHAR(3) NOT NULL,
-          color VARCHAR(20) DEFAULT NULL,
-          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-          updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-          is_archived BOOLEAN DEFAULT 0,
-          is_deleted BOOLEAN DEFAULT 0
-        )
-      `, (err) => {
-        if (err) {
-          console.error('Error creating table:', err.message);
-          reject(err);
-        } else {
-          if (process.env.NODE_ENV !== 'production') {
-            console.log('Database table initialized');
-          }
-          
-          // Add color column if it doesn't exist (for existing databases)
-          database.run(`
-            ALTER TABLE shift_logs ADD COLUMN color VARCHAR(20) DEFAULT NULL
-          `, (alterErr) => {
-            // Ignore error if column already exists
-            if (alterErr && !alterErr.message.includes('duplicate column') && process.env.NODE_ENV !== 'production') {
-              console.log('Note: color column may already exist');
-            }
-          });
-          
-          // Create indexes
-          database.run('CREATE INDEX IF NOT EXISTS idx_log_date ON shift_logs(log_date)', (err) => {
-            if (err) console.error('Error creating date index:', err);
-          });
-          
-          database.run('CREATE INDEX IF NOT EXISTS idx_worker_name ON shift_logs(worker_name)', (err) => {
-            if (err) console.error('Error creating worker index:', err);
-          });
-          
-          database.run('CREATE INDEX IF NOT EXISTS idx_archived ON shift_logs(is_archived)', (err) => {
-            if (err) console.error('Error creating archive index:', err);
-          });
-          
-          // Add reminder_date column if it doesn't exist (for existing databases)
-          database.run(`
-            ALTER TABLE shift_logs ADD COLUMN reminder_date DATETIME DEFAULT NULL
-          `, (alterErr) => {
-            // Ignore error if column already exists
-            if (alterErr && !alterErr.message.includes('duplicate column') && process.env.NODE_ENV !== 'production') {
-              console.log('Note: reminder_date column may already exist');
-            }
-          });
-          
-          // Create index for reminder_date
-          database.run('CREATE INDEX IF NOT EXISTS idx_reminder_date ON shift_logs(reminder_date)', (err) => {
-            if (err) console.error('Error creating reminder_date index:', err);
-          });
-
-          // Add original_log_date for restored future reminders (stores original date when log_date becomes restoration date)
-          database.run(`
-            ALTER TABLE shift_logs ADD COLUMN original_log_date DATETIME DEFAULT NULL
-          `, (alterErr) => {
-            if (alterErr && !alterErr.message.includes('duplicate column') && process.env.NODE_ENV !== 'production') {
-              console.log('Note: original_log_date column may already exist');
-            }
-          });
-          
-          // Create users table
-          database.run(`
-            CREATE TABLE IF NOT EXISTS users (
-              id INTEGER PRIMARY KEY AUTOINCREMENT,
-              username VARCHAR(50) NOT NULL UNIQUE,
-              email VARCHAR(255) DEFAULT NULL,
-              password_hash VARCHAR(255) NOT NULL,
-              is_admin BOOLEAN DEFAULT 0,
-              display_order INTEGER DEFAULT 0,
-              created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-              updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-          `, (err) => {
-            if (err) {
-              console.error('Error creating users table:', err.message);
-              reject(err);
-            } else {
-              if (process.env.NODE_ENV !== 'production') {
-                console.log('Users table initialized');
-              }
-              
-              // Add display_order column if it doesn't exist (for existing databases)
-              database.run(`
-                ALTER TABLE users ADD COLUMN display_order INTEGER DEFAULT 0
-              `, (alterErr) => {
-                // Ignore error if column already exists
-                if (alterErr && !alterErr.message.includes('duplicate column') && process.env.NODE_ENV !== 'production') {
-                  console.log('Note: display_order column may already exist');
-                }
-                
-                // Initialize display_order for existing users
-                database.run(`
-                  UPDATE users SET display_order = id WHERE display_order = 0 OR display_order IS NULL
-                `, (updateErr) => {
-                  if (updateErr) console.error('Error initializing display_order:', updateErr);
-                });
-              });
-              
-              // Create indexes for users
-              database.run('CREATE INDEX IF NOT EXISTS idx_username ON users(username)', (err) => {
-                if (err) console.error('Error creating username index:', err);
-              });
-              
-              database.run('CREATE INDEX IF NOT EXISTS idx_is_admin ON users(is_admin)', (err) => {
-                if (err) console.error('Error creating admin index:', err);
-              });
-              
-              database.run('CREATE INDEX IF NOT EXISTS idx_display_order ON users(display_order)', (err) => {
-                if (err) console.error('Error creating display_order index:', err);
-              });
-              
-              resolve();
-            }
-          });
-        }
-      });
+    connection.run(sql, params, function(err) {
+      if (err) reject(err);
+      else resolve(this);
     });
   });
 }
 
-function close() {
+function allAsync(connection, sql, params = []) {
   return new Promise((resolve, reject) => {
-    if (db) {
-      db.close((err) => {
-        if (err) {
-          reject(err);
-        } else {
-          if (process.env.NODE_ENV !== 'production') {
-            console.log('Database connection closed');
-          }
-          db = null;
-          resolve();
-        }
-      });
-    } else {
-      resolve();
+    connection.all(sql, params, (err, rows) => {
+      if (err) reject(err);
+      else resolve(rows);
+    });
+  });
+}
+
+function closeConnection(connection) {
+  return new Promise((resolve, reject) => {
+    connection.close((err) => (err ? reject(err) : resolve()));
+  });
+}
+
+function close() {
+  const readers = readPool;
+  readPool = [];
+  nextReader = 0;
+  return Promise.all(readers.map(closeConnection)).then(() => {
+    if (!db) {
+      return;
     }
+    return closeConnection(db).then(() => {
+      if (process.env.NODE_ENV !== 'production') {
+        console.log('Database connection closed');
+      }
+      db = null;
+    });
   });
 }
 
 module.exports = {
+  DB_DIR,
   getDb,
+  getReadDb,
+  openSerializedConnection,
+  runAsync,
+  allAsync,
   initialize,
   close
 };
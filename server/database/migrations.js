@@ -0,0 +1,386 @@
+const db = require('./db');
+const { noteToText } = require('../utils/fullTextSearch');
+
+const BACKFILL_BATCH = 300;            // Rows per UPDATE; 3 parameters each, under SQLite's 999
+const LOCK_RETRY_MS = 250;
+const LOCK_WAIT_MS = 10 * 60 * 1000;   // Longest wait for another process's migration
+
+/**
+ * Schema migrations
+ * The schema version is kept in PRAGMA user_version: 0 for a new database
+ * or one created before migrations existed, else the version of the last
+ * migration applied. migrate() runs the pending migrations in order, each
+ * in a transaction of its own together with the version bump, and only
+ * reads user_version when the schema is current.
+ *
+ * Add new migrations at the end; never change one that has been released.
+ * npm run check-migrations upgrades every historical schema shape to the
+ * latest version and compares the result with a new database.
+ */
+
+// Columns of shift_logs and users that older releases added with ALTER TABLE;
+// an unversioned database may have any subset of them
+const LEGACY_COLUMNS = {
+  shift_logs: [
+    ['color', 'VARCHAR(20) DEFAULT NULL'],
+    ['reminder_date', 'DATETIME DEFAULT NULL'],
+    // Original date of a restored future reminder (log_date becomes the restoration date)
+    ['original_log_date', 'DATETIME DEFAULT NULL']
+  ],
+  users: [
+    ['display_order', 'INTEGER DEFAULT 0']
+  ]
+};
+
+async function addMissingColumns(database, table, columns) {
+  const existing = new Set((await db.allAsync(database, `PRAGMA table_info(${table})`)).map((column) => column.name));
+  for (const [name, definition] of columns) {
+    if (!existing.has(name)) {
+      await db.runAsync(database, `ALTER TABLE ${table} ADD COLUMN ${name} ${definition}`);
+    }
+  }
+}
+
+async function runAll(database, statements) {
+  for (const sql of statements) {
+    await db.runAsync(database, sql);
+  }
+}
+
+// Schema of the last release without migrations, from any older shape
+async function legacySchema(database) {
+  await db.runAsync(database, `
+    CREATE TABLE IF NOT EXISTS shift_logs (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      log_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+      short_description VARCHAR(50) NOT NULL,
+      note TEXT NOT NULL,
+      worker_name VARCHAR(3) NOT NULL,
+      color VARCHAR(20) DEFAULT NULL,
+      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      is_archived BOOLEAN DEFAULT 0,
+      is_deleted BOOLEAN DEFAULT 0,
+      reminder_date DATETIME DEFAULT NULL,
+      original_log_date DATETIME DEFAULT NULL
+    )
+  `);
+  await addMissingColumns(database, 'shift_logs', LEGACY_COLUMNS.shift_logs);
+
+  await db.runAsync(database, `
+    CREATE TABLE IF NOT EXISTS users (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      username VARCHAR(50) NOT NULL UNIQUE,
+      email VARCHAR(255) DEFAULT NULL,
+      password_hash VARCHAR(255) NOT NULL,
+      is_admin BOOLEAN DEFAULT 0,
+      display_order INTEGER DEFAULT 0,
+      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+      updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+  `);
+  await addMissingColumns(database, 'users', LEGACY_COLUMNS.users);
+  // Users created before display_order existed
+  await db.runAsync(database, 'UPDATE users SET display_order = id WHERE display_order = 0 OR display_order IS NULL');
+
+  await runAll(database, [
+    'CREATE INDEX IF NOT EXISTS idx_log_date ON shift_logs(log_date)',
+    'CREATE INDEX IF NOT EXISTS idx_worker_name ON shift_logs(worker_name)',
+    'CREATE INDEX IF NOT EXISTS idx_reminder_date ON shift_logs(reminder_date)',
+    'CREATE INDEX IF NOT EXISTS idx_username ON users(username)',
+    'CREATE INDEX IF NOT EXISTS idx_is_admin ON users(is_admin)',
+    'CREATE INDEX IF NOT EXISTS idx_display_order ON users(display_order)'
+  ]);
+}
+
+/**
+ * Full-text search index
+ * shift_logs_fts is an external-content FTS5 table over shift_logs
+ * (short_description, note_text, worker_name), kept in sync by triggers.
+ * note_text is filled by the routes; existing rows are backfilled here
+ * through the update trigger.
+ */
+async function searchIndex(database) {
+  await addMissingColumns(database, 'shift_logs', [['note_text', 'TEXT DEFAULT NULL']]);
+
+  const existing = await db.allAsync(database,
+    "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'shift_logs_fts'");
+
+  await db.runAsync(database, `
+    CREATE VIRTUAL TABLE IF NOT EXISTS shift_logs_fts USING fts5(
+      short_description, note_text, worker_name,
+      content = 'shift_logs', content_rowid = 'id',
+      tokenize = 'unicode61 remove_diacritics 2'
+    )
+  `);
+
+  await db.runAsync(database, `
+    CREATE TRIGGER IF NOT EXISTS shift_logs_fts_ai AFTER INSERT ON shift_logs BEGIN
+      INSERT INTO shift_logs_fts(rowid, short_description, note_text, worker_name)
+      VALUES (new.id, new.short_description, new.note_text, new.worker_name);
+    END
+  `);
+  await db.runAsync(database, `
+    CREATE TRIGGER IF NOT EXISTS shift_logs_fts_ad AFTER DELETE ON shift_logs BEGIN
+      INSERT INTO shift_logs_fts(shift_logs_fts, rowid, short_description, note_text, worker_name)
+      VALUES ('delete', old.id, old.short_description, old.note_text, old.worker_name);
+    END
+  `);
+  await db.runAsync(database, `
+    CREATE TRIGGER IF NOT EXISTS shift_logs_fts_au AFTER UPDATE OF short_description, note_text, worker_name ON shift_logs BEGIN
+      INSERT INTO shift_logs_fts(shift_logs_fts, rowid, short_description, note_text, worker_name)
+      VALUES ('delete', old.id, old.short_description, old.note_text, old.worker_name);
+      INSERT INTO shift_logs_fts(rowid, short_description, note_text, worker_name)
+      VALUES (new.id, new.short_description, new.note_text, new.worker_name);
+    END
+  `);
+
+  // A new index is built from the current rows first, so the backfill below
+  // only ever asks the update trigger to delete entries that are indexed
+  if (existing.length === 0) {
+    await db.runAsync(database, "INSERT INTO shift_logs_fts(shift_logs_fts) VALUES ('rebuild')");
+  }
+
+  // One UPDATE per batch of rows, read in id order so memory stays bounded
+  let lastId = 0;
+  for (;;) {
+    const rows = await db.allAsync(database,
+      `SELECT id, note FROM shift_logs WHERE note_text IS NULL AND id > ? ORDER BY id LIMIT ${BACKFILL_BATCH}`,
+      [lastId]);
+    if (rows.length === 0) break;
+
+    const params = [];
+    for (const row of rows) {
+      params.push(row.id, noteToText(row.note));
+    }
+    for (const row of rows) {
+      params.push(row.id);
+    }
+    await db.runAsync(database,
+      `UPDATE shift_logs SET note_text = CASE id ${rows.map(() => 'WHEN ? THEN ?').join(' ')} END
+       WHERE id IN (${rows.map(() => '?').join(', ')})`,
+      params);
+    lastId = rows[rows.length - 1].id;
+  }
+}
+
+// Active and archive lists walk this index in log_date order
+// (see utils/logQueries.js); it replaces the old idx_archived
+async function visibleLogsIndex(database) {
+  await runAll(database, [
+    'CREATE INDEX IF NOT EXISTS idx_logs_visible ON shift_logs(is_deleted, is_archived, log_date)',
+    'DROP INDEX IF EXISTS idx_archived'
+  ]);
+}
+
+/**
+ * Change feed for GET /api/logs/events (see utils/logEvents.js)
+ * Triggers record every change to a log entry in log_events, so changes made
+ * by any route, the reminder processor or another worker process get one
+ * increasing event id. Only the most recent events are kept for resuming.
+ */
+async function changeFeed(database) {
+  await db.runAsync(database, `
+    CREATE TABLE IF NOT EXISTS log_events (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      type VARCHAR(10) NOT NULL,
+      log_id INTEGER NOT NULL,
+      created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+  `);
+
+  await db.runAsync(database, `
+    CREATE TRIGGER IF NOT EXISTS log_events_ai AFTER INSERT ON shift_logs BEGIN
+      INSERT INTO log_events (type, log_id) VALUES ('created', new.id);
+    END
+  `);
+  // Reminder activation moves log_date into original_log_date (utils/reminderProcessor.js)
+  await db.runAsync(database, `
+    CREATE TRIGGER IF NOT EXISTS log_events_au
+    AFTER UPDATE OF log_date, short_description, note, worker_name, color, is_archived, is_deleted, reminder_date ON shift_logs
+    BEGIN
+      INSERT INTO log_events (type, log_id) VALUES (
+        CASE
+          WHEN new.is_deleted = 1 AND old.is_deleted = 0 THEN 'deleted'
+          WHEN old.reminder_date IS NOT NULL AND new.reminder_date IS NULL
+            AND new.original_log_date IS NOT old.original_log_date THEN 'reminder'
+          WHEN new.is_archived != old.is_archived THEN 'archived'
+          ELSE 'updated'
+        END,
+        new.id
+      );
+    END
+  `);
+  await db.runAsync(database, `
+    CREATE TRIGGER IF NOT EXISTS log_events_prune AFTER INSERT ON log_events
+    WHEN new.id % 100 = 0
+    BEGIN
+      DELETE FROM log_events WHERE id <= new.id - 1000;
+    END
+  `);
+}
+
+/**
+ * Index of the entries moved to cold storage (see database/coldStorage.js)
+ * cold_log_ids maps each moved id to the year file that holds it;
+ * cold_years lists the year files, so a query knows which ones to attach.
+ */
+async function coldIndex(database) {
+  await runAll(database, [
+    `CREATE TABLE IF NOT EXISTS cold_log_ids (
+      id INTEGER PRIMARY KEY,
+      year INTEGER NOT NULL
+    )`,
+    'CREATE TABLE IF NOT EXISTS cold_years (year INTEGER PRIMARY KEY)'
+  ]);
+}
+
+/**
+ * Login state shared by the worker processes
+ * login_attempts holds the failure counters and blocks of
+ * utils/loginAttempts.js (times in ms since the epoch). Counters and blocks
+ * are each capped at 10000 rows (MAX_TRACKED there): the triggers evict the
+ * least recently failed counter, or the block expiring first, in the same
+ * statement that goes over the cap. auth_invalidations tells the other
+ * workers which users' cached tokens to drop (utils/authCache.js). Only the
+ * most recent invalidations are kept.
+ */
+async function sharedLoginState(database) {
+  await runAll(database, [
+    `CREATE TABLE IF NOT EXISTS login_attempts (
+      identifier TEXT PRIMARY KEY,
+      count INTEGER NOT NULL DEFAULT 0,
+      last_failure INTEGER NOT NULL,
+      blocked_until INTEGER DEFAULT NULL
+    )`,
+    `CREATE INDEX IF NOT EXISTS idx_login_attempts_counting ON login_attempts(last_failure)
+     WHERE blocked_until IS NULL`,
+    `CREATE INDEX IF NOT EXISTS idx_login_attempts_blocked ON login_attempts(blocked_until)
+     WHERE blocked_until IS NOT NULL`,
+    `CREATE TRIGGER IF NOT EXISTS login_attempts_cap AFTER INSERT ON login_attempts
+    WHEN (SELECT COUNT(*) FROM login_attempts WHERE blocked_until IS NULL) > 10000
+    BEGIN
+      DELETE FROM login_attempts WHERE identifier = (
+        SELECT identifier FROM login_attempts WHERE blocked_until IS NULL
+        ORDER BY last_failure LIMIT 1
+      );
+    END`,
+    // A failure after an expired block turns the block back into a counter
+    `CREATE TRIGGER IF NOT EXISTS login_attempts_cap_unblocked AFTER UPDATE OF blocked_until ON login_attempts
+    WHEN old.blocked_until IS NOT NULL AND new.blocked_until IS NULL
+      AND (SELECT COUNT(*) FROM login_attempts WHERE blocked_until IS NULL) > 10000
+    BEGIN
+      DELETE FROM login_attempts WHERE identifier = (
+        SELECT identifier FROM login_attempts WHERE blocked_until IS NULL
+        ORDER BY last_failure LIMIT 1
+      );
+    END`,
+    `CREATE TRIGGER IF NOT EXISTS login_blocks_cap AFTER UPDATE OF blocked_until ON login_attempts
+    WHEN old.blocked_until IS NULL AND new.blocked_until IS NOT NULL
+      AND (SELECT COUNT(*) FROM login_attempts WHERE blocked_until IS NOT NULL) > 10000
+    BEGIN
+      DELETE FROM login_attempts WHERE identifier = (
+        SELECT identifier FROM login_attempts WHERE blocked_until IS NOT NULL
+        ORDER BY blocked_until LIMIT 1
+      );
+    END`,
+    `CREATE TABLE IF NOT EXISTS auth_invalidations (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      username VARCHAR(50) NOT NULL
+    )`,
+    `CREATE TRIGGER IF NOT EXISTS auth_invalidations_prune AFTER INSERT ON auth_invalidations
+    WHEN new.id % 100 = 0
+    BEGIN
+      DELETE FROM auth_invalidations WHERE id <= new.id - 1000;
+    END`
+  ]);
+}
+
+// Migration n (1-based) takes the schema from version n - 1 to n.
+// Databases from before migrations existed are at version 0 in any of their
+// historical shapes, so the steps up to version 5 only create what is missing.
+const MIGRATIONS = [
+  { name: 'legacy schema', up: legacySchema },
+  { name: 'search index', up: searchIndex },
+  { name: 'visible logs index', up: visibleLogsIndex },
+  { name: 'change feed', up: changeFeed },
+  { name: 'cold storage index', up: coldIndex },
+  { name: 'shared login state', up: sharedLoginState }
+];
+const LATEST_VERSION = MIGRATIONS.length;
+
+async function getSchemaVersion(database) {
+  const rows = await db.allAsync(database, 'PRAGMA user_version');
+  return rows[0].user_version;
+}
+
+function sleep(ms) {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+// BEGIN IMMEDIATE, waiting for as long as another process holds the write
+// lock: with several workers, one migrates and the others wait here instead
+// of failing after the connection's busy timeout
+async function beginImmediate(database, log) {
+  const started = Date.now();
+  let announced = false;
+  for (;;) {
+    try {
+      await db.runAsync(database, 'BEGIN IMMEDIATE');
+      return;
+    } catch (err) {
+      if (err.code !== 'SQLITE_BUSY' || Date.now() - started >= LOCK_WAIT_MS) throw err;
+    }
+    if (!announced) {
+      announced = true;
+      log('Database is locked, waiting for another process to finish migrating');
+    }
+    await sleep(LOCK_RETRY_MS);
+  }
+}
+
+/**
+ * Brings the database to LATEST_VERSION, returns the number of migrations run
+ * Rejects, leaving the failed migration undone, if one of them fails or if
+ * the database was written by a newer release.
+ */
+async function migrate(database, log = console.log) {
+  const current = await getSchemaVersion(database);
+  if (current === LATEST_VERSION) {
+    return 0;
+  }
+  if (current > LATEST_VERSION) {
+    throw new Error(`Database schema version ${current} is newer than this server supports (${LATEST_VERSION}); update the server`);
+  }
+
+  let applied = 0;
+  for (let version = current + 1; version <= LATEST_VERSION; version++) {
+    const migration = MIGRATIONS[version - 1];
+    await beginImmediate(database, log);
+    try {
+      // Another worker may have migrated since the check above
+      if (await getSchemaVersion(database) >= version) {
+        await db.runAsync(database, 'COMMIT');
+        continue;
+      }
+      await migration.up(database);
+      await db.runAsync(database, `PRAGMA user_version = ${version}`);
+      await db.runAsync(database, 'COMMIT');
+    } catch (err) {
+      await db.runAsync(database, 'ROLLBACK').catch(() => {});
+      err.message = `Migration ${version} (${migration.name}) failed: ${err.message}`;
+      throw err;
+    }
+    applied += 1;
+    // Once per upgrade, so also in production
+    log(`Database migrated to version ${version} (${migration.name})`);
+  }
+  return applied;
+}
+
+module.exports = {
+  MIGRATIONS,
+  LATEST_VERSION,
+  getSchemaVersion,
+  migrate
+};
@@ -1,4 +1,5 @@
 const db = require('./db');
+const { noteToText } = require('../utils/fullTextSearch');
 
 const sampleLogs = [
   {
@@ -47,9 +48,9 @@ async function seed() {
 
     for (const log of sampleLogs) {
       database.run(
-        `INSERT INTO shift_logs (log_date, short_description, note, worker_name) 
-         VALUES (?, ?, ?, ?)`,
-        [log.log_date, log.short_description, log.note, log.worker_name],
+        `INSERT INTO shift_logs (log_date, short_description, note, note_text, worker_name) 
+         VALUES (?, ?, ?, ?, ?)`,
+        [log.log_date, log.short_description, log.note, noteToText(log.note), log.worker_name],
         function(err) {
           if (err) {
             console.error(`Error inserting log: ${log.short_description}`, err);
@@ -1,5 +1,7 @@
 const db = require('./db');
-const bcrypt = require('bcrypt');
+const lazyRequire = require('../utils/lazyRequire');
+// Only needed on a fresh database
+const bcrypt = lazyRequire('bcrypt');
 
 async function seedUsers() {
   return new Promise((resolve, reject) => {
@@ -23,7 +25,7 @@ async function seedUsers() {
           
           // Create default users
           const defaultPassword = 'pass123';
-          const passwordHash = await bcrypt.hash(defaultPassword, 10);
+          const passwordHash = await bcrypt().hash(defaultPassword, 10);
           
           // Create admin user
           database.run(
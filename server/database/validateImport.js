@@ -0,0 +1,90 @@
+// Checks and cleans the records of an import (server-cli.py import, see
+// server_transfer.py) the same way POST /api/logs does: validateLogEntry()
+// and sanitizeInput(), so notes are sanitized and field lengths checked.
+// Dates must also be ISO 8601, as the cursor pagination, the reminder
+// processor and cold storage compare them as text.
+//
+// Reads one JSON record per line on stdin and writes, in the same order, one
+// line per record: {"row": {...cleaned fields}} or {"errors": {field: message}}.
+const readline = require('readline');
+const { validateLogEntry, sanitizeInput } = require('../utils/validation');
+const { closeSanitizerPool } = require('../utils/sanitizerPool');
+
+const TEXT_COLUMNS = ['log_date', 'short_description', 'note', 'worker_name', 'color', 'reminder_date'];
+const DATE_COLUMNS = ['log_date', 'reminder_date', 'original_log_date', 'created_at', 'updated_at'];
+const ISO_DATE = /^\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,3})?)?(?:Z|[+-]\d{2}:\d{2})?)?$/;
+const MAX_IN_FLIGHT = 64; // Records being sanitized at once
+
+function isIsoDate(value) {
+  return ISO_DATE.test(value) && !isNaN(new Date(value).getTime());
+}
+
+async function checkRecord(record) {
+  const data = {};
+  for (const column of TEXT_COLUMNS) {
+    if (record[column] !== null && record[column] !== undefined) {
+      data[column] = String(record[column]);
+    }
+  }
+
+  const errors = { ...validateLogEntry(data).errors };
+  for (const column of DATE_COLUMNS) {
+    const value = record[column];
+    if (value !== null && value !== undefined && !errors[column] && !isIsoDate(String(value))) {
+      errors[column] = 'Invalid date format, expected YYYY-MM-DD or an ISO 8601 date and time';
+    }
+  }
+  if (Object.keys(errors).length > 0) {
+    return { errors };
+  }
+
+  const sanitized = await sanitizeInput(data);
+  if (data.color && sanitized.color === undefined) {
+    return { errors: { color: `Unknown color '${data.color}'` } };
+  }
+  return {
+    row: {
+      log_date: sanitized.log_date,
+      short_description: sanitized.short_description,
+      note: sanitized.note,
+      worker_name: sanitized.worker_name,
+      color: sanitized.color || null,
+      reminder_date: sanitized.reminder_date || null
+    }
+  };
+}
+
+function main() {
+  const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+  let output = Promise.resolve();
+  let inFlight = 0;
+
+  lines.on('line', (line) => {
+    let result;
+    try {
+      result = checkRecord(JSON.parse(line));
+    } catch (err) {
+      result = Promise.resolve({ errors: { record: err.message } });
+    }
+    inFlight += 1;
+    if (inFlight >= MAX_IN_FLIGHT) lines.pause();
+
+    // Answers are written in input order, however long each note takes
+    output = output.then(() => result).then((answer) => {
+      process.stdout.write(JSON.stringify(answer) + '\n');
+      inFlight -= 1;
+      if (inFlight < MAX_IN_FLIGHT / 2) lines.resume();
+    });
+  });
+
+  lines.on('close', () => {
+    output
+      .then(() => closeSanitizerPool())
+      .catch((err) => {
+        console.error('Import validation failed:', err);
+        process.exitCode = 1;
+      });
+  });
+}
+
+main();
@@ -1,3 +1,5 @@
+// First, so module loading is timed from here
+const { markPhase, formatStartup } = require('./utils/startupTimings');
 const express = require('express');
 const cors = require('cors');
 const bodyParser = require('body-parser');
@@ -21,9 +23,17 @@ const userRoutes = require('./routes/users');
 const database = require('./database/db');
 const seedUsers = require('./database/seedUsers');
 const { startReminderProcessor } = require('./utils/reminderProcessor');
+const { startColdArchiver } = require('./database/coldStorage');
+const { getLoginAttemptStats } = require('./utils/loginAttempts');
+const { trackRequests, startMetrics, renderMetrics } = require('./utils/metrics');
+const { compressJson, servePrecompressed } = require('./utils/compression');
+const { precompressDirectory } = require('./utils/precompress');
+markPhase('modules');
 
 const app = express();
 const PORT = process.env.PORT || 8500;
+// Workers behind the launcher's front proxy listen on 127.0.0.1 only
+const HOST = process.env.HOST || '0.0.0.0';
 
 // Trust proxy to get correct IP address (important for Docker/nginx setups)
 app.set('trust proxy', true);
@@ -39,6 +49,10 @@ const corsOptions = {
   methods: ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'],
   allowedHeaders: ['Content-Type', 'Authorization']
 };
+
+// Request counts and latency by route, for /api/metrics
+startMetrics();
+app.use(trackRequests());
 app.use(cors(corsOptions));
 app.use(bodyParser.json());
 app.use(bodyParser.urlencoded({ extended: true }));
@@ -60,10 +74,47 @@ app.get('/api/health', (req, res) => {
   });
 });
 
+// Routes for the launcher only: metrics (server_metrics.py) and heap
+// snapshots for the resource monitor (RSS growth alarm, server_monitor.py).
+// Only registered when the launcher passes a per-launch LAUNCHER_TOKEN, and
+// only answer requests that carry it, as the server listens on all interfaces
+if (process.env.LAUNCHER_TOKEN) {
+  const crypto = require('crypto');
+  const v8 = require('v8');
+  const expected = Buffer.from(process.env.LAUNCHER_TOKEN);
+  const requireLauncherToken = (req, res, next) => {
+    const given = Buffer.from(req.get('X-Launcher-Token') || '');
+    if (given.length !== expected.length || !crypto.timingSafeEqual(given, expected)) {
+      return res.status(403).json({
+        status: 'error',
+        message: 'Invalid token'
+      });
+    }
+    next();
+  };
+
+  // Metrics in the Prometheus text format
+  app.get('/api/metrics', requireLauncherToken, (req, res) => {
+    res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+    res.send(renderMetrics(getLoginAttemptStats()));
+  });
+
+  app.post('/api/internal/heap-snapshot', requireLauncherToken, (req, res) => {
+    // Blocks the event loop while V8 writes the file (seconds for a large heap)
+    const file = `heap-${process.pid}-${Date.now()}.heapsnapshot`;
+    v8.writeHeapSnapshot(path.join(__dirname, '../data', file));
+    console.log(`[Monitor] Heap snapshot written to data/${file}`);
+    res.json({ status: 'ok', file });
+  });
+}
+
 // Serve uploaded files (logos)
 const uploadsPath = path.join(__dirname, '../data/uploads');
 app.use('/uploads', express.static(uploadsPath));
 
+// Compress API responses above 1 KB (log lists with note HTML)
+app.use('/api', compressJson());
+
 // API Routes
 app.use('/api/logs', logRoutes);
 app.use('/api/config', configRoutes);
@@ -93,12 +144,30 @@ if (process.env.NODE_ENV === 'production') {
     console.log(`[Static] Serving frontend from: ${staticPath}`);
   }
   
-  // Serve static files - this must come before the catch-all route
-  app.use(express.static(staticPath, {
+  const staticOptions = {
     maxAge: '1y',
     etag: true,
     lastModified: true
-  }));
+  };
+
+  // Precompressed .br/.gz copies of the build, when the client accepts them
+  const precompressed = servePrecompressed(staticPath, staticOptions);
+  app.use(precompressed);
+
+  // Builds copied without the precompress step get their copies now, once,
+  // in the background (files already compressed are skipped)
+  precompressDirectory(staticPath).then((written) => {
+    if (written > 0) {
+      console.log(`[Static] Precompressed ${written} file(s)`);
+    }
+    // Also picks up copies written by another worker meanwhile
+    precompressed.rescan();
+  }).catch((err) => {
+    console.error('[Static] Precompression failed:', err.message);
+  });
+
+  // Serve static files - this must come before the catch-all route
+  app.use(express.static(staticPath, staticOptions));
   
   // Catch-all handler: send back React's index.html file for any non-API routes
   // This must be LAST, after static file serving
@@ -134,14 +203,26 @@ if (process.env.NODE_ENV === 'production') {
   });
 }
 
+markPhase('app');
+
 // Initialize database
 database.initialize().then(() => {
   // Seed default users if they don't exist
   return seedUsers();
 }).then(() => {
-  startReminderProcessor(); // Start the reminder processor
-  app.listen(PORT, '0.0.0.0', () => {
+  markPhase('db');
+  // Runs in every worker (multi-worker mode): each one re-arms after its own
+  // reminder changes, and activating a due reminder twice is a no-op
+  startReminderProcessor();
+  // Once per install: in multi-worker mode only worker 1 moves old logs to
+  // cold storage, the others see the moves through the database
+  if (!process.env.WORKER_ID || process.env.WORKER_ID === '1') {
+    startColdArchiver();
+  }
+  app.listen(PORT, HOST, () => {
+    markPhase('listen');
     console.log(`Server running on port ${PORT}`);
+    console.log(formatStartup(version));
     if (process.env.NODE_ENV !== 'production') {
       console.log(`API available at http://localhost:${PORT}/api`);
     }
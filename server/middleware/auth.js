@@ -1,5 +1,6 @@
 const jwt = require('jsonwebtoken');
 const { getConfig } = require('../utils/configLoader');
+const { getCachedToken, cacheToken, forgetToken } = require('../utils/authCache');
 
 const JWT_SECRET = process.env.JWT_SECRET;
 if (!JWT_SECRET && process.env.NODE_ENV === 'production') {
@@ -22,40 +23,33 @@ function authenticateToken(req, res, next) {
   const config = getConfig();
   const expiryEnabled = config.login_expiry_enabled !== false; // Default to true
 
-  // If expiry is disabled, ignore expiration (handles old tokens with expiry)
-  const verifyOptions = expiryEnabled ? {} : { ignoreExpiration: true };
-
-  jwt.verify(token, secret, verifyOptions, (err, decoded) => {
-    if (err) {
-      // If expiry is disabled and we got an error, try with ignoreExpiration (handles old tokens)
-      if (!expiryEnabled) {
-        jwt.verify(token, secret, { ignoreExpiration: true }, (innerErr, innerDecoded) => {
-          if (innerErr) {
-            return res.status(403).json({
-              status: 'error',
-              message: 'Invalid token'
-            });
-          }
-          req.user = innerDecoded;
-          next();
-        });
-      } else {
-        if (err.name === 'TokenExpiredError') {
-          return res.status(401).json({
-            status: 'error',
-            message: 'Token expired'
-          });
-        }
-        return res.status(403).json({
-          status: 'error',
-          message: 'Invalid token'
-        });
-      }
-    } else {
-      req.user = decoded;
-      next();
+  // The signature is checked once per token (see utils/authCache.js);
+  // expiry is checked below on every request, as the setting can change
+  let entry = getCachedToken(token);
+  if (!entry) {
+    try {
+      entry = cacheToken(token, jwt.verify(token, secret, { ignoreExpiration: true }));
+    } catch (err) {
+      return res.status(403).json({
+        status: 'error',
+        message: 'Invalid token'
+      });
     }
-  });
+  }
+
+  // If expiry is disabled, ignore expiration (handles old tokens with expiry)
+  const { exp } = entry.principal;
+  if (expiryEnabled && exp && Date.now() >= exp * 1000) {
+    forgetToken(token);
+    return res.status(401).json({
+      status: 'error',
+      message: 'Token expired'
+    });
+  }
+
+  req.user = entry.principal;
+  req.authEntry = entry;
+  next();
 }
 
 module.exports = authenticateToken;
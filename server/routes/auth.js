@@ -1,15 +1,13 @@
 const express = require('express');
 const router = express.Router();
-const bcrypt = require('bcrypt');
+const lazyRequire = require('../utils/lazyRequire');
+const bcrypt = lazyRequire('bcrypt');
 const jwt = require('jsonwebtoken');
-const { getDb } = require('../database/db');
+const { getDb, getReadDb } = require('../database/db');
 const { getConfig } = require('../utils/configLoader');
 const { JWT_SECRET } = require('../middleware/auth');
-
-// Brute force protection: track failed login attempts
-const loginAttempts = new Map(); // Key: identifier (IP+username), Value: { count: number, blockedUntil: timestamp }
-const MAX_ATTEMPTS = 10;
-const BLOCK_DURATION_MS = 2 * 60 * 1000; // 2 minutes
+const { invalidateUser } = require('../utils/authCache');
+const { checkBruteForce, recordFailedAttempt, clearAttempts } = require('../utils/loginAttempts');
 
 // Get client identifier (IP + username for better tracking)
 function getClientIdentifier(req, username = '') {
@@ -17,55 +15,6 @@ function getClientIdentifier(req, username = '') {
   return `${ip}:${username || 'anonymous'}`;
 }
 
-// Check brute force protection
-function checkBruteForce(req, identifier) {
-  const now = Date.now();
-  const attempt = loginAttempts.get(identifier);
-
-  if (attempt) {
-    // Check if still blocked
-    if (attempt.blockedUntil && now < attempt.blockedUntil) {
-      const remainingSeconds = Math.ceil((attempt.blockedUntil - now) / 1000);
-      return {
-        blocked: true,
-        message: `Too many failed login attempts. Please wait ${remainingSeconds} seconds before trying again.`
-      };
-    }
-
-    // Reset if block expired
-    if (attempt.blockedUntil && now >= attempt.blockedUntil) {
-      loginAttempts.delete(identifier);
-    }
-  }
-
-  return { blocked: false };
-}
-
-// Record failed login attempt
-function recordFailedAttempt(identifier) {
-  const now = Date.now();
-  const attempt = loginAttempts.get(identifier);
-
-  if (attempt) {
-    attempt.count += 1;
-    
-    // Block after MAX_ATTEMPTS failed attempts
-    if (attempt.count >= MAX_ATTEMPTS) {
-      attempt.blockedUntil = now + BLOCK_DURATION_MS;
-    }
-  } else {
-    loginAttempts.set(identifier, {
-      count: 1,
-      blockedUntil: null
-    });
-  }
-}
-
-// Clear successful login
-function clearAttempts(identifier) {
-  loginAttempts.delete(identifier);
-}
-
 // Admin Login (for backoffice)
 router.post('/login', async (req, res) => {
   try {
@@ -80,7 +29,7 @@ router.post('/login', async (req, res) => {
 
     // Check brute force protection
     const identifier = getClientIdentifier(req, username);
-    const bruteForceCheck = checkBruteForce(req, identifier);
+    const bruteForceCheck = await checkBruteForce(identifier);
     if (bruteForceCheck.blocked) {
       return res.status(429).json({
         status: 'error',
@@ -88,7 +37,7 @@ router.post('/login', async (req, res) => {
       });
     }
 
-    const db = getDb();
+    const db = getReadDb();
     
     // Check user in database
     db.get('SELECT * FROM users WHERE username = ?', [username], async (err, user) => {
@@ -102,7 +51,7 @@ router.post('/login', async (req, res) => {
       }
       
       if (!user) {
-        recordFailedAttempt(identifier);
+        await recordFailedAttempt(identifier);
         return res.status(401).json({
           status: 'error',
           message: 'Invalid credentials'
@@ -111,7 +60,7 @@ router.post('/login', async (req, res) => {
       
       // Check if user is admin
       if (!user.is_admin) {
-        recordFailedAttempt(identifier);
+        await recordFailedAttempt(identifier);
         return res.status(403).json({
           status: 'error',
           message: 'Admin access required'
@@ -119,9 +68,9 @@ router.post('/login', async (req, res) => {
       }
       
       // Check password
-      const passwordMatch = await bcrypt.compare(password, user.password_hash);
+      const passwordMatch = await bcrypt().compare(password, user.password_hash);
       if (!passwordMatch) {
-        recordFailedAttempt(identifier);
+        await recordFailedAttempt(identifier);
         return res.status(401).json({
           status: 'error',
           message: 'Invalid credentials'
@@ -129,7 +78,7 @@ router.post('/login', async (req, res) => {
       }
       
       // Successful login - clear attempts
-      clearAttempts(identifier);
+      await clearAttempts(identifier);
       
       // Get expiry settings from config
       const config = getConfig();
@@ -183,7 +132,7 @@ router.post('/user/login', async (req, res) => {
 
     // Check brute force protection
     const identifier = getClientIdentifier(req, username);
-    const bruteForceCheck = checkBruteForce(req, identifier);
+    const bruteForceCheck = await checkBruteForce(identifier);
     if (bruteForceCheck.blocked) {
       return res.status(429).json({
         status: 'error',
@@ -191,7 +140,7 @@ router.post('/user/login', async (req, res) => {
       });
     }
 
-    const db = getDb();
+    const db = getReadDb();
     
     // Check user in database
     db.get('SELECT * FROM users WHERE username = ?', [username], async (err, user) => {
@@ -205,7 +154,7 @@ router.post('/user/login', async (req, res) => {
       }
       
       if (!user) {
-        recordFailedAttempt(identifier);
+        await recordFailedAttempt(identifier);
         return res.status(401).json({
           status: 'error',
           message: 'Invalid credentials'
@@ -213,9 +162,9 @@ router.post('/user/login', async (req, res) => {
       }
       
       // Check password
-      const passwordMatch = await bcrypt.compare(password, user.password_hash);
+      const passwordMatch = await bcrypt().compare(password, user.password_hash);
       if (!passwordMatch) {
-        recordFailedAttempt(identifier);
+        await recordFailedAttempt(identifier);
         return res.status(401).json({
           status: 'error',
           message: 'Invalid credentials'
@@ -223,7 +172,7 @@ router.post('/user/login', async (req, res) => {
       }
       
       // Successful login - clear attempts
-      clearAttempts(identifier);
+      await clearAttempts(identifier);
       
       // Get expiry settings from config
       const config = getConfig();
@@ -448,7 +397,7 @@ router.post('/change-password', async (req, res) => {
       }
       
       // Verify current password
-      const passwordMatch = await bcrypt.compare(currentPassword, user.password_hash);
+      const passwordMatch = await bcrypt().compare(currentPassword, user.password_hash);
       if (!passwordMatch) {
         return res.status(401).json({
           status: 'error',
@@ -457,7 +406,7 @@ router.post('/change-password', async (req, res) => {
       }
       
       // Update password
-      const newPasswordHash = await bcrypt.hash(newPassword, 10);
+      const newPasswordHash = await bcrypt().hash(newPassword, 10);
       db.run(
         'UPDATE users SET password_hash = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
         [newPasswordHash, user.id],
@@ -470,6 +419,8 @@ router.post('/change-password', async (req, res) => {
             });
           }
           
+          invalidateUser(user.username);
+          
           res.json({
             status: 'success',
             message: 'Password changed successfully'
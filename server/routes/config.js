@@ -2,59 +2,23 @@ const express = require('express');
 const router = express.Router();
 const fs = require('fs');
 const path = require('path');
-const multer = require('multer');
+const lazyRequire = require('../utils/lazyRequire');
+const { makeEtag, sendNotModified } = require('../utils/conditionalGet');
+const { DEFAULT_CONFIG, getConfig, getConfigVersion, saveConfig } = require('../utils/configLoader');
 
-const CONFIG_FILE = path.join(__dirname, '../../data/config.json');
-const CONFIG_DIR = path.dirname(CONFIG_FILE);
-const UPLOADS_DIR = path.join(__dirname, '../../data/uploads/logos');
+const multer = lazyRequire('multer');
 
-// Ensure config directory exists
-if (!fs.existsSync(CONFIG_DIR)) {
-  fs.mkdirSync(CONFIG_DIR, { recursive: true });
-}
+const UPLOADS_DIR = path.join(__dirname, '../../data/uploads/logos');
 
 // Ensure uploads directory exists
 if (!fs.existsSync(UPLOADS_DIR)) {
   fs.mkdirSync(UPLOADS_DIR, { recursive: true });
 }
 
-// Default configuration
-const DEFAULT_CONFIG = {
-  page_name: 'Shift Handover Log',
-  permanent_info: '',
-  login_expiry_enabled: true,
-  login_expiry_hours: 24,
-  header_color: '#2563eb', // Default blue-600
-  header_logo_type: 'none', // 'none' | 'image' | 'emoji'
-  header_logo_image: '', // URL or path to image
-  header_logo_emoji: '' // Emoji text
-};
-
-function getConfig() {
-  try {
-    if (fs.existsSync(CONFIG_FILE)) {
-      const data = fs.readFileSync(CONFIG_FILE, 'utf8');
-      return JSON.parse(data);
-    }
-  } catch (err) {
-    console.error('Error reading config:', err);
-  }
-  return DEFAULT_CONFIG;
-}
-
-function saveConfig(config) {
-  try {
-    fs.writeFileSync(CONFIG_FILE, JSON.stringify(config, null, 2), 'utf8');
-    return true;
-  } catch (err) {
-    console.error('Error saving config:', err);
-    throw err;
-  }
-}
-
 // Get configuration
 router.get('/', (req, res) => {
   try {
+    if (sendNotModified(req, res, makeEtag('config', getConfigVersion()))) return;
     const config = getConfig();
     res.json(config);
   } catch (error) {
@@ -69,19 +33,6 @@ router.get('/', (req, res) => {
 // Update configuration (requires authentication)
 const authenticateToken = require('../middleware/auth');
 
-// Configure multer for file uploads
-const storage = multer.diskStorage({
-  destination: (req, file, cb) => {
-    cb(null, UPLOADS_DIR);
-  },
-  filename: (req, file, cb) => {
-    // Generate unique filename: timestamp-random-originalname
-    const uniqueSuffix = Date.now() + '-' + Math.round(Math.random() * 1E9);
-    const ext = path.extname(file.originalname);
-    cb(null, `logo-${uniqueSuffix}${ext}`);
-  }
-});
-
 const fileFilter = (req, file, cb) => {
   // Accept only image files
   const allowedTypes = /jpeg|jpg|png|gif|svg|webp/;
@@ -95,16 +46,36 @@ const fileFilter = (req, file, cb) => {
   }
 };
 
-const upload = multer({
-  storage: storage,
-  limits: {
-    fileSize: 2 * 1024 * 1024 // 2MB max
-  },
-  fileFilter: fileFilter
-});
+// Configure multer for file uploads (loaded on the first upload)
+let logoUpload = null;
+
+function uploadLogo(req, res, next) {
+  if (!logoUpload) {
+    const storage = multer().diskStorage({
+      destination: (req, file, cb) => {
+        cb(null, UPLOADS_DIR);
+      },
+      filename: (req, file, cb) => {
+        // Generate unique filename: timestamp-random-originalname
+        const uniqueSuffix = Date.now() + '-' + Math.round(Math.random() * 1E9);
+        const ext = path.extname(file.originalname);
+        cb(null, `logo-${uniqueSuffix}${ext}`);
+      }
+    });
+
+    logoUpload = multer()({
+      storage: storage,
+      limits: {
+        fileSize: 2 * 1024 * 1024 // 2MB max
+      },
+      fileFilter: fileFilter
+    }).single('logo');
+  }
+  logoUpload(req, res, next);
+}
 
 // Upload logo endpoint
-router.post('/upload-logo', authenticateToken, upload.single('logo'), (req, res) => {
+router.post('/upload-logo', authenticateToken, uploadLogo, (req, res) => {
   try {
     if (!req.file) {
       return res.status(400).json({
@@ -190,6 +161,7 @@ router.delete('/logo', authenticateToken, (req, res) => {
 // Get public config (no auth required)
 router.get('/public', (req, res) => {
   try {
+    if (sendNotModified(req, res, makeEtag('public-config', getConfigVersion()))) return;
     const config = getConfig();
     res.json({
       page_name: config.page_name || DEFAULT_CONFIG.page_name,
@@ -211,7 +183,7 @@ router.get('/public', (req, res) => {
 // Update configuration (requires auth)
 router.put('/', authenticateToken, async (req, res) => {
   try {
-    const { page_name, permanent_info, login_expiry_enabled, login_expiry_hours, header_color, header_logo_type, header_logo_image, header_logo_emoji } = req.body;
+    const { page_name, permanent_info, login_expiry_enabled, login_expiry_hours, header_color, header_logo_type, header_logo_image, header_logo_emoji, archive_cold_after_days } = req.body;
     const config = getConfig();
     
     if (page_name !== undefined) {
@@ -238,6 +210,18 @@ router.put('/', authenticateToken, async (req, res) => {
         });
       }
     }
+    if (archive_cold_after_days !== undefined) {
+      const days = parseInt(archive_cold_after_days);
+      // 0 turns cold storage off; at most 10 years
+      if (!isNaN(days) && days >= 0 && days <= 3650) {
+        config.archive_cold_after_days = days;
+      } else {
+        return res.status(400).json({
+          status: 'error',
+          message: 'Cold storage age must be between 0 (off) and 3650 days'
+        });
+      }
+    }
     
     // Handle logo configuration
     if (header_logo_type !== undefined) {
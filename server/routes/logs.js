@@ -2,12 +2,57 @@ const express = require('express');
 const router = express.Router();
 const db = require('../database/db');
 const { validateLogEntry, sanitizeInput } = require('../utils/validation');
+const { noteToText } = require('../utils/fullTextSearch');
+const { LOG_COLUMNS, buildListQuery, buildSearchQuery } = require('../utils/logQueries');
+const { rescheduleReminders } = require('../utils/reminderProcessor');
+const { notifyLogChange, subscribe } = require('../utils/logEvents');
+const { getGeneration } = require('../utils/dataGeneration');
+const { makeEtag, sendNotModified } = require('../utils/conditionalGet');
+const {
+  coldYearsFor,
+  listColdLogs,
+  searchColdLogs,
+  getColdLog,
+  restoreColdLog
+} = require('../database/coldStorage');
+
+// Keyset pagination cursor: the (log_date, id) of the last row on a page,
+// so the next page starts right after it instead of skipping OFFSET rows
+function encodeCursor(row) {
+  return Buffer.from(JSON.stringify([row.log_date, row.id])).toString('base64url');
+}
+
+function decodeCursor(cursor) {
+  try {
+    const [logDate, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'));
+    if (typeof logDate === 'string' && Number.isInteger(id)) {
+      return { logDate, id };
+    }
+  } catch (err) {
+    // Fall through to invalid cursor
+  }
+  return null;
+}
+
+// Larger limits are lowered to this in cursor mode; page/offset mode keeps
+// accepting any limit, as older clients rely on it
+const MAX_CURSOR_PAGE_SIZE = 100;
 
 // Get all logs (with pagination and filters)
+// Two pagination modes:
+// - page/limit (default): page number, total pages and total entries
+// - cursor/limit: pass cursor= (empty) for the first page, then the returned
+//   next_cursor; each page costs the same however deep in the archive it is.
+//   The total is only counted when with_total=true.
 router.get('/', (req, res) => {
+  // Same data generation and URL as a response the browser already has
+  if (sendNotModified(req, res, makeEtag('logs', getGeneration()))) return;
+
   const {
     page = 1,
     limit = 20,
+    cursor,
+    with_total,
     archived = false,
     search,
     worker_name,
@@ -15,192 +60,271 @@ router.get('/', (req, res) => {
     end_date
   } = req.query;
 
-  const offset = (parseInt(page) - 1) * parseInt(limit);
-  const isArchived = archived === 'true' ? 1 : 0;
-  
-  // If showing archived, include logs with future reminders
-  // If showing active, exclude logs with future reminders
-  let query;
-  const params = [];
-  
-  if (isArchived === 1) {
-    // Show archived logs OR logs with future reminders
-    query = `
-      SELECT * FROM shift_logs 
-      WHERE is_deleted = 0 AND (
-        is_archived = 1 OR 
-        (reminder_date IS NOT NULL AND reminder_date > datetime('now'))
-      )
-    `;
-  } else {
-    // Show only active logs (not archived and no future reminders)
-    query = `
-    SELECT * FROM shift_logs 
-      WHERE is_deleted = 0 AND is_archived = 0 
-      AND (reminder_date IS NULL OR reminder_date <= datetime('now'))
-  `;
+  // Strict: parseInt would accept "10abc" and let 0 or negatives reach LIMIT
+  const requestedSize = /^\d+$/.test(String(limit)) ? Number(limit) : NaN;
+  const pageNumber = /^\d+$/.test(String(page)) ? Number(page) : NaN;
+  if (!(Number.isSafeInteger(requestedSize) && requestedSize >= 1)
+      || !(Number.isSafeInteger(pageNumber) && pageNumber >= 1)) {
+    return res.status(400).json({
+      status: 'error',
+      code: 'VALIDATION_ERROR',
+      message: 'limit and page must be positive integers',
+      details: { limit, page }
+    });
   }
+  const useCursor = cursor !== undefined;
+  const pageSize = useCursor ? Math.min(requestedSize, MAX_CURSOR_PAGE_SIZE) : requestedSize;
+  const offset = (pageNumber - 1) * pageSize;
+  const isArchived = archived === 'true' ? 1 : 0;
 
-  // Apply filters
-  if (worker_name) {
-    query += ` AND worker_name = ?`;
-    params.push(worker_name.toUpperCase().trim());
+  let after = null;
+  if (useCursor && cursor !== '') {
+    after = decodeCursor(cursor);
+    if (!after) {
+      return res.status(400).json({
+        status: 'error',
+        code: 'VALIDATION_ERROR',
+        message: 'Invalid pagination cursor',
+        details: {}
+      });
+    }
   }
+  
+  // Archive view also shows logs waiting for a future reminder
+  const listOptions = {
+    archived: isArchived === 1,
+    search,
+    worker_name,
+    start_date,
+    end_date,
+    after,
+    // One extra row in cursor mode tells whether there is a next page
+    limit: useCursor ? pageSize + 1 : pageSize,
+    offset: useCursor ? undefined : offset
+  };
+  const needsTotal = !useCursor || with_total === 'true';
+
+  const sendPage = (rows, total) => {
+    let pagination;
+    if (useCursor) {
+      const hasMore = rows.length > pageSize;
+      if (hasMore) rows = rows.slice(0, pageSize);
+      pagination = {
+        next_cursor: hasMore ? encodeCursor(rows[rows.length - 1]) : null,
+        has_more: hasMore
+      };
+      if (total !== null) {
+        pagination.total_pages = Math.ceil(total / pageSize);
+        pagination.total_entries = total;
+      }
+    } else {
+      pagination = {
+        current_page: pageNumber,
+        total_pages: Math.ceil(total / pageSize),
+        total_entries: total
+      };
+    }
 
-  if (start_date) {
-    query += ` AND log_date >= ?`;
-    params.push(start_date);
-  }
+    res.json({
+      status: 'success',
+      data: rows.map(row => ({
+        ...row,
+        is_archived: Boolean(row.is_archived),
+        is_deleted: Boolean(row.is_deleted),
+        reminder_date: row.reminder_date || null,
+        original_log_date: row.original_log_date || null
+      })),
+      pagination
+    });
+  };
 
-  if (end_date) {
-    query += ` AND log_date <= ?`;
-    params.push(end_date);
-  }
+  const listHotLogs = () => {
+    const { query, params, countQuery, countParams } = buildListQuery(listOptions);
+    const database = db.getReadDb();
 
-  if (search) {
-    query += ` AND (
-      short_description LIKE ? OR 
-      note LIKE ? OR 
-      worker_name LIKE ?
-    )`;
-    const searchTerm = `%${search}%`;
-    params.push(searchTerm, searchTerm, searchTerm);
-  }
+    const countTotal = (callback) => {
+      if (!needsTotal) return callback(null, null);
+      database.get(countQuery, countParams, (err, row) => callback(err, row ? row.total : 0));
+    };
 
-  query += ` ORDER BY log_date DESC LIMIT ? OFFSET ?`;
-  params.push(parseInt(limit), offset);
+    countTotal((err, total) => {
+      if (err) {
+        console.error('Database count error:', err);
+        return res.status(500).json({
+          status: 'error',
+          code: 'DATABASE_ERROR',
+          message: 'Failed to count logs',
+          details: { error: err.message }
+        });
+      }
 
-  // Count total entries
-  let countQuery;
-  const countParams = [];
-  
-  if (isArchived === 1) {
-    // Count archived logs OR logs with future reminders
-    countQuery = `
-      SELECT COUNT(*) as total FROM shift_logs 
-      WHERE is_deleted = 0 AND (
-        is_archived = 1 OR 
-        (reminder_date IS NOT NULL AND reminder_date > datetime('now'))
-      )
-    `;
-  } else {
-    // Count only active logs (not archived and no future reminders)
-    countQuery = `
-    SELECT COUNT(*) as total FROM shift_logs 
-      WHERE is_deleted = 0 AND is_archived = 0 
-      AND (reminder_date IS NULL OR reminder_date <= datetime('now'))
-  `;
-  }
+      database.all(query, params, (err, rows) => {
+        if (err) {
+          console.error('Database query error:', err);
+          return res.status(500).json({
+            status: 'error',
+            code: 'DATABASE_ERROR',
+            message: 'Failed to fetch logs',
+            details: { error: err.message }
+          });
+        }
 
-  if (worker_name) {
-    countQuery += ` AND worker_name = ?`;
-    countParams.push(worker_name.toUpperCase().trim());
-  }
+        sendPage(rows, total);
+      });
+    });
+  };
 
-  if (start_date) {
-    countQuery += ` AND log_date >= ?`;
-    countParams.push(start_date);
+  // Only the archive view reaches into cold storage, and only the years
+  // of the requested date range (see database/coldStorage.js)
+  if (!listOptions.archived) {
+    return listHotLogs();
   }
 
-  if (end_date) {
-    countQuery += ` AND log_date <= ?`;
-    countParams.push(end_date);
-  }
+  coldYearsFor({ start_date, end_date })
+    .then((years) => {
+      if (years.length === 0) return listHotLogs();
+      return listColdLogs(years, listOptions, needsTotal).then(({ rows, total }) => sendPage(rows, total));
+    })
+    .catch((err) => {
+      console.error('Database query error:', err);
+      res.status(500).json({
+        status: 'error',
+        code: 'DATABASE_ERROR',
+        message: 'Failed to fetch logs',
+        details: { error: err.message }
+      });
+    });
+});
 
-  if (search) {
-    countQuery += ` AND (
-      short_description LIKE ? OR 
-      note LIKE ? OR 
-      worker_name LIKE ?
-    )`;
-    const searchTerm = `%${search}%`;
-    countParams.push(searchTerm, searchTerm, searchTerm);
+// Search logs (ranked by relevance, then newest first)
+// Must be registered before /:id, otherwise "search" is taken as an id
+router.get('/search', (req, res) => {
+  const { query, worker_name, start_date, end_date } = req.query;
+  
+  if (!query) {
+    return res.status(400).json({
+      status: 'error',
+      code: 'VALIDATION_ERROR',
+      message: 'Search query is required',
+      details: {}
+    });
   }
 
-  const database = db.getDb();
+  const searchOptions = { query, worker_name, start_date, end_date };
 
-  database.all(countQuery, countParams, (err, countResult) => {
-    if (err) {
-      console.error('Database count error:', err);
-      return res.status(500).json({
-        status: 'error',
-        code: 'DATABASE_ERROR',
-        message: 'Failed to count logs',
-        details: { error: err.message }
+  const sendResults = (rows) => {
+    res.json({
+      status: 'success',
+      data: rows.map(row => ({
+        ...row,
+        is_archived: Boolean(row.is_archived),
+        is_deleted: Boolean(row.is_deleted)
+      }))
+    });
+  };
+
+  const sendError = () => {
+    res.status(500).json({
+      status: 'error',
+      code: 'DATABASE_ERROR',
+      message: 'Failed to search logs',
+      details: {}
+    });
+  };
+
+  // Cold storage years of the date range are searched too
+  coldYearsFor({ start_date, end_date })
+    .then((years) => {
+      if (years.length > 0) {
+        return searchColdLogs(years, searchOptions).then(sendResults);
+      }
+
+      const { query: searchQuery, params } = buildSearchQuery(searchOptions);
+      db.getReadDb().all(searchQuery, params, (err, rows) => {
+        if (err) return sendError();
+        sendResults(rows);
       });
-    }
+    })
+    .catch(sendError);
+});
+
+// Change feed (server-sent events): created, updated, archived, deleted and
+// reminder events with the current state of the entry, see utils/logEvents.js
+router.get('/events', (req, res) => {
+  subscribe(req, res);
+});
+
+// Entries in cold storage (database/coldStorage.js) are moved back to
+// shift_logs before any change, so the routes below only deal with shift_logs
+router.param('id', (req, res, next, id) => {
+  if (req.method === 'GET') return next();
+
+  restoreColdLog(id).then(() => next(), (err) => {
+    console.error('Cold storage restore error:', err);
+    res.status(500).json({
+      status: 'error',
+      code: 'DATABASE_ERROR',
+      message: 'Failed to restore archived log entry',
+      details: {}
+    });
+  });
+});
 
-    const total = countResult[0].total;
+// Get single log entry
+router.get('/:id', (req, res) => {
+  if (sendNotModified(req, res, makeEtag('log', getGeneration()))) return;
 
-  database.all(query, params, (err, rows) => {
+  const { id } = req.params;
+  const database = db.getReadDb();
+
+  database.get(`SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ? AND is_deleted = 0`, [id], (err, row) => {
     if (err) {
-      console.error('Database query error:', err);
       return res.status(500).json({
         status: 'error',
         code: 'DATABASE_ERROR',
-        message: 'Failed to fetch logs',
-        details: { error: err.message }
+        message: 'Failed to fetch log',
+        details: {}
       });
     }
 
+    const sendLog = (row) => {
+      if (!row) {
+        return res.status(404).json({
+          status: 'error',
+          code: 'NOT_FOUND',
+          message: 'Log entry not found',
+          details: {}
+        });
+      }
+
       res.json({
         status: 'success',
-        data: rows.map(row => ({
+        data: {
           ...row,
           is_archived: Boolean(row.is_archived),
           is_deleted: Boolean(row.is_deleted),
           reminder_date: row.reminder_date || null,
           original_log_date: row.original_log_date || null
-        })),
-        pagination: {
-          current_page: parseInt(page),
-          total_pages: Math.ceil(total / parseInt(limit)),
-          total_entries: total
         }
       });
-    });
-  });
-});
+    };
 
-// Get single log entry
-router.get('/:id', (req, res) => {
-  const { id } = req.params;
-  const database = db.getDb();
+    if (row) return sendLog(row);
 
-  database.get('SELECT * FROM shift_logs WHERE id = ? AND is_deleted = 0', [id], (err, row) => {
-    if (err) {
-      return res.status(500).json({
+    // Not in shift_logs: maybe moved to cold storage
+    getColdLog(id).then(sendLog, () => {
+      res.status(500).json({
         status: 'error',
         code: 'DATABASE_ERROR',
         message: 'Failed to fetch log',
         details: {}
       });
-    }
-
-    if (!row) {
-      return res.status(404).json({
-        status: 'error',
-        code: 'NOT_FOUND',
-        message: 'Log entry not found',
-        details: {}
-      });
-    }
-
-    res.json({
-      status: 'success',
-      data: {
-        ...row,
-        is_archived: Boolean(row.is_archived),
-        is_deleted: Boolean(row.is_deleted),
-        reminder_date: row.reminder_date || null,
-        original_log_date: row.original_log_date || null
-      }
     });
   });
 });
 
 // Create log entry
-router.post('/', (req, res) => {
+router.post('/', async (req, res) => {
   const validation = validateLogEntry(req.body);
   
   if (!validation.isValid) {
@@ -212,16 +336,16 @@ router.post('/', (req, res) => {
     });
   }
 
-  const { log_date, short_description, note, worker_name, color, reminder_date } = sanitizeInput(req.body);
+  const { log_date, short_description, note, worker_name, color, reminder_date } = await sanitizeInput(req.body);
   const database = db.getDb();
   
   // If reminder_date is set, automatically archive the log
   const shouldArchive = reminder_date && new Date(reminder_date) > new Date();
 
     database.run(
-    `INSERT INTO shift_logs (log_date, short_description, note, worker_name, color, reminder_date, is_archived) 
-     VALUES (?, ?, ?, ?, ?, ?, ?)`,
-    [log_date, short_description, note, worker_name, color || null, reminder_date || null, shouldArchive ? 1 : 0],
+    `INSERT INTO shift_logs (log_date, short_description, note, note_text, worker_name, color, reminder_date, is_archived) 
+     VALUES (?, ?, ?, ?, ?, ?, ?, ?)`,
+    [log_date, short_description, note, noteToText(note), worker_name, color || null, reminder_date || null, shouldArchive ? 1 : 0],
     function(err) {
       if (err) {
         console.error('Database insert error:', err);
@@ -233,7 +357,12 @@ router.post('/', (req, res) => {
         });
       }
 
-      database.get('SELECT * FROM shift_logs WHERE id = ?', [this.lastID], (err, row) => {
+      notifyLogChange();
+      if (reminder_date) {
+        rescheduleReminders();
+      }
+
+      database.get(`SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ?`, [this.lastID], (err, row) => {
         if (err || !row) {
           return res.status(500).json({
             status: 'error',
@@ -261,7 +390,7 @@ router.post('/', (req, res) => {
 });
 
 // Update log entry
-router.put('/:id', (req, res) => {
+router.put('/:id', async (req, res) => {
   const { id } = req.params;
   const validation = validateLogEntry(req.body, true);
   
@@ -274,7 +403,7 @@ router.put('/:id', (req, res) => {
     });
   }
 
-  const { log_date, short_description, note, worker_name, color, reminder_date } = sanitizeInput(req.body);
+  const { log_date, short_description, note, worker_name, color, reminder_date } = await sanitizeInput(req.body);
   const database = db.getDb();
   
   // If reminder_date is set, automatically archive the log
@@ -284,7 +413,7 @@ router.put('/:id', (req, res) => {
   const finalReminderDate = hasReminder ? reminder_date : null;
 
   // First check if entry exists
-  database.get('SELECT * FROM shift_logs WHERE id = ? AND is_deleted = 0', [id], (err, row) => {
+  database.get(`SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ? AND is_deleted = 0`, [id], (err, row) => {
     if (err) {
       return res.status(500).json({
         status: 'error',
@@ -308,9 +437,9 @@ router.put('/:id', (req, res) => {
 
     database.run(
       `UPDATE shift_logs 
-       SET log_date = ?, short_description = ?, note = ?, worker_name = ?, color = ?, reminder_date = ?, is_archived = ?, updated_at = CURRENT_TIMESTAMP
+       SET log_date = ?, short_description = ?, note = ?, note_text = ?, worker_name = ?, color = ?, reminder_date = ?, is_archived = ?, updated_at = CURRENT_TIMESTAMP
        WHERE id = ?`,
-      [log_date, short_description, note, worker_name, color || null, finalReminderDate, archiveStatus, id],
+      [log_date, short_description, note, noteToText(note), worker_name, color || null, finalReminderDate, archiveStatus, id],
       function(err) {
         if (err) {
           return res.status(500).json({
@@ -321,7 +450,12 @@ router.put('/:id', (req, res) => {
           });
         }
 
-        database.get('SELECT * FROM shift_logs WHERE id = ?', [id], (err, updatedRow) => {
+        notifyLogChange();
+        if (finalReminderDate || row.reminder_date) {
+          rescheduleReminders();
+        }
+
+        database.get(`SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ?`, [id], (err, updatedRow) => {
           if (err || !updatedRow) {
             return res.status(500).json({
               status: 'error',
@@ -375,7 +509,9 @@ router.patch('/:id/archive', (req, res) => {
         });
       }
 
-      database.get('SELECT * FROM shift_logs WHERE id = ?', [id], (err, row) => {
+      notifyLogChange();
+
+      database.get(`SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ?`, [id], (err, row) => {
         if (err || !row) {
           return res.status(500).json({
             status: 'error',
@@ -406,6 +542,15 @@ router.patch('/:id/reminder', (req, res) => {
   const { reminder_date } = req.body;
   const database = db.getDb();
 
+  if (reminder_date && isNaN(new Date(reminder_date).getTime())) {
+    return res.status(400).json({
+      status: 'error',
+      code: 'VALIDATION_ERROR',
+      message: 'Invalid reminder date',
+      details: {}
+    });
+  }
+
   // Validate reminder_date is in the future if provided
   if (reminder_date && new Date(reminder_date) <= new Date()) {
     return res.status(400).json({
@@ -417,7 +562,7 @@ router.patch('/:id/reminder', (req, res) => {
   }
 
   // First check if entry exists
-  database.get('SELECT * FROM shift_logs WHERE id = ? AND is_deleted = 0', [id], (err, row) => {
+  database.get(`SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ? AND is_deleted = 0`, [id], (err, row) => {
     if (err) {
       return res.status(500).json({
         status: 'error',
@@ -443,7 +588,8 @@ router.patch('/:id/reminder', (req, res) => {
       `UPDATE shift_logs 
        SET reminder_date = ?, is_archived = ?, updated_at = CURRENT_TIMESTAMP
        WHERE id = ?`,
-      [reminder_date || null, shouldArchive ? 1 : row.is_archived, id],
+      // Stored as ISO 8601 UTC like the other routes (see utils/reminderProcessor.js)
+      [reminder_date ? new Date(reminder_date).toISOString() : null, shouldArchive ? 1 : row.is_archived, id],
       function(err) {
         if (err) {
           return res.status(500).json({
@@ -454,7 +600,10 @@ router.patch('/:id/reminder', (req, res) => {
           });
         }
 
-        database.get('SELECT * FROM shift_logs WHERE id = ?', [id], (err, updatedRow) => {
+        notifyLogChange();
+        rescheduleReminders();
+
+        database.get(`SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ?`, [id], (err, updatedRow) => {
           if (err || !updatedRow) {
             return res.status(500).json({
               status: 'error',
@@ -507,7 +656,10 @@ router.patch('/:id/reminder/clear', (req, res) => {
         });
       }
 
-      database.get('SELECT * FROM shift_logs WHERE id = ?', [id], (err, row) => {
+      notifyLogChange();
+      rescheduleReminders();
+
+      database.get(`SELECT ${LOG_COLUMNS} FROM shift_logs WHERE id = ?`, [id], (err, row) => {
         if (err || !row) {
           return res.status(500).json({
             status: 'error',
@@ -559,74 +711,11 @@ router.delete('/:id', (req, res) => {
         });
       }
 
+      notifyLogChange();
       res.status(204).send();
     }
   );
 });
 
-// Search logs
-router.get('/search', (req, res) => {
-  const { query, worker_name, start_date, end_date } = req.query;
-  
-  if (!query) {
-    return res.status(400).json({
-      status: 'error',
-      code: 'VALIDATION_ERROR',
-      message: 'Search query is required',
-      details: {}
-    });
-  }
-
-  let searchQuery = `
-    SELECT * FROM shift_logs 
-    WHERE is_deleted = 0 AND (
-      short_description LIKE ? OR 
-      note LIKE ? OR 
-      worker_name LIKE ?
-    )
-  `;
-  const searchTerm = `%${query}%`;
-  const params = [searchTerm, searchTerm, searchTerm];
-
-  if (worker_name) {
-    searchQuery += ` AND worker_name = ?`;
-    params.push(worker_name.toUpperCase().trim());
-  }
-
-  if (start_date) {
-    searchQuery += ` AND log_date >= ?`;
-    params.push(start_date);
-  }
-
-  if (end_date) {
-    searchQuery += ` AND log_date <= ?`;
-    params.push(end_date);
-  }
-
-  searchQuery += ` ORDER BY log_date DESC`;
-
-  const database = db.getDb();
-
-  database.all(searchQuery, params, (err, rows) => {
-    if (err) {
-      return res.status(500).json({
-        status: 'error',
-        code: 'DATABASE_ERROR',
-        message: 'Failed to search logs',
-        details: {}
-      });
-    }
-
-    res.json({
-      status: 'success',
-      data: rows.map(row => ({
-        ...row,
-        is_archived: Boolean(row.is_archived),
-        is_deleted: Boolean(row.is_deleted)
-      }))
-    });
-  });
-});
-
 module.exports = router;
 
@@ -1,9 +1,11 @@
 const express = require('express');
 const router = express.Router();
-const bcrypt = require('bcrypt');
-const { getDb } = require('../database/db');
+const lazyRequire = require('../utils/lazyRequire');
+const { getDb, getReadDb } = require('../database/db');
 const authenticateToken = require('../middleware/auth');
-const nodemailer = require('nodemailer');
+const { checkAdmin, invalidateUser } = require('../utils/authCache');
+const bcrypt = lazyRequire('bcrypt');
+const nodemailer = lazyRequire('nodemailer');
 
 // Email configuration (can be set via environment variables)
 const getEmailTransporter = () => {
@@ -19,7 +21,7 @@ const getEmailTransporter = () => {
 
   // Only create transporter if credentials are provided
   if (emailConfig.auth.user && emailConfig.auth.pass) {
-    return nodemailer.createTransport(emailConfig);
+    return nodemailer().createTransport(emailConfig);
   }
   return null;
 };
@@ -53,10 +55,9 @@ async function sendPasswordEmail(email, username, password) {
 router.get('/', authenticateToken, async (req, res) => {
   try {
     // Verify user is admin
-    const db = getDb();
-    const username = req.user.username;
+    const db = getReadDb();
     
-    db.get('SELECT is_admin FROM users WHERE username = ?', [username], async (err, user) => {
+    checkAdmin(req, async (err, isAdmin) => {
       if (err) {
         return res.status(500).json({
           status: 'error',
@@ -65,7 +66,7 @@ router.get('/', authenticateToken, async (req, res) => {
         });
       }
       
-      if (!user || !user.is_admin) {
+      if (!isAdmin) {
         return res.status(403).json({
           status: 'error',
           message: 'Admin access required'
@@ -105,9 +106,8 @@ router.post('/', authenticateToken, async (req, res) => {
     
     // Verify user is admin
     const db = getDb();
-    const currentUsername = req.user.username;
     
-    db.get('SELECT is_admin FROM users WHERE username = ?', [currentUsername], async (err, user) => {
+    checkAdmin(req, async (err, isAdmin) => {
       if (err) {
         return res.status(500).json({
           status: 'error',
@@ -116,7 +116,7 @@ router.post('/', authenticateToken, async (req, res) => {
         });
       }
       
-      if (!user || !user.is_admin) {
+      if (!isAdmin) {
         return res.status(403).json({
           status: 'error',
           message: 'Admin access required'
@@ -156,7 +156,7 @@ router.post('/', authenticateToken, async (req, res) => {
         }
         
         // Hash password
-        const passwordHash = await bcrypt.hash(password, 10);
+        const passwordHash = await bcrypt().hash(password, 10);
         
         // Get max display_order
         db.get('SELECT MAX(display_order) as max_order FROM users', async (err, maxRow) => {
@@ -183,6 +183,8 @@ router.post('/', authenticateToken, async (req, res) => {
               });
             }
             
+            invalidateUser(username);
+            
             // Send email if requested and email is provided
             if (send_email && email) {
               try {
@@ -227,9 +229,8 @@ router.put('/:id', authenticateToken, async (req, res) => {
     
     // Verify user is admin
     const db = getDb();
-    const currentUsername = req.user.username;
     
-    db.get('SELECT is_admin FROM users WHERE username = ?', [currentUsername], async (err, user) => {
+    checkAdmin(req, async (err, isAdmin) => {
       if (err) {
         return res.status(500).json({
           status: 'error',
@@ -238,7 +239,7 @@ router.put('/:id', authenticateToken, async (req, res) => {
         });
       }
       
-      if (!user || !user.is_admin) {
+      if (!isAdmin) {
         return res.status(403).json({
           status: 'error',
           message: 'Admin access required'
@@ -321,7 +322,7 @@ router.put('/:id', authenticateToken, async (req, res) => {
                 message: 'Password must be at least 6 characters'
               });
             }
-            newPassword = await bcrypt.hash(password, 10);
+            newPassword = await bcrypt().hash(password, 10);
             updates.push('password_hash = ?');
             values.push(newPassword);
           }
@@ -340,6 +341,10 @@ router.put('/:id', authenticateToken, async (req, res) => {
               });
             }
             
+            // Cached admin status of the old and new name
+            invalidateUser(existingUser.username);
+            if (username) invalidateUser(username);
+            
             // Send email if requested and email is provided
             if (send_email && (email || existingUser.email)) {
               const emailToSend = email || existingUser.email;
@@ -391,7 +396,7 @@ router.delete('/:id', authenticateToken, async (req, res) => {
     const db = getDb();
     const currentUsername = req.user.username;
     
-    db.get('SELECT is_admin FROM users WHERE username = ?', [currentUsername], (err, user) => {
+    checkAdmin(req, (err, isAdmin) => {
       if (err) {
         return res.status(500).json({
           status: 'error',
@@ -400,7 +405,7 @@ router.delete('/:id', authenticateToken, async (req, res) => {
         });
       }
       
-      if (!user || !user.is_admin) {
+      if (!isAdmin) {
         return res.status(403).json({
           status: 'error',
           message: 'Admin access required'
@@ -450,6 +455,8 @@ router.delete('/:id', authenticateToken, async (req, res) => {
             });
           }
           
+          invalidateUser(existingUser.username);
+          
           res.json({
             status: 'success',
             message: 'User deleted successfully'
@@ -474,9 +481,8 @@ router.post('/:id/send-password', authenticateToken, async (req, res) => {
     
     // Verify user is admin
     const db = getDb();
-    const currentUsername = req.user.username;
     
-    db.get('SELECT is_admin FROM users WHERE username = ?', [currentUsername], async (err, user) => {
+    checkAdmin(req, async (err, isAdmin) => {
       if (err) {
         return res.status(500).json({
           status: 'error',
@@ -485,7 +491,7 @@ router.post('/:id/send-password', authenticateToken, async (req, res) => {
         });
       }
       
-      if (!user || !user.is_admin) {
+      if (!isAdmin) {
         return res.status(403).json({
           status: 'error',
           message: 'Admin access required'
@@ -565,9 +571,8 @@ router.post('/:id/move', authenticateToken, async (req, res) => {
     
     // Verify user is admin
     const db = getDb();
-    const currentUsername = req.user.username;
     
-    db.get('SELECT is_admin FROM users WHERE username = ?', [currentUsername], async (err, user) => {
+    checkAdmin(req, async (err, isAdmin) => {
       if (err) {
         return res.status(500).json({
           status: 'error',
@@ -576,7 +581,7 @@ router.post('/:id/move', authenticateToken, async (req, res) => {
         });
       }
       
-      if (!user || !user.is_admin) {
+      if (!isAdmin) {
         return res.status(403).json({
           status: 'error',
           message: 'Admin access required'
@@ -0,0 +1,142 @@
+const { getDb, getReadDb } = require('../database/db');
+
+// Cache of verified tokens (see middleware/auth.js)
+// Maps a token whose signature already checked out to its principal (the
+// decoded payload) and, once looked up, the user's admin status. Token
+// expiry is still checked on every request against the current config.
+// users.js and the change-password route drop a user's entries when the
+// account changes; the admin status is also re-read after ADMIN_TTL_MS.
+// With several worker processes (WORKER_ID set) each invalidation is also
+// written to auth_invalidations, which every worker polls once a second
+// from the first token it caches, so a change made on one worker reaches the
+// others within INVALIDATION_POLL_MS. Until a worker has read the latest
+// invalidation id, tokens are verified on every request instead of cached.
+
+const MAX_TOKENS = 1000;
+const ADMIN_TTL_MS = 60 * 1000;
+const INVALIDATION_POLL_MS = 1000;
+const SHARED = Boolean(process.env.WORKER_ID);
+
+// Map keeps insertion order: re-inserting on each hit makes the first key the
+// least recently used one
+const tokens = new Map();
+
+let lastInvalidationId = null; // Unknown until the first poll
+let pollTimer = null;
+let polling = false;
+
+function dropUser(username) {
+  for (const [token, entry] of tokens) {
+    if (entry.principal.username === username) {
+      tokens.delete(token);
+    }
+  }
+}
+
+// Drop the tokens of users invalidated by other workers since the last poll
+function pollInvalidations() {
+  if (polling) return;
+  polling = true;
+  const first = lastInvalidationId === null;
+  const sql = first
+    ? 'SELECT MAX(id) AS id, NULL AS username FROM auth_invalidations'
+    : 'SELECT id, username FROM auth_invalidations WHERE id > ? ORDER BY id';
+  getReadDb().all(sql, first ? [] : [lastInvalidationId], (err, rows) => {
+    polling = false;
+    if (err) {
+      console.error('Failed to read auth invalidations:', err.message);
+      return;
+    }
+    if (first) {
+      lastInvalidationId = rows[0].id || 0;
+      return;
+    }
+    for (const row of rows) {
+      dropUser(row.username);
+      lastInvalidationId = row.id;
+    }
+  });
+}
+
+function startPolling() {
+  pollInvalidations();
+  pollTimer = setInterval(pollInvalidations, INVALIDATION_POLL_MS);
+  pollTimer.unref();
+}
+
+/**
+ * Cached entry for a token, or null if it has to be verified
+ */
+function getCachedToken(token) {
+  const entry = tokens.get(token);
+  if (!entry) return null;
+  tokens.delete(token);
+  tokens.set(token, entry);
+  return entry;
+}
+
+/**
+ * Remember a token whose signature was verified
+ */
+function cacheToken(token, principal) {
+  const entry = { principal, isAdmin: null, adminCheckedAt: 0 };
+  if (SHARED) {
+    if (!pollTimer) {
+      startPolling();
+    }
+    if (lastInvalidationId === null) {
+      return entry;
+    }
+  }
+  tokens.delete(token);
+  tokens.set(token, entry);
+  if (tokens.size > MAX_TOKENS) {
+    tokens.delete(tokens.keys().next().value);
+  }
+  return entry;
+}
+
+function forgetToken(token) {
+  tokens.delete(token);
+}
+
+/**
+ * Is the authenticated user (req.authEntry, set by middleware/auth.js) an admin?
+ * Reads users.is_admin only when the cached answer is missing or old
+ */
+function checkAdmin(req, callback) {
+  const entry = req.authEntry;
+  if (entry && entry.isAdmin !== null && Date.now() - entry.adminCheckedAt < ADMIN_TTL_MS) {
+    return callback(null, entry.isAdmin);
+  }
+
+  getReadDb().get('SELECT is_admin FROM users WHERE username = ?', [req.user.username], (err, user) => {
+    if (err) return callback(err);
+    const isAdmin = Boolean(user && user.is_admin);
+    if (entry) {
+      entry.isAdmin = isAdmin;
+      entry.adminCheckedAt = Date.now();
+    }
+    callback(null, isAdmin);
+  });
+}
+
+/**
+ * Drop cached tokens of a user whose account was changed or deleted
+ */
+function invalidateUser(username) {
+  dropUser(username);
+  if (SHARED) {
+    getDb().run('INSERT INTO auth_invalidations (username) VALUES (?)', [username], (err) => {
+      if (err) console.error('Failed to record auth invalidation:', err.message);
+    });
+  }
+}
+
+module.exports = {
+  getCachedToken,
+  cacheToken,
+  forgetToken,
+  checkAdmin,
+  invalidateUser
+};
@@ -0,0 +1,167 @@
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+
+// Response compression
+// - API JSON above COMPRESS_THRESHOLD bytes is compressed per response
+//   (brotli at a fast level, or gzip), off the event loop
+// - Static files are never compressed per request: utils/precompress.js
+//   writes .br/.gz copies of the React build once, and servePrecompressed()
+//   sends those instead of the original
+
+const COMPRESS_THRESHOLD = 1024;
+const BROTLI_QUALITY = 4; // Close to gzip speed, smaller output; 11 is for build time only
+
+const ENCODING_EXTENSIONS = { br: '.br', gzip: '.gz' };
+
+/**
+ * Best encoding the client accepts: brotli, then gzip, else null
+ * Chosen by the server rather than the header order, as browsers list
+ * gzip first but all of them decode brotli faster than it downloads
+ */
+function chooseEncoding(acceptEncoding, available = ['br', 'gzip']) {
+  if (!acceptEncoding) return null;
+
+  const accepted = {};
+  for (const part of acceptEncoding.split(',')) {
+    const [name, ...params] = part.trim().toLowerCase().split(';');
+    const qParam = params.find((param) => param.trim().startsWith('q='));
+    accepted[name] = qParam ? parseFloat(qParam.trim().slice(2)) : 1;
+  }
+
+  return available.find((encoding) => {
+    const q = accepted[encoding] !== undefined ? accepted[encoding] : accepted['*'];
+    return q > 0;
+  }) || null;
+}
+
+function compress(data, encoding, callback) {
+  if (encoding === 'br') {
+    zlib.brotliCompress(data, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: Buffer.byteLength(data)
+      }
+    }, callback);
+  } else {
+    zlib.gzip(data, callback);
+  }
+}
+
+/**
+ * Middleware compressing res.json() bodies for clients that accept it
+ * Streaming responses (the event feed) don't use res.json and are untouched
+ */
+function compressJson({ threshold = COMPRESS_THRESHOLD } = {}) {
+  return (req, res, next) => {
+    const sendJson = res.json.bind(res);
+
+    res.json = (body) => {
+      if (res.statusCode === 204 || res.statusCode === 304 || res.get('Content-Encoding')) {
+        return sendJson(body);
+      }
+
+      const json = JSON.stringify(body);
+      if (!res.get('Content-Type')) {
+        res.set('Content-Type', 'application/json; charset=utf-8');
+      }
+      if (json === undefined || Buffer.byteLength(json) < threshold) {
+        return res.send(json);
+      }
+
+      res.vary('Accept-Encoding');
+      const encoding = chooseEncoding(req.headers['accept-encoding']);
+      if (!encoding) {
+        return res.send(json);
+      }
+
+      compress(json, encoding, (err, compressed) => {
+        if (err) {
+          console.error('Response compression failed:', err.message);
+          return res.send(json);
+        }
+        res.set('Content-Encoding', encoding);
+        // Same ETag for every encoding, so it can only be a weak one
+        const etag = res.get('ETag');
+        if (etag && !etag.startsWith('W/')) {
+          res.set('ETag', `W/${etag}`);
+        }
+        res.send(compressed);
+      });
+      return res;
+    };
+
+    next();
+  };
+}
+
+// URL paths of files with precompressed copies -> available encodings
+function scanPrecompressed(root) {
+  const variants = new Map();
+
+  function walk(dir) {
+    let entries;
+    try {
+      entries = fs.readdirSync(dir, { withFileTypes: true });
+    } catch (err) {
+      return;
+    }
+    const names = new Set(entries.map((entry) => entry.name));
+    for (const entry of entries) {
+      const fullPath = path.join(dir, entry.name);
+      if (entry.isDirectory()) {
+        walk(fullPath);
+        continue;
+      }
+      const available = Object.keys(ENCODING_EXTENSIONS)
+        .filter((encoding) => names.has(entry.name + ENCODING_EXTENSIONS[encoding]));
+      if (available.length > 0) {
+        const urlPath = '/' + path.relative(root, fullPath).split(path.sep).join('/');
+        variants.set(urlPath, available);
+      }
+    }
+  }
+
+  walk(root);
+  return variants;
+}
+
+/**
+ * Middleware serving the .br/.gz copy of a static file when the client
+ * accepts it; everything else falls through to express.static
+ * Call .rescan() after new copies were written
+ */
+function servePrecompressed(root, sendOptions = {}) {
+  let variants = scanPrecompressed(root);
+
+  const middleware = (req, res, next) => {
+    if (req.method !== 'GET' && req.method !== 'HEAD') return next();
+
+    const available = variants.get(req.path);
+    if (!available) return next();
+
+    res.vary('Accept-Encoding');
+    const encoding = chooseEncoding(req.headers['accept-encoding'], available);
+    if (!encoding) return next();
+
+    // Content type of the original file, not of the .br/.gz
+    res.type(path.extname(req.path));
+    res.set('Content-Encoding', encoding);
+    res.sendFile(req.path.slice(1) + ENCODING_EXTENSIONS[encoding], { ...sendOptions, root }, (err) => {
+      if (err && !res.headersSent) {
+        res.removeHeader('Content-Encoding');
+        next();
+      }
+    });
+  };
+
+  middleware.rescan = () => {
+    variants = scanPrecompressed(root);
+  };
+  return middleware;
+}
+
+module.exports = {
+  compressJson,
+  servePrecompressed
+};
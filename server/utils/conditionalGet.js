@@ -0,0 +1,36 @@
+// Conditional GET: strong ETags built from a data version instead of a hash
+// of the response, so a 304 is answered before any work is done
+
+function makeEtag(...parts) {
+  return `"${parts.join('-').replace(/[^\w.-]/g, '_')}"`;
+}
+
+function matchesEtag(ifNoneMatch, etag) {
+  if (!ifNoneMatch) return false;
+  if (ifNoneMatch.trim() === '*') return true;
+  return ifNoneMatch
+    .split(',')
+    .map((tag) => tag.trim().replace(/^W\//, ''))
+    .includes(etag);
+}
+
+/**
+ * Set the ETag and answer 304 if the client already has this version
+ * Returns true when the response was sent
+ */
+function sendNotModified(req, res, etag) {
+  res.set('ETag', etag);
+  // Browsers revalidate every time, which is now a cheap 304
+  res.set('Cache-Control', 'no-cache');
+
+  if (matchesEtag(req.headers['if-none-match'], etag)) {
+    res.status(304).end();
+    return true;
+  }
+  return false;
+}
+
+module.exports = {
+  makeEtag,
+  sendNotModified
+};
@@ -1,39 +1,172 @@
 const fs = require('fs');
 const path = require('path');
+const crypto = require('crypto');
+
+// Config store for data/config.json
+// The parsed config is kept in memory, so requests never touch the disk.
+// The data directory is watched and the file is reloaded in the background
+// when it changes (backoffice save in another worker, or an edit by hand).
+// Saves write a temp file and rename it over config.json, so a reader never
+// sees a half-written file.
 
 const CONFIG_FILE = path.join(__dirname, '../../data/config.json');
+const CONFIG_DIR = path.dirname(CONFIG_FILE);
+const RELOAD_DELAY_MS = 50;          // Coalesces the burst of events from one save
+const POLL_INTERVAL_MS = 5 * 1000;   // mtime check when fs.watch is not available
 
 const DEFAULT_CONFIG = {
   page_name: 'Shift Handover Log',
   permanent_info: '',
   login_expiry_enabled: true,
-  login_expiry_hours: 24
+  login_expiry_hours: 24,
+  header_color: '#2563eb', // Default blue-600
+  header_logo_type: 'none', // 'none' | 'image' | 'emoji'
+  header_logo_image: '', // URL or path to image
+  header_logo_emoji: '', // Emoji text
+  archive_cold_after_days: 90 // Archived/deleted logs move to cold storage after this (0 = never)
 };
 
-function getConfig() {
+let current = null; // { config, version, mtimeMs }
+let reloadTimer = null;
+let watching = false;
+
+// Ensure config directory exists
+if (!fs.existsSync(CONFIG_DIR)) {
+  fs.mkdirSync(CONFIG_DIR, { recursive: true });
+}
+
+function contentVersion(data) {
+  return crypto.createHash('sha1').update(data).digest('hex').slice(0, 16);
+}
+
+function parseConfig(data, mtimeMs) {
+  return {
+    config: JSON.parse(data),
+    version: contentVersion(data),
+    mtimeMs
+  };
+}
+
+const DEFAULT_ENTRY = { config: DEFAULT_CONFIG, version: 'default', mtimeMs: 0 };
+
+// Initial load at startup; later reloads are asynchronous
+function loadSync() {
   try {
     if (fs.existsSync(CONFIG_FILE)) {
       const data = fs.readFileSync(CONFIG_FILE, 'utf8');
-      return JSON.parse(data);
+      return parseConfig(data, fs.statSync(CONFIG_FILE).mtimeMs);
     }
   } catch (err) {
     console.error('Error reading config:', err);
   }
-  return DEFAULT_CONFIG;
+  return DEFAULT_ENTRY;
+}
+
+async function reload() {
+  try {
+    const [data, stat] = await Promise.all([
+      fs.promises.readFile(CONFIG_FILE, 'utf8'),
+      fs.promises.stat(CONFIG_FILE)
+    ]);
+    current = parseConfig(data, stat.mtimeMs);
+  } catch (err) {
+    if (err.code === 'ENOENT') {
+      current = DEFAULT_ENTRY;
+    } else {
+      // Keep serving the last good config (e.g. file being edited by hand)
+      console.error('Error reloading config:', err.message);
+    }
+  }
+}
+
+function scheduleReload() {
+  clearTimeout(reloadTimer);
+  reloadTimer = setTimeout(reload, RELOAD_DELAY_MS);
+}
+
+async function checkMtime() {
+  try {
+    const stat = await fs.promises.stat(CONFIG_FILE);
+    if (stat.mtimeMs !== current.mtimeMs) scheduleReload();
+  } catch (err) {
+    if (err.code === 'ENOENT' && current !== DEFAULT_ENTRY) scheduleReload();
+  }
+}
+
+function startPolling() {
+  setInterval(checkMtime, POLL_INTERVAL_MS).unref();
+}
+
+// Watch the directory rather than the file: saves replace the file by rename
+function startWatching() {
+  watching = true;
+  try {
+    const watcher = fs.watch(CONFIG_DIR, { persistent: false }, (eventType, filename) => {
+      if (!filename || filename === path.basename(CONFIG_FILE)) {
+        scheduleReload();
+      }
+    });
+    watcher.on('error', (err) => {
+      console.error('Config watch failed, checking for changes every 5 seconds:', err.message);
+      watcher.close();
+      startPolling();
+    });
+  } catch (err) {
+    startPolling();
+  }
+}
+
+function getEntry() {
+  if (!current) {
+    current = loadSync();
+  }
+  if (!watching) {
+    startWatching();
+  }
+  return current;
+}
+
+/**
+ * Current configuration (a copy; change it and pass it to saveConfig)
+ */
+function getConfig() {
+  return { ...getEntry().config };
+}
+
+/**
+ * Version of the current configuration, for ETags
+ * Based on the file content, so it is the same in every worker and after a restart
+ */
+function getConfigVersion() {
+  return getEntry().version;
 }
 
 function saveConfig(config) {
+  const data = JSON.stringify(config, null, 2);
+  const tempFile = `${CONFIG_FILE}.${process.pid}.tmp`;
   try {
-    fs.writeFileSync(CONFIG_FILE, JSON.stringify(config, null, 2), 'utf8');
+    fs.writeFileSync(tempFile, data, 'utf8');
+    try {
+      fs.renameSync(tempFile, CONFIG_FILE);
+    } catch (renameErr) {
+      // Windows refuses the rename while another process has the file open
+      if (renameErr.code !== 'EPERM' && renameErr.code !== 'EACCES') throw renameErr;
+      fs.writeFileSync(CONFIG_FILE, data, 'utf8');
+      fs.rmSync(tempFile, { force: true });
+    }
+    current = parseConfig(data, fs.statSync(CONFIG_FILE).mtimeMs);
     return true;
   } catch (err) {
     console.error('Error saving config:', err);
+    fs.rmSync(tempFile, { force: true });
     throw err;
   }
 }
 
 module.exports = {
+  CONFIG_FILE,
+  DEFAULT_CONFIG,
   getConfig,
+  getConfigVersion,
   saveConfig
 };
-
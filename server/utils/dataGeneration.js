@@ -0,0 +1,52 @@
+const crypto = require('crypto');
+const { getDb } = require('../database/db');
+
+// Change generation of the log data, used for ETags (utils/conditionalGet.js)
+// - Changes made by this process bump a counter (see utils/logEvents.js)
+// - Commits by other processes (other workers, scripts) show up in
+//   PRAGMA data_version of the writer connection, checked once a second.
+//   That only reads the database header, so answering a conditional
+//   request never waits for SQLite.
+// The boot id keeps ETags from before a restart from ever matching.
+const BOOT_ID = crypto.randomBytes(4).toString('hex');
+const WATCH_INTERVAL_MS = 1000;
+
+let localChanges = 0;
+let dataVersion = 0;
+let watchTimer = null;
+
+function checkDataVersion() {
+  getDb().get('PRAGMA data_version', [], (err, row) => {
+    if (!err && row) {
+      dataVersion = row.data_version;
+    }
+  });
+}
+
+function startWatching() {
+  checkDataVersion();
+  watchTimer = setInterval(checkDataVersion, WATCH_INTERVAL_MS);
+  watchTimer.unref();
+}
+
+/**
+ * Record a change to the log data made by this process
+ */
+function bumpGeneration() {
+  localChanges += 1;
+}
+
+/**
+ * Current generation; changes whenever any log entry may have changed
+ */
+function getGeneration() {
+  if (!watchTimer) {
+    startWatching();
+  }
+  return `${BOOT_ID}.${dataVersion}.${localChanges}`;
+}
+
+module.exports = {
+  bumpGeneration,
+  getGeneration
+};
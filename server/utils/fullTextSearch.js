@@ -0,0 +1,55 @@
+// Helpers for the FTS5 full-text index on shift_logs (see database/db.js)
+
+const MAX_SEARCH_TERMS = 16;
+const MAX_CODE_POINT = 0x10FFFF;
+
+const ENTITIES = {
+  '&nbsp;': ' ',
+  '&amp;': '&',
+  '&lt;': '<',
+  '&gt;': '>',
+  '&quot;': '"'
+};
+
+/**
+ * Plain text of a note for the search index
+ * Notes are stored as sanitized HTML (or markdown); tags and entities are
+ * removed so searching "strong" or "span" does not match every formatted note
+ */
+function noteToText(note) {
+  if (!note) return '';
+
+  return String(note)
+    // Block-level tags and line breaks separate words
+    .replace(/<\s*(br|\/p|\/div|\/li|\/pre)\b[^>]*>/gi, ' ')
+    .replace(/<[^>]*>/g, '')
+    // One pass, so a decoded "&amp;" never starts another entity;
+    // character references beyond Unicode are dropped
+    .replace(/&(nbsp|amp|lt|gt|quot|#(\d+));/g, (entity, name, code) => {
+      if (code === undefined) return ENTITIES[entity];
+      const codePoint = parseInt(code, 10);
+      return codePoint <= MAX_CODE_POINT ? String.fromCodePoint(codePoint) : '';
+    })
+    .replace(/\s+/g, ' ')
+    .trim();
+}
+
+/**
+ * Convert free text typed by the user into an FTS5 MATCH expression
+ * Every word must match (AND) and is prefix-matched, so "elev rep" finds
+ * "Elevator repaired". Returns null if the text contains no searchable words.
+ */
+function buildMatchQuery(search) {
+  const terms = String(search || '').normalize('NFKC').match(/[\p{L}\p{N}]+/gu);
+  if (!terms) return null;
+
+  return terms
+    .slice(0, MAX_SEARCH_TERMS)
+    .map((term) => `"${term}"*`)
+    .join(' ');
+}
+
+module.exports = {
+  noteToText,
+  buildMatchQuery
+};
@@ -0,0 +1,91 @@
+// HTML sanitization of notes (DOMPurify, jsdom-backed)
+// Slow on large notes, so it runs in the worker threads of
+// utils/sanitizerPool.js rather than on the request thread.
+
+// isomorphic-dompurify exports the sanitize function directly
+const DOMPurify = require('isomorphic-dompurify');
+
+// Function to sanitize style attribute manually
+function sanitizeStyleAttribute(styleValue) {
+  if (!styleValue) return '';
+
+  let style = styleValue;
+
+  // Remove dangerous CSS expressions
+  style = style.replace(/javascript:/gi, '');
+  style = style.replace(/expression\s*\(/gi, '');
+  style = style.replace(/url\s*\(\s*['"]?\s*javascript:/gi, '');
+
+  // Only allow safe CSS properties
+  const safeProperties = [
+    'color', 'background-color', 'background', 'font-weight', 'font-size',
+    'text-decoration', 'text-align', 'margin', 'padding', 'border',
+    'width', 'height', 'display', 'position', 'top', 'left', 'right', 'bottom'
+  ];
+
+  // Filter out dangerous properties
+  const properties = style.split(';').filter(prop => {
+    const trimmed = prop.trim();
+    if (!trimmed) return false;
+    const propName = trimmed.split(':')[0].trim().toLowerCase();
+    return safeProperties.some(safe => propName.includes(safe));
+  });
+
+  return properties.join('; ');
+}
+
+// Function to sanitize href attribute
+function sanitizeHrefAttribute(hrefValue) {
+  if (!hrefValue) return '';
+
+  const href = hrefValue.trim();
+  // Only allow http/https, relative paths, and anchors
+  if (/^https?:\/\//i.test(href) || href.startsWith('#') || href.startsWith('/')) {
+    return href;
+  }
+  // Block dangerous protocols
+  return '';
+}
+
+// Pre-process HTML to sanitize style and href attributes before DOMPurify
+function preSanitizeHTML(html) {
+  // Sanitize style attributes
+  html = html.replace(/style\s*=\s*["']([^"']*)["']/gi, (match, styleValue) => {
+    const sanitized = sanitizeStyleAttribute(styleValue);
+    return sanitized ? `style="${sanitized}"` : '';
+  });
+
+  // Sanitize href attributes
+  html = html.replace(/href\s*=\s*["']([^"']*)["']/gi, (match, hrefValue) => {
+    const sanitized = sanitizeHrefAttribute(hrefValue);
+    return sanitized ? `href="${sanitized}"` : '';
+  });
+
+  return html;
+}
+
+// Configure allowed tags and attributes
+const sanitizeConfig = {
+  ALLOWED_TAGS: ['b', 'i', 'u', 'ul', 'ol', 'li', 'p', 'br', 'strong', 'em', 'div', 'span', 'a', 'code', 'pre', 'mark', 's'],
+  ALLOWED_ATTR: ['style', 'class', 'href', 'target', 'rel'],
+  ALLOWED_URI_REGEXP: /^(?:(?:(?:f|ht)tps?|mailto|tel|callto|sms|cid|xmpp):|[^a-z]|[a-z+.\-]+(?:[^a-z+.\-:]|$))/i,
+  FORBID_ATTR: ['onerror', 'onload', 'onclick', 'onmouseover', 'onfocus', 'onblur'],
+  ALLOW_DATA_ATTR: false,
+  KEEP_CONTENT: true,
+  RETURN_DOM: false,
+  RETURN_DOM_FRAGMENT: false,
+  RETURN_TRUSTED_TYPE: false
+};
+
+/**
+ * Sanitize the HTML of a note (already trimmed and truncated)
+ * Throws if DOMPurify fails
+ */
+function sanitizeHTML(note) {
+  // Pre-sanitize style and href attributes
+  return DOMPurify.sanitize(preSanitizeHTML(note), sanitizeConfig);
+}
+
+module.exports = {
+  sanitizeHTML
+};
@@ -0,0 +1,15 @@
+// Loads a module on first use instead of at startup
+// Heavy modules needed by a few routes only (bcrypt, nodemailer, multer)
+// are required through this, so they don't add to the server's cold start.
+
+function lazyRequire(name) {
+  let loaded = null;
+  return () => {
+    if (!loaded) {
+      loaded = require(name);
+    }
+    return loaded;
+  };
+}
+
+module.exports = lazyRequire;
@@ -0,0 +1,200 @@
+const { getReadDb } = require('../database/db');
+const { LOG_COLUMNS } = require('./logQueries');
+const { bumpGeneration } = require('./dataGeneration');
+
+// Server-sent event feed of log changes (GET /api/logs/events)
+// Events come from the log_events table (filled by triggers, see
+// database/db.js), so every client sees the same ids whichever worker made
+// the change, and a reconnecting browser resumes from its Last-Event-ID.
+
+// While clients are connected, changes made by other worker processes are
+// picked up this often; local changes are sent straight away via notifyLogChange()
+const POLL_INTERVAL_MS = 1000;
+const HEARTBEAT_INTERVAL_MS = 25 * 1000; // Keeps idle connections open through proxies
+const RETRY_MS = 3000;                   // Browser reconnect delay
+const BATCH_SIZE = 500;
+
+const clients = new Set();
+let lastEventId = 0;
+let pollTimer = null;
+let heartbeatTimer = null;
+let polling = false;
+let pollAgain = false;
+
+function formatLog(row) {
+  return {
+    ...row,
+    is_archived: Boolean(row.is_archived),
+    is_deleted: Boolean(row.is_deleted),
+    reminder_date: row.reminder_date || null,
+    original_log_date: row.original_log_date || null
+  };
+}
+
+// Events after the given id, with the current state of each log entry
+function readEvents(afterId) {
+  return new Promise((resolve, reject) => {
+    getReadDb().all(
+      `SELECT log_events.id AS event_id, log_events.type AS event_type, log_events.log_id AS event_log_id, ${LOG_COLUMNS}
+       FROM log_events
+       LEFT JOIN shift_logs ON shift_logs.id = log_events.log_id
+       WHERE log_events.id > ?
+       ORDER BY log_events.id
+       LIMIT ${BATCH_SIZE}`,
+      [afterId],
+      (err, rows) => (err ? reject(err) : resolve(rows))
+    );
+  });
+}
+
+function queryOne(sql) {
+  return new Promise((resolve, reject) => {
+    getReadDb().get(sql, [], (err, row) => (err ? reject(err) : resolve(row)));
+  });
+}
+
+function formatEvent(row) {
+  const { event_id, event_type, event_log_id, ...log } = row;
+  const data = {
+    type: event_type,
+    id: event_log_id,
+    // Deleted entries are only sent as an id
+    log: event_type === 'deleted' || log.id === null ? null : formatLog(log)
+  };
+  return `id: ${event_id}\nevent: log\ndata: ${JSON.stringify(data)}\n\n`;
+}
+
+function send(res, message) {
+  res.write(message);
+  // Push through the compression middleware, if any
+  if (typeof res.flush === 'function') res.flush();
+}
+
+// Send every event newer than the last one broadcast to all clients
+async function poll() {
+  if (polling) {
+    pollAgain = true;
+    return;
+  }
+  polling = true;
+  try {
+    do {
+      pollAgain = false;
+      const rows = await readEvents(lastEventId);
+      for (const row of rows) {
+        const message = formatEvent(row);
+        clients.forEach((res) => send(res, message));
+        lastEventId = row.event_id;
+      }
+      if (rows.length === BATCH_SIZE) pollAgain = true;
+    } while (pollAgain && clients.size > 0);
+  } catch (err) {
+    console.error('Error reading log events:', err);
+  } finally {
+    polling = false;
+  }
+}
+
+function startTimers() {
+  pollTimer = setInterval(poll, POLL_INTERVAL_MS);
+  heartbeatTimer = setInterval(() => {
+    clients.forEach((res) => send(res, ': heartbeat\n\n'));
+  }, HEARTBEAT_INTERVAL_MS);
+}
+
+function stopTimers() {
+  clearInterval(pollTimer);
+  clearInterval(heartbeatTimer);
+  pollTimer = null;
+  heartbeatTimer = null;
+}
+
+/**
+ * Tell connected clients about a change made by this process right away
+ * Called by the routes and the reminder processor after a successful write;
+ * also moves the change generation on, so cached responses stop matching
+ */
+function notifyLogChange() {
+  bumpGeneration();
+  if (clients.size > 0) {
+    setImmediate(poll);
+  }
+}
+
+/**
+ * Handle GET /api/logs/events
+ * Replays events after Last-Event-ID (or ?last_event_id=) before streaming.
+ * If those events are no longer kept, a "reset" event tells the client to
+ * reload instead.
+ */
+async function subscribe(req, res) {
+  const resumeFrom = parseInt(req.headers['last-event-id'] || req.query.last_event_id, 10);
+
+  let latest;
+  try {
+    latest = await queryOne('SELECT COALESCE(MIN(id), 0) AS oldest, COALESCE(MAX(id), 0) AS newest FROM log_events');
+  } catch (err) {
+    console.error('Error opening log event stream:', err);
+    return res.status(500).json({
+      status: 'error',
+      code: 'DATABASE_ERROR',
+      message: 'Failed to open event stream',
+      details: {}
+    });
+  }
+
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  send(res, `retry: ${RETRY_MS}\n\n`);
+
+  // Nobody was listening, so nothing after the newest event was broadcast yet
+  if (clients.size === 0) {
+    lastEventId = Math.max(lastEventId, latest.newest);
+  }
+
+  if (Number.isNaN(resumeFrom)) {
+    // First connection: the ready event gives the browser its resume point
+    send(res, `id: ${lastEventId}\nevent: ready\ndata: {}\n\n`);
+  } else if (resumeFrom < latest.oldest - 1) {
+    send(res, `id: ${lastEventId}\nevent: reset\ndata: {}\n\n`);
+  } else {
+    // Replay up to the last broadcast event; the client joins the broadcast
+    // right after the loop (no await in between), so nothing is missed or sent twice
+    try {
+      let from = resumeFrom;
+      while (from < lastEventId) {
+        const rows = await readEvents(from);
+        const replay = rows.filter((row) => row.event_id <= lastEventId);
+        if (replay.length === 0) break;
+        replay.forEach((row) => send(res, formatEvent(row)));
+        from = replay[replay.length - 1].event_id;
+      }
+    } catch (err) {
+      console.error('Error replaying log events:', err);
+      send(res, `id: ${lastEventId}\nevent: reset\ndata: {}\n\n`);
+    }
+  }
+
+  if (res.destroyed) return;
+
+  clients.add(res);
+  if (clients.size === 1) {
+    startTimers();
+  }
+
+  req.on('close', () => {
+    clients.delete(res);
+    if (clients.size === 0) {
+      stopTimers();
+    }
+  });
+}
+
+module.exports = {
+  notifyLogChange,
+  subscribe
+};
@@ -0,0 +1,215 @@
+// SQL for the log list and search routes (routes/logs.js)
+// Kept here so database/checkQueryPlans.js can check the exact same queries
+// against the indexes created in database/db.js
+const { buildMatchQuery } = require('./fullTextSearch');
+
+// Reminder dates are ISO 8601 UTC strings (see utils/reminderProcessor.js),
+// so they are compared with the current time in the same format
+const NOW = `strftime('%Y-%m-%dT%H:%M:%fZ', 'now')`;
+
+// Columns returned to clients (note_text only exists for the search index)
+const LOG_COLUMNS = `shift_logs.id, shift_logs.log_date, shift_logs.short_description, shift_logs.note,
+  shift_logs.worker_name, shift_logs.color, shift_logs.created_at, shift_logs.updated_at,
+  shift_logs.is_archived, shift_logs.is_deleted, shift_logs.reminder_date, shift_logs.original_log_date`;
+
+// Cold storage (database/coldStorage.js): a cold row only counts once it is
+// listed in cold_log_ids, so a copy left behind by an interrupted move is
+// never returned next to the hot row
+const IN_COLD_INDEX = `EXISTS (SELECT 1 FROM main.cold_log_ids WHERE cold_log_ids.id = shift_logs.id)`;
+
+// Table name in the hot database, or in an attached cold one ('cold_2023')
+function table(name, schema) {
+  return schema ? `${schema}.${name}` : name;
+}
+
+// Search filter for the list queries: full-text index when the text has
+// searchable words, substring match otherwise (e.g. a search for "#")
+function searchFilter(search, params, schema) {
+  const match = buildMatchQuery(search);
+  if (match) {
+    params.push(match);
+    return ` AND id IN (SELECT rowid FROM ${table('shift_logs_fts', schema)} WHERE shift_logs_fts MATCH ?)`;
+  }
+  const searchTerm = `%${search}%`;
+  params.push(searchTerm, searchTerm, searchTerm);
+  return ` AND (
+      short_description LIKE ? OR
+      note LIKE ? OR
+      worker_name LIKE ?
+    )`;
+}
+
+// Filters shared by both list views
+function listFilters({ search, worker_name, start_date, end_date }, params, schema) {
+  let filters = '';
+
+  if (worker_name) {
+    filters += ` AND worker_name = ?`;
+    params.push(worker_name.toUpperCase().trim());
+  }
+
+  if (start_date) {
+    filters += ` AND log_date >= ?`;
+    params.push(start_date);
+  }
+
+  if (end_date) {
+    filters += ` AND log_date <= ?`;
+    params.push(end_date);
+  }
+
+  if (search) {
+    filters += searchFilter(search, params, schema);
+  }
+
+  return filters;
+}
+
+/**
+ * List query for GET /api/logs, newest first
+ * Every part walks idx_logs_visible (is_deleted, is_archived, log_date) in
+ * order, so pages come straight off the index without a sort.
+ * - Active: not archived and no future reminder
+ * - Archive: archived, plus active logs waiting for a future reminder. The
+ *   two sets are disjoint, so they are a UNION ALL of two index ranges
+ *   instead of an OR that no index can serve.
+ * - Cold: archive view only, one more part per attached cold schema
+ *   (options.coldSchemas); options.includeHot = false leaves out the hot parts
+ * options.after ({ logDate, id }) starts after a keyset cursor; limit and
+ * offset are appended as given. Returns the count query for the same filters.
+ */
+function buildListQuery(options) {
+  const { archived, after, limit, offset, coldSchemas = [], includeHot = true } = options;
+  const parts = [];
+  if (includeHot) {
+    const hotParts = archived
+      ? [
+        `is_deleted = 0 AND is_archived = 1`,
+        `is_deleted = 0 AND is_archived = 0 AND reminder_date > ${NOW}`
+      ]
+      : [
+        `is_deleted = 0 AND is_archived = 0 AND (reminder_date IS NULL OR reminder_date <= ${NOW})`
+      ];
+    hotParts.forEach((where) => parts.push({ schema: null, where }));
+  }
+  if (archived) {
+    coldSchemas.forEach((schema) => parts.push({ schema, where: `is_deleted = 0 AND is_archived = 1 AND ${IN_COLD_INDEX}` }));
+  }
+
+  const countParams = [];
+  const params = [];
+  const countSelects = [];
+  const selects = [];
+
+  for (const { schema, where } of parts) {
+    const from = table('shift_logs', schema);
+    const filters = listFilters(options, countParams, schema);
+    countSelects.push(`SELECT shift_logs.id FROM ${from} WHERE ${where}${filters}`);
+
+    let select = `SELECT ${LOG_COLUMNS} FROM ${from} WHERE ${where}${listFilters(options, params, schema)}`;
+    if (after) {
+      select += ` AND (log_date, id) < (?, ?)`;
+      params.push(after.logDate, after.id);
+    }
+    selects.push(select);
+  }
+
+  // id breaks ties between entries with the same log_date so pages never overlap
+  let query = `${selects.join(' UNION ALL ')} ORDER BY log_date DESC, id DESC LIMIT ?`;
+  params.push(limit);
+  if (offset !== undefined) {
+    query += ` OFFSET ?`;
+    params.push(offset);
+  }
+
+  return {
+    query,
+    params,
+    countQuery: `SELECT COUNT(*) as total FROM (${countSelects.join(' UNION ALL ')})`,
+    countParams
+  };
+}
+
+// One branch of the search query, on the hot table or a cold schema
+function searchBranch({ query, worker_name, start_date, end_date }, match, schema, withRank) {
+  let searchQuery;
+  let params;
+
+  if (match) {
+    const rank = withRank ? `, shift_logs_fts.rank AS search_rank` : '';
+    searchQuery = `
+      SELECT ${LOG_COLUMNS}${rank} FROM ${table('shift_logs_fts', schema)}
+      JOIN ${table('shift_logs', schema)} ON shift_logs.id = shift_logs_fts.rowid
+      WHERE shift_logs_fts MATCH ? AND shift_logs.is_deleted = 0
+    `;
+    params = [match];
+  } else {
+    const rank = withRank ? `, 0 AS search_rank` : '';
+    searchQuery = `
+      SELECT ${LOG_COLUMNS}${rank} FROM ${table('shift_logs', schema)}
+      WHERE is_deleted = 0 AND (
+        short_description LIKE ? OR
+        note LIKE ? OR
+        worker_name LIKE ?
+      )
+    `;
+    const searchTerm = `%${query}%`;
+    params = [searchTerm, searchTerm, searchTerm];
+  }
+
+  if (schema) {
+    searchQuery += ` AND ${IN_COLD_INDEX}`;
+  }
+
+  if (worker_name) {
+    searchQuery += ` AND shift_logs.worker_name = ?`;
+    params.push(worker_name.toUpperCase().trim());
+  }
+
+  if (start_date) {
+    searchQuery += ` AND shift_logs.log_date >= ?`;
+    params.push(start_date);
+  }
+
+  if (end_date) {
+    searchQuery += ` AND shift_logs.log_date <= ?`;
+    params.push(end_date);
+  }
+
+  return { query: searchQuery, params };
+}
+
+/**
+ * Query for GET /api/logs/search: ranked by relevance, then newest first
+ * With options.coldSchemas, the attached cold schemas are searched too and
+ * rows carry a search_rank column (the order across branches) for the
+ * caller to drop; options.includeHot = false leaves out the hot table.
+ */
+function buildSearchQuery(options) {
+  const { coldSchemas = [], includeHot = true } = options;
+  const match = buildMatchQuery(options.query);
+
+  if (coldSchemas.length === 0) {
+    const { query, params } = searchBranch(options, match, null, false);
+    return {
+      query: query + (match
+        ? ` ORDER BY shift_logs_fts.rank, shift_logs.log_date DESC`
+        : ` ORDER BY shift_logs.log_date DESC`),
+      params
+    };
+  }
+
+  const schemas = includeHot ? [null, ...coldSchemas] : coldSchemas;
+  const branches = schemas.map((schema) => searchBranch(options, match, schema, true));
+  return {
+    query: `SELECT * FROM (${branches.map((branch) => branch.query).join(' UNION ALL ')})
+      ORDER BY search_rank, log_date DESC`,
+    params: branches.flatMap((branch) => branch.params)
+  };
+}
+
+module.exports = {
+  LOG_COLUMNS,
+  buildListQuery,
+  buildSearchQuery
+};
@@ -0,0 +1,152 @@
+const { getDb, getReadDb } = require('../database/db');
+
+// Brute force protection: failed login attempts per client (IP + username)
+// The counters and blocks live in the login_attempts table (see
+// database/migrations.js), so they hold across worker processes: with
+// --workers N a client still gets MAX_ATTEMPTS tries, not N times as many.
+// Each failure is counted by a single statement, so concurrent failures
+// on different workers are never lost.
+// The table stays bounded however many identifiers are tried:
+// - At most MAX_TRACKED counters and, separately, MAX_TRACKED blocks; the
+//   triggers of database/migrations.js evict the least recently failed
+//   counter (or the block expiring first) in the statement that adds one
+//   over the cap, so flooding with new usernames evicts other counters
+//   before it can evict a block
+// - Failures are forgotten ATTEMPT_WINDOW_MS after the last one, blocks when
+//   they expire; a periodic sweep removes both even if the client never
+//   comes back
+
+const MAX_ATTEMPTS = 10;
+const BLOCK_DURATION_MS = 2 * 60 * 1000;   // 2 minutes
+const ATTEMPT_WINDOW_MS = 15 * 60 * 1000;  // Failures older than this don't count
+const MAX_TRACKED = 10000;                  // Also in the login_attempts triggers
+const SWEEP_INTERVAL_MS = 60 * 1000;
+
+// Counters of this process; tracked and blocked are table-wide, as of the last sweep
+let blocksIssued = 0;
+let failures = 0;
+let rejected = 0;
+let tracked = 0;
+let blocked = 0;
+let sweepTimer = null;
+
+function run(connection, sql, params) {
+  return new Promise((resolve, reject) => {
+    connection.run(sql, params, function(err) {
+      if (err) reject(err);
+      else resolve(this.changes);
+    });
+  });
+}
+
+function get(connection, sql, params) {
+  return new Promise((resolve, reject) => {
+    connection.get(sql, params, (err, row) => (err ? reject(err) : resolve(row)));
+  });
+}
+
+async function sweep() {
+  const db = getDb();
+  const now = Date.now();
+  await run(db, 'DELETE FROM login_attempts WHERE blocked_until IS NULL AND last_failure <= ?',
+    [now - ATTEMPT_WINDOW_MS]);
+  await run(db, 'DELETE FROM login_attempts WHERE blocked_until IS NOT NULL AND blocked_until <= ?', [now]);
+
+  const row = await get(db,
+    'SELECT COUNT(*) AS total, COUNT(blocked_until) AS blocked FROM login_attempts', []);
+  tracked = row.total - row.blocked;
+  blocked = row.blocked;
+}
+
+function startSweeping() {
+  sweepTimer = setInterval(() => {
+    sweep().catch((err) => console.error('Login attempt sweep failed:', err.message));
+  }, SWEEP_INTERVAL_MS);
+  sweepTimer.unref();
+}
+
+/**
+ * Is this client blocked? Resolves to { blocked, message }
+ */
+async function checkBruteForce(identifier) {
+  const row = await get(getReadDb(),
+    'SELECT blocked_until FROM login_attempts WHERE identifier = ?', [identifier]);
+
+  const now = Date.now();
+  if (!row || row.blocked_until === null || now >= row.blocked_until) {
+    // An expired block is reset by the next failure
+    return { blocked: false };
+  }
+
+  rejected += 1;
+  const remainingSeconds = Math.ceil((row.blocked_until - now) / 1000);
+  return {
+    blocked: true,
+    message: `Too many failed login attempts. Please wait ${remainingSeconds} seconds before trying again.`
+  };
+}
+
+/**
+ * Record a failed login; blocks the client after MAX_ATTEMPTS failures
+ * Never rejects: a failure to record is logged, the login answer stands.
+ */
+async function recordFailedAttempt(identifier) {
+  if (!sweepTimer) {
+    startSweeping();
+  }
+
+  failures += 1;
+  const db = getDb();
+  const now = Date.now();
+  try {
+    // After an expired block, counting starts from zero again
+    await run(db,
+      `INSERT INTO login_attempts (identifier, count, last_failure) VALUES ($identifier, 1, $now)
+       ON CONFLICT(identifier) DO UPDATE SET
+         count = CASE
+           WHEN blocked_until IS NULL AND $now - last_failure < $window THEN count + 1
+           ELSE 1
+         END,
+         blocked_until = CASE WHEN blocked_until > $now THEN blocked_until ELSE NULL END,
+         last_failure = $now`,
+      { $identifier: identifier, $now: now, $window: ATTEMPT_WINDOW_MS });
+    blocksIssued += await run(db,
+      `UPDATE login_attempts SET count = 0, blocked_until = ?
+       WHERE identifier = ? AND blocked_until IS NULL AND count >= ?`,
+      [now + BLOCK_DURATION_MS, identifier, MAX_ATTEMPTS]);
+  } catch (err) {
+    console.error('Failed to record login attempt:', err.message);
+  }
+}
+
+/**
+ * Forget a client after a successful login
+ */
+async function clearAttempts(identifier) {
+  try {
+    await run(getDb(), 'DELETE FROM login_attempts WHERE identifier = ?', [identifier]);
+  } catch (err) {
+    console.error('Failed to clear login attempts:', err.message);
+  }
+}
+
+/**
+ * Counters for monitoring
+ */
+function getLoginAttemptStats() {
+  return {
+    tracked,
+    blocked,
+    capacity: MAX_TRACKED,
+    failures,
+    blocks_issued: blocksIssued,
+    rejected
+  };
+}
+
+module.exports = {
+  checkBruteForce,
+  recordFailedAttempt,
+  clearAttempts,
+  getLoginAttemptStats
+};
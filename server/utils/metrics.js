@@ -0,0 +1,228 @@
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+// In-process metrics for GET /api/metrics (Prometheus text format)
+// Every process keeps its own (in multi-worker mode the launcher scrapes each
+// worker). Recording is a few additions per request or query, so it stays on
+// in production:
+// - Requests are keyed by route template (/api/logs/:id), never by raw URL
+// - Queries are keyed by their SQL text (parameters are placeholders), with
+//   runs of placeholders folded; past MAX_STATEMENTS distinct statements the
+//   rest are counted as "other"
+// - Event loop lag comes from perf_hooks' sampling histogram, reported per
+//   LAG_WINDOW_MS window so a scrape sees recent lag, not the lifetime's
+
+const REQUEST_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+const QUERY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5];
+const REMINDER_BUCKETS = [0.01, 0.05, 0.1, 0.5, 1, 5];
+const MAX_STATEMENTS = 100;
+const MAX_SQL_LENGTH = 200;
+const LAG_RESOLUTION_MS = 20;
+const LAG_WINDOW_MS = 60 * 1000;
+
+const requestCounts = new Map();   // 'method|route|status' -> count
+const requestDurations = new Map(); // 'method|route' -> histogram
+const queryDurations = new Map();  // statement -> histogram
+const statementKeys = new Map();   // raw SQL -> statement
+const reminderRuns = { histogram: createHistogram(REMINDER_BUCKETS), activated: 0, errors: 0 };
+
+let lagMonitor = null;
+let lagWindow = null; // { p50, p99, max } of the last full window (seconds)
+let lagTimer = null;
+
+function createHistogram(buckets) {
+  return { buckets, counts: new Array(buckets.length).fill(0), sum: 0, count: 0 };
+}
+
+function observe(histogram, value) {
+  const { buckets, counts } = histogram;
+  for (let i = 0; i < buckets.length; i++) {
+    if (value <= buckets[i]) {
+      counts[i] += 1;
+      break;
+    }
+  }
+  histogram.sum += value;
+  histogram.count += 1;
+}
+
+function histogramFor(map, key, buckets) {
+  let histogram = map.get(key);
+  if (!histogram) {
+    histogram = createHistogram(buckets);
+    map.set(key, histogram);
+  }
+  return histogram;
+}
+
+function routeLabel(req) {
+  if (req.route) {
+    return req.baseUrl + req.route.path;
+  }
+  return req.originalUrl.startsWith('/api') ? 'unmatched' : 'static';
+}
+
+/**
+ * Middleware counting requests and timing them by route template
+ */
+function trackRequests() {
+  return (req, res, next) => {
+    const start = process.hrtime.bigint();
+    res.on('finish', () => {
+      const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+      const route = routeLabel(req);
+      const status = `${Math.floor(res.statusCode / 100)}xx`;
+      const countKey = `${req.method}|${route}|${status}`;
+      requestCounts.set(countKey, (requestCounts.get(countKey) || 0) + 1);
+      observe(histogramFor(requestDurations, `${req.method}|${route}`, REQUEST_BUCKETS), seconds);
+    });
+    next();
+  };
+}
+
+function statementKey(sql) {
+  let key = statementKeys.get(sql);
+  if (key === undefined) {
+    if (statementKeys.size >= MAX_STATEMENTS * 10) {
+      return 'other';
+    }
+    key = sql.replace(/\s+/g, ' ').replace(/\?(\s*,\s*\?)+/g, '?, ...').trim().slice(0, MAX_SQL_LENGTH);
+    if (!queryDurations.has(key) && queryDurations.size >= MAX_STATEMENTS) {
+      key = 'other';
+    }
+    statementKeys.set(sql, key);
+  }
+  return key;
+}
+
+/**
+ * Records one finished query (listener for the sqlite3 'profile' event)
+ */
+function recordQuery(sql, milliseconds) {
+  observe(histogramFor(queryDurations, statementKey(sql), QUERY_BUCKETS), milliseconds / 1000);
+}
+
+/**
+ * Records one reminder processor run
+ */
+function recordReminderRun(seconds, activated, failed = false) {
+  observe(reminderRuns.histogram, seconds);
+  reminderRuns.activated += activated;
+  if (failed) reminderRuns.errors += 1;
+}
+
+function readLag() {
+  const toSeconds = (nanoseconds) => nanoseconds / 1e9;
+  return {
+    p50: toSeconds(lagMonitor.percentile(50)),
+    p99: toSeconds(lagMonitor.percentile(99)),
+    max: toSeconds(lagMonitor.max)
+  };
+}
+
+/**
+ * Starts sampling event loop lag (called once by index.js)
+ */
+function startMetrics() {
+  if (lagMonitor) return;
+  lagMonitor = monitorEventLoopDelay({ resolution: LAG_RESOLUTION_MS });
+  lagMonitor.enable();
+  lagTimer = setInterval(() => {
+    lagWindow = readLag();
+    lagMonitor.reset();
+  }, LAG_WINDOW_MS);
+  lagTimer.unref();
+}
+
+function escapeLabel(value) {
+  return String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+}
+
+function labels(pairs) {
+  const text = Object.keys(pairs).map((name) => `${name}="${escapeLabel(pairs[name])}"`).join(',');
+  return text ? `{${text}}` : '';
+}
+
+function writeMetric(lines, name, type, help, samples) {
+  lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`);
+  samples.forEach(([labelPairs, value]) => lines.push(`${name}${labels(labelPairs)} ${value}`));
+}
+
+function writeHistogram(lines, name, help, entries) {
+  lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} histogram`);
+  entries.forEach(([labelPairs, histogram]) => {
+    let cumulative = 0;
+    histogram.buckets.forEach((bound, i) => {
+      cumulative += histogram.counts[i];
+      lines.push(`${name}_bucket${labels({ ...labelPairs, le: bound })} ${cumulative}`);
+    });
+    lines.push(`${name}_bucket${labels({ ...labelPairs, le: '+Inf' })} ${histogram.count}`);
+    lines.push(`${name}_sum${labels(labelPairs)} ${histogram.sum}`);
+    lines.push(`${name}_count${labels(labelPairs)} ${histogram.count}`);
+  });
+}
+
+/**
+ * All metrics in the Prometheus text exposition format
+ * loginStats: getLoginAttemptStats() (passed in to keep this module free of
+ * route dependencies)
+ */
+function renderMetrics(loginStats) {
+  const lines = [];
+  const worker = process.env.WORKER_ID || '1';
+  const memory = process.memoryUsage();
+
+  writeMetric(lines, 'handover_info', 'gauge', 'Process information', [[{ worker, pid: process.pid }, 1]]);
+  writeMetric(lines, 'handover_http_requests_total', 'counter', 'HTTP requests by route template and status class',
+    Array.from(requestCounts, ([key, count]) => {
+      const [method, route, status] = key.split('|');
+      return [{ method, route, status }, count];
+    }));
+  writeHistogram(lines, 'handover_http_request_duration_seconds', 'HTTP request duration by route template',
+    Array.from(requestDurations, ([key, histogram]) => {
+      const [method, route] = key.split('|');
+      return [{ method, route }, histogram];
+    }));
+  writeHistogram(lines, 'handover_db_query_duration_seconds', 'SQLite statement duration (millisecond resolution)',
+    Array.from(queryDurations, ([statement, histogram]) => [{ statement }, histogram]));
+  writeHistogram(lines, 'handover_reminder_run_duration_seconds', 'Reminder processor run duration',
+    [[{}, reminderRuns.histogram]]);
+  writeMetric(lines, 'handover_reminders_activated_total', 'counter', 'Reminders activated',
+    [[{}, reminderRuns.activated]]);
+  writeMetric(lines, 'handover_reminder_errors_total', 'counter', 'Failed reminder processor runs',
+    [[{}, reminderRuns.errors]]);
+
+  if (lagMonitor) {
+    const lag = lagWindow || readLag();
+    writeMetric(lines, 'handover_event_loop_lag_seconds', 'gauge',
+      `Event loop lag over the last ${LAG_WINDOW_MS / 1000}s`,
+      [[{ quantile: '0.5' }, lag.p50], [{ quantile: '0.99' }, lag.p99], [{ quantile: '1' }, lag.max]]);
+  }
+  writeMetric(lines, 'process_resident_memory_bytes', 'gauge', 'Resident set size', [[{}, memory.rss]]);
+  writeMetric(lines, 'nodejs_heap_used_bytes', 'gauge', 'V8 heap in use', [[{}, memory.heapUsed]]);
+  writeMetric(lines, 'nodejs_heap_total_bytes', 'gauge', 'V8 heap allocated', [[{}, memory.heapTotal]]);
+  writeMetric(lines, 'process_uptime_seconds', 'gauge', 'Seconds since the process started',
+    [[{}, process.uptime()]]);
+
+  if (loginStats) {
+    writeMetric(lines, 'handover_login_failures_total', 'counter', 'Failed login attempts',
+      [[{}, loginStats.failures]]);
+    writeMetric(lines, 'handover_login_blocks_total', 'counter', 'Clients blocked after too many failures',
+      [[{}, loginStats.blocks_issued]]);
+    writeMetric(lines, 'handover_login_rejected_total', 'counter', 'Login attempts refused while blocked',
+      [[{}, loginStats.rejected]]);
+    writeMetric(lines, 'handover_login_blocked_clients', 'gauge', 'Clients currently blocked (all workers, as of the last sweep)',
+      [[{}, loginStats.blocked]]);
+    writeMetric(lines, 'handover_login_tracked_clients', 'gauge', 'Clients with recent failures (all workers, as of the last sweep)',
+      [[{}, loginStats.tracked]]);
+  }
+
+  return lines.join('\n') + '\n';
+}
+
+module.exports = {
+  trackRequests,
+  recordQuery,
+  recordReminderRun,
+  startMetrics,
+  renderMetrics
+};
@@ -0,0 +1,109 @@
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+const { promisify } = require('util');
+
+// Build step: writes .br and .gz copies next to the files of the React build,
+// compressed once at the highest level, for utils/compression.js to serve.
+// Copies newer than their original are kept, so running it again is cheap.
+//
+// Usage: node server/utils/precompress.js [build folder]
+// (npm run precompress; also run by the build scripts and at server start)
+
+const DEFAULT_BUILD_DIR = path.join(__dirname, '../../client/build');
+const COMPRESSIBLE = /\.(js|css|html|json|svg|txt|ico|webmanifest)$/i;
+const MIN_SIZE = 1024; // Smaller files gain nothing worth a second request header
+
+const brotliCompress = promisify(zlib.brotliCompress);
+const gzip = promisify(zlib.gzip);
+
+const ENCODERS = [
+  ['.br', (data) => brotliCompress(data, {
+    params: {
+      [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+      [zlib.constants.BROTLI_PARAM_SIZE_HINT]: data.length
+    }
+  })],
+  ['.gz', (data) => gzip(data, { level: zlib.constants.Z_BEST_COMPRESSION })]
+];
+
+async function listFiles(dir) {
+  const entries = await fs.promises.readdir(dir, { withFileTypes: true });
+  const files = [];
+  for (const entry of entries) {
+    const fullPath = path.join(dir, entry.name);
+    if (entry.isDirectory()) {
+      files.push(...await listFiles(fullPath));
+    } else if (COMPRESSIBLE.test(entry.name)) {
+      files.push(fullPath);
+    }
+  }
+  return files;
+}
+
+async function isUpToDate(target, sourceStat) {
+  try {
+    const stat = await fs.promises.stat(target);
+    return stat.mtimeMs >= sourceStat.mtimeMs;
+  } catch (err) {
+    return false;
+  }
+}
+
+/**
+ * Write missing or outdated .br/.gz copies for a build folder
+ * Resolves with the number of files written
+ */
+async function precompressDirectory(dir = DEFAULT_BUILD_DIR) {
+  let written = 0;
+
+  for (const file of await listFiles(dir)) {
+    const stat = await fs.promises.stat(file);
+    if (stat.size < MIN_SIZE) continue;
+
+    let data = null;
+    for (const [extension, encode] of ENCODERS) {
+      const target = file + extension;
+      if (await isUpToDate(target, stat)) continue;
+
+      data = data || await fs.promises.readFile(file);
+      const compressed = await encode(data);
+      if (compressed.length >= data.length) {
+        await fs.promises.rm(target, { force: true });
+        continue;
+      }
+
+      // Written under a temporary name, so the server never sends half a file
+      const tempFile = `${target}.${process.pid}.tmp`;
+      try {
+        await fs.promises.writeFile(tempFile, compressed);
+        await fs.promises.rename(tempFile, target);
+        written += 1;
+      } catch (err) {
+        // e.g. Windows refusing the rename while the old copy is being sent
+        await fs.promises.rm(tempFile, { force: true });
+        console.error(`Could not write ${target}: ${err.message}`);
+      }
+    }
+  }
+
+  return written;
+}
+
+if (require.main === module) {
+  const dir = path.resolve(process.argv[2] || DEFAULT_BUILD_DIR);
+  const start = Date.now();
+  precompressDirectory(dir)
+    .then((written) => {
+      console.log(`Precompressed ${written} file(s) in ${dir} (${Date.now() - start} ms)`);
+      process.exit(0);
+    })
+    .catch((err) => {
+      console.error('Precompression failed:', err.message);
+      process.exit(1);
+    });
+}
+
+module.exports = {
+  precompressDirectory
+};
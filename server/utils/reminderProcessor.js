@@ -1,4 +1,34 @@
 const { getDb } = require('../database/db');
+const { notifyLogChange } = require('./logEvents');
+const { recordReminderRun } = require('./metrics');
+
+// Reminder dates are stored as ISO 8601 UTC strings (Date.toISOString()),
+// which sort as text, so due reminders are an index range on idx_reminder_date
+const ISO_FORMAT = '%Y-%m-%dT%H:%M:%fZ';
+
+// Longest sleep between checks, even with no reminder due sooner. Covers
+// reminders written by another worker process and system clock changes.
+const MAX_SLEEP_MS = 60 * 60 * 1000; // 1 hour
+
+let timer = null;
+let running = false;
+
+/**
+ * Rewrite reminder dates stored in other formats as ISO 8601 UTC
+ * (older entries, or dates sent straight to the reminder route)
+ */
+function normalizeReminderDates() {
+  return new Promise((resolve, reject) => {
+    getDb().run(
+      `UPDATE shift_logs SET reminder_date = strftime('${ISO_FORMAT}', reminder_date)
+       WHERE reminder_date IS NOT NULL
+       AND reminder_date NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T[0-9][0-9]:[0-9][0-9]:[0-9][0-9].[0-9][0-9][0-9]Z'
+       AND strftime('${ISO_FORMAT}', reminder_date) IS NOT NULL`,
+      [],
+      (err) => (err ? reject(err) : resolve())
+    );
+  });
+}
 
 /**
  * Process reminders that have expired
@@ -7,78 +37,106 @@ const { getDb } = require('../database/db');
 function processReminders() {
   return new Promise((resolve, reject) => {
     const db = getDb();
-    
-    // Find all logs with reminder_date in the past that are still archived
-    // Use SQLite's datetime('now') for timezone consistency
-    const now = new Date().toISOString().replace('T', ' ').substring(0, 19);
-    
-    db.all(
-      `SELECT id, log_date, reminder_date FROM shift_logs 
-       WHERE reminder_date IS NOT NULL 
-       AND datetime(reminder_date) <= datetime('now') 
-       AND is_deleted = 0`,
-      [],
-      (err, rows) => {
+    const now = new Date().toISOString();
+
+    // Activate all logs whose reminders have expired
+    // Set log_date to restoration time, store original in original_log_date
+    db.run(
+      `UPDATE shift_logs
+       SET log_date = datetime('now'), original_log_date = log_date, reminder_date = NULL, is_archived = 0, updated_at = CURRENT_TIMESTAMP
+       WHERE reminder_date <= ? AND is_deleted = 0`,
+      [now],
+      function(err) {
         if (err) {
-          console.error('Error processing reminders:', err);
+          console.error('Error activating reminders:', err);
           return reject(err);
         }
-        
-        if (rows.length === 0) {
-          return resolve({ processed: 0 });
-        }
-        
-        // Activate all logs whose reminders have expired
-        // Set log_date to restoration time, store original in original_log_date
-        const ids = rows.map(row => row.id);
-        const placeholders = ids.map(() => '?').join(',');
-        
-        db.run(
-          `UPDATE shift_logs 
-           SET log_date = datetime('now'), original_log_date = log_date, reminder_date = NULL, is_archived = 0, updated_at = CURRENT_TIMESTAMP 
-           WHERE id IN (${placeholders})`,
-          ids,
-          function(updateErr) {
-            if (updateErr) {
-              console.error('Error activating reminders:', updateErr);
-              return reject(updateErr);
-            }
-            
-            if (process.env.NODE_ENV !== 'production') {
-              console.log(`Processed ${this.changes} reminder(s) - activated logs`);
-            }
-            resolve({ processed: this.changes });
+
+        if (this.changes > 0) {
+          notifyLogChange();
+          if (process.env.NODE_ENV !== 'production') {
+            console.log(`Processed ${this.changes} reminder(s) - activated logs`);
           }
-        );
+        }
+        resolve({ processed: this.changes });
       }
     );
   });
 }
 
+/**
+ * Date of the next pending reminder, or null if there is none
+ */
+function getNextReminderDate() {
+  return new Promise((resolve, reject) => {
+    getDb().get(
+      `SELECT reminder_date FROM shift_logs
+       WHERE reminder_date IS NOT NULL AND is_deleted = 0
+       ORDER BY reminder_date LIMIT 1`,
+      [],
+      (err, row) => (err ? reject(err) : resolve(row ? new Date(row.reminder_date) : null))
+    );
+  });
+}
+
+function arm(delay) {
+  clearTimeout(timer);
+  timer = setTimeout(runScheduler, Math.max(0, Math.min(delay, MAX_SLEEP_MS)));
+  // Don't keep the process alive just for the reminder timer
+  timer.unref();
+}
+
+// Activate due reminders, then sleep until the next one
+async function runScheduler() {
+  const start = process.hrtime.bigint();
+  const elapsed = () => Number(process.hrtime.bigint() - start) / 1e9;
+  try {
+    const { processed } = await processReminders();
+    recordReminderRun(elapsed(), processed);
+    const next = await getNextReminderDate();
+    if (!running) return;
+    arm(next && !isNaN(next) ? next.getTime() - Date.now() : MAX_SLEEP_MS);
+  } catch (err) {
+    recordReminderRun(elapsed(), 0, true);
+    console.error('Error in scheduled reminder processing:', err);
+    if (running) arm(MAX_SLEEP_MS);
+  }
+}
+
+/**
+ * Re-arm the scheduler after a reminder was set, changed or cleared
+ * Called by the log routes; does nothing before the scheduler is started
+ */
+function rescheduleReminders() {
+  if (running) {
+    arm(0);
+  }
+}
+
 /**
  * Start the reminder processor
- * Checks for expired reminders every 5 minutes
+ * Sleeps until the next reminder is due instead of polling
  */
 function startReminderProcessor() {
   if (process.env.NODE_ENV !== 'production') {
-    console.log('Reminder processor started - checking every 2 minutes');
+    console.log('Reminder processor started');
   }
-  
-  // Process immediately on start
-  processReminders().catch(err => {
-    console.error('Error in initial reminder processing:', err);
-  });
-  
-  // Then process every 2 minutes (more frequent for better responsiveness)
-  const interval = setInterval(() => {
-    processReminders().catch(err => {
-      console.error('Error in scheduled reminder processing:', err);
+
+  running = true;
+  normalizeReminderDates()
+    .catch(err => {
+      console.error('Error normalizing reminder dates:', err);
+    })
+    .then(() => {
+      // Process immediately on start
+      if (running) arm(0);
     });
-  }, 2 * 60 * 1000); // 2 minutes
-  
+
   // Return function to stop the processor
   return () => {
-    clearInterval(interval);
+    running = false;
+    clearTimeout(timer);
+    timer = null;
     if (process.env.NODE_ENV !== 'production') {
       console.log('Reminder processor stopped');
     }
@@ -87,6 +145,6 @@ function startReminderProcessor() {
 
 module.exports = {
   processReminders,
+  rescheduleReminders,
   startReminderProcessor
 };
-
@@ -0,0 +1,12 @@
+const { parentPort } = require('worker_threads');
+const { sanitizeHTML } = require('./htmlSanitizer');
+
+// Worker thread of utils/sanitizerPool.js: sanitizes one note per message
+
+parentPort.on('message', ({ id, note }) => {
+  try {
+    parentPort.postMessage({ id, note: sanitizeHTML(note) });
+  } catch (err) {
+    parentPort.postMessage({ id, error: err.message });
+  }
+});
@@ -0,0 +1,104 @@
+const os = require('os');
+const path = require('path');
+const { Worker } = require('worker_threads');
+
+// Pool of worker threads running utils/htmlSanitizer.js
+// DOMPurify on a large pasted note takes long enough to hold up every other
+// request, so it runs here instead of on the event loop. Threads start on
+// first use; a thread that dies fails its pending notes and is replaced on
+// the next call.
+// SANITIZER_THREADS sets the pool size; 0 sanitizes on the main thread.
+
+const WORKER_FILE = path.join(__dirname, 'sanitizeWorker.js');
+const DEFAULT_THREADS = Math.min(2, Math.max(1, os.cpus().length - 1));
+const THREADS = process.env.SANITIZER_THREADS !== undefined
+  ? Math.max(0, parseInt(process.env.SANITIZER_THREADS, 10) || 0)
+  : DEFAULT_THREADS;
+
+const threads = []; // { worker, pending: Map<id, { resolve, reject }> }
+let nextTaskId = 1;
+let inlineSanitizer = null;
+
+function removeThread(thread, err) {
+  const index = threads.indexOf(thread);
+  if (index !== -1) threads.splice(index, 1);
+  for (const task of thread.pending.values()) {
+    task.reject(err);
+  }
+  thread.pending.clear();
+}
+
+function startThread() {
+  const thread = { worker: new Worker(WORKER_FILE), pending: new Map() };
+  // Idle threads don't keep the process alive
+  thread.worker.unref();
+
+  thread.worker.on('message', ({ id, note, error }) => {
+    const task = thread.pending.get(id);
+    if (!task) return;
+    thread.pending.delete(id);
+    if (thread.pending.size === 0) thread.worker.unref();
+    if (error) {
+      task.reject(new Error(error));
+    } else {
+      task.resolve(note);
+    }
+  });
+  thread.worker.on('error', (err) => {
+    console.error('Sanitizer thread failed:', err);
+    removeThread(thread, err);
+  });
+  thread.worker.on('exit', (code) => {
+    removeThread(thread, new Error(`Sanitizer thread exited with code ${code}`));
+  });
+
+  threads.push(thread);
+  return thread;
+}
+
+// Least busy thread, starting a new one while the pool is not full
+function pickThread() {
+  let best = null;
+  for (const thread of threads) {
+    if (!best || thread.pending.size < best.pending.size) best = thread;
+  }
+  if (threads.length < THREADS && (!best || best.pending.size > 0)) {
+    return startThread();
+  }
+  return best;
+}
+
+/**
+ * Sanitize the HTML of a note off the main thread
+ * Resolves with the sanitized HTML; rejects if sanitization failed
+ */
+function sanitizeHTMLAsync(note) {
+  if (THREADS === 0) {
+    return new Promise((resolve) => {
+      if (!inlineSanitizer) {
+        inlineSanitizer = require('./htmlSanitizer');
+      }
+      resolve(inlineSanitizer.sanitizeHTML(note));
+    });
+  }
+
+  return new Promise((resolve, reject) => {
+    const thread = pickThread();
+    const id = nextTaskId++;
+    thread.pending.set(id, { resolve, reject });
+    thread.worker.ref();
+    thread.worker.postMessage({ id, note });
+  });
+}
+
+/**
+ * Stop all threads (scripts that exit when done)
+ */
+function closeSanitizerPool() {
+  return Promise.all(threads.slice().map(({ worker }) => worker.terminate()));
+}
+
+module.exports = {
+  sanitizeHTMLAsync,
+  closeSanitizerPool
+};
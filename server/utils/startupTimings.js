@@ -0,0 +1,31 @@
+const { performance } = require('perf_hooks');
+
+// Startup phase timings, printed once the server listens:
+//   [Startup] boot=40ms modules=410ms app=12ms db=85ms listen=3ms total=550ms compile_cache=off version=... node=...
+// Each phase in ms, counted from the process start (performance.timeOrigin):
+// boot is Node.js itself up to the first line of index.js, app the
+// middleware and route setup. The launchers parse this line
+// (server_supervisor.py) and keep a history in data/logs/startup.jsonl
+// to compare cold starts across versions.
+
+const marks = [['boot', performance.now()]];
+
+// Ends the phase called name now
+function markPhase(name) {
+  marks.push([name, performance.now()]);
+}
+
+// NODE_COMPILE_CACHE (set by the launchers) is honoured from Node.js 22.1 on
+function compileCacheState() {
+  if (!process.env.NODE_COMPILE_CACHE) return 'off';
+  const [major, minor] = process.versions.node.split('.').map(Number);
+  return major > 22 || (major === 22 && minor >= 1) ? 'on' : 'unsupported';
+}
+
+function formatStartup(version) {
+  const phases = marks.map(([name, at], i) => `${name}=${Math.round(at - (i ? marks[i - 1][1] : 0))}ms`);
+  const total = Math.round(marks[marks.length - 1][1]);
+  return `[Startup] ${phases.join(' ')} total=${total}ms compile_cache=${compileCacheState()} version=${version} node=${process.version}`;
+}
+
+module.exports = { markPhase, formatStartup };
@@ -1,77 +1,94 @@
-// isomorphic-dompurify exports the sanitize function directly
-const DOMPurify = require('isomorphic-dompurify');
-
-// Function to sanitize style attribute manually
-function sanitizeStyleAttribute(styleValue) {
-  if (!styleValue) return '';
-  
-  let style = styleValue;
-  
-  // Remove dangerous CSS expressions
-  style = style.replace(/javascript:/gi, '');
-  style = style.replace(/expression\s*\(/gi, '');
-  style = style.replace(/url\s*\(\s*['"]?\s*javascript:/gi, '');
-  
-  // Only allow safe CSS properties
-  const safeProperties = [
-    'color', 'background-color', 'background', 'font-weight', 'font-size',
-    'text-decoration', 'text-align', 'margin', 'padding', 'border',
-    'width', 'height', 'display', 'position', 'top', 'left', 'right', 'bottom'
-  ];
-  
-  // Filter out dangerous properties
-  const properties = style.split(';').filter(prop => {
-    const trimmed = prop.trim();
-    if (!trimmed) return false;
-    const propName = trimmed.split(':')[0].trim().toLowerCase();
-    return safeProperties.some(safe => propName.includes(safe));
-  });
-  
-  return properties.join('; ');
+const crypto = require('crypto');
+const { sanitizeHTMLAsync } = require('./sanitizerPool');
+
+const MAX_NOTE_LENGTH = 2500;
+const MAX_CACHED_NOTES = 500;
+
+// Sanitized notes by content hash (input and output), so a note saved again
+// unchanged, as on most updates, is not sanitized again
+const sanitizedNotes = new Map();
+
+// Only markup needs DOMPurify. Text that DOMPurify parses has its entities
+// normalised (a bare "&" becomes "&amp;"), but DOMPurify returns a string
+// without "<" as is, without parsing it, and the style/href pre-pass of
+// utils/htmlSanitizer.js only rewrites quoted attributes. So a note matching
+// neither is stored exactly as sanitizing would have stored it.
+const NEEDS_SANITIZING = /<|(?:style|href)\s*=\s*["']/i;
+
+function hashNote(note) {
+  return crypto.createHash('sha1').update(note).digest('hex');
 }
 
-// Function to sanitize href attribute
-function sanitizeHrefAttribute(hrefValue) {
-  if (!hrefValue) return '';
-  
-  const href = hrefValue.trim();
-  // Only allow http/https, relative paths, and anchors
-  if (/^https?:\/\//i.test(href) || href.startsWith('#') || href.startsWith('/')) {
-    return href;
+function cacheSanitizedNote(key, note) {
+  sanitizedNotes.delete(key);
+  sanitizedNotes.set(key, note);
+  if (sanitizedNotes.size > MAX_CACHED_NOTES) {
+    sanitizedNotes.delete(sanitizedNotes.keys().next().value);
   }
-  // Block dangerous protocols
-  return '';
 }
 
-// Pre-process HTML to sanitize style and href attributes before DOMPurify
-function preSanitizeHTML(html) {
-  // Sanitize style attributes
-  html = html.replace(/style\s*=\s*["']([^"']*)["']/gi, (match, styleValue) => {
-    const sanitized = sanitizeStyleAttribute(styleValue);
-    return sanitized ? `style="${sanitized}"` : '';
-  });
-  
-  // Sanitize href attributes
-  html = html.replace(/href\s*=\s*["']([^"']*)["']/gi, (match, hrefValue) => {
-    const sanitized = sanitizeHrefAttribute(hrefValue);
-    return sanitized ? `href="${sanitized}"` : '';
-  });
-  
-  return html;
+function escapeHTML(text) {
+  return text
+    .replace(/&/g, '&amp;')
+    .replace(/</g, '&lt;')
+    .replace(/>/g, '&gt;')
+    .replace(/"/g, '&quot;')
+    .replace(/'/g, '&#39;');
 }
 
-// Configure allowed tags and attributes
-const sanitizeConfig = {
-  ALLOWED_TAGS: ['b', 'i', 'u', 'ul', 'ol', 'li', 'p', 'br', 'strong', 'em', 'div', 'span', 'a', 'code', 'pre', 'mark', 's'],
-  ALLOWED_ATTR: ['style', 'class', 'href', 'target', 'rel'],
-  ALLOWED_URI_REGEXP: /^(?:(?:(?:f|ht)tps?|mailto|tel|callto|sms|cid|xmpp):|[^a-z]|[a-z+.\-]+(?:[^a-z+.\-:]|$))/i,
-  FORBID_ATTR: ['onerror', 'onload', 'onclick', 'onmouseover', 'onfocus', 'onblur'],
-  ALLOW_DATA_ATTR: false,
-  KEEP_CONTENT: true,
-  RETURN_DOM: false,
-  RETURN_DOM_FRAGMENT: false,
-  RETURN_TRUSTED_TYPE: false
-};
+// Truncate to MAX_NOTE_LENGTH characters of text, keeping tags whole
+function truncateNote(note) {
+  const textLength = note.replace(/<[^>]*>/g, '').length;
+  if (textLength <= MAX_NOTE_LENGTH) return note;
+
+  let truncated = '';
+  let count = 0;
+  let inTag = false;
+
+  for (let i = 0; i < note.length && count < MAX_NOTE_LENGTH; i++) {
+    if (note[i] === '<') {
+      inTag = true;
+      truncated += note[i];
+    } else if (note[i] === '>') {
+      inTag = false;
+      truncated += note[i];
+    } else {
+      truncated += note[i];
+      if (!inTag) count++;
+    }
+  }
+  return truncated;
+}
+
+/**
+ * Sanitize the HTML of a note
+ * Never rejects: if sanitizing fails the note is HTML-escaped instead
+ */
+async function sanitizeNote(rawNote) {
+  // Check text length before sanitization (for validation)
+  const note = truncateNote(rawNote.trim());
+  if (!NEEDS_SANITIZING.test(note)) {
+    return note;
+  }
+
+  const key = hashNote(note);
+  const cached = sanitizedNotes.get(key);
+  if (cached !== undefined) {
+    cacheSanitizedNote(key, cached);
+    return cached;
+  }
+
+  try {
+    const sanitized = await sanitizeHTMLAsync(note);
+    cacheSanitizedNote(key, sanitized);
+    // The sanitized note is what clients send back on update
+    cacheSanitizedNote(hashNote(sanitized), sanitized);
+    return sanitized;
+  } catch (error) {
+    console.error('Error sanitizing note:', error);
+    return escapeHTML(note);
+  }
+}
 
 function validateLogEntry(data, isUpdate = false) {
   const errors = {};
@@ -153,7 +170,7 @@ function validateLogEntry(data, isUpdate = false) {
   return { isValid, errors, message };
 }
 
-function sanitizeInput(data) {
+async function sanitizeInput(data) {
   const sanitized = {};
 
   if (data.log_date) {
@@ -169,63 +186,7 @@ function sanitizeInput(data) {
   }
 
   if (data.note) {
-    try {
-      // Sanitize HTML using DOMPurify
-      let note = data.note.trim();
-      
-      // First, check text length before sanitization (for validation)
-      const textLength = note.replace(/<[^>]*>/g, '').length;
-      if (textLength > 2500) {
-        // Truncate intelligently before sanitization
-        let truncated = '';
-        let count = 0;
-        let inTag = false;
-        
-        for (let i = 0; i < note.length && count < 2500; i++) {
-          if (note[i] === '<') {
-            inTag = true;
-            truncated += note[i];
-          } else if (note[i] === '>') {
-            inTag = false;
-            truncated += note[i];
-          } else {
-            truncated += note[i];
-            if (!inTag) count++;
-          }
-        }
-        note = truncated;
-      }
-      
-      // Pre-sanitize style and href attributes
-      note = preSanitizeHTML(note);
-      
-      // Sanitize with DOMPurify
-      // isomorphic-dompurify exports the sanitize function directly
-      // Wrap in try-catch in case DOMPurify throws an error
-      try {
-        note = DOMPurify.sanitize(note, sanitizeConfig);
-      } catch (purifyError) {
-        console.error('DOMPurify sanitization error:', purifyError);
-        // If DOMPurify fails, fall back to basic HTML escaping
-        note = note
-          .replace(/&/g, '&amp;')
-          .replace(/</g, '&lt;')
-          .replace(/>/g, '&gt;')
-          .replace(/"/g, '&quot;')
-          .replace(/'/g, '&#39;');
-      }
-      
-      sanitized.note = note;
-    } catch (error) {
-      console.error('Error sanitizing note:', error);
-      // Fall back to basic HTML escaping if anything fails
-      sanitized.note = data.note
-        .replace(/&/g, '&amp;')
-        .replace(/</g, '&lt;')
-        .replace(/>/g, '&gt;')
-        .replace(/"/g, '&quot;')
-        .replace(/'/g, '&#39;');
-    }
+    sanitized.note = await sanitizeNote(data.note);
   }
 
   if (data.worker_name) {
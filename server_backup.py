@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Online backups of the data folder for server.py and server-cli.py
+The live databases are copied with the SQLite backup API a few pages at a
+time with a short pause between steps, so the Node.js server keeps serving
+(in WAL mode a backup never blocks its writers). Old backups are rotated
+out, and new ones can be zipped on a background thread.
+"""
+
+import shutil
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+PAGES_PER_STEP = 64         # 256 KB per step with 4 KB pages
+STEP_PAUSE = 0.01           # Seconds between steps, leaves the disk to the server
+MAX_RESTARTS = 3            # A write restarts the copy; after this many, copy the rest in one step
+FIRST_BACKUP_DELAY = 60.0   # Seconds after start when the last backup is already due
+BACKUP_PREFIX = "backup-"
+PARTIAL_SUFFIX = ".partial"
+
+DEFAULT_SETTINGS = {
+    'backup_enabled': True,
+    'backup_interval_hours': 24,
+    'backup_keep': 14,
+    'backup_compress': True,
+    'backup_dir': None,     # Default: data/backups
+}
+
+# Copied as plain files next to the databases
+EXTRA_FILES = ('config.json',)
+
+
+class CopyRestarted(Exception):
+    """The source changed too often during a paced copy"""
+
+
+def backup_settings(config):
+    """Backup settings from a server_config.json dict, with defaults"""
+    settings = dict(DEFAULT_SETTINGS)
+    for key in DEFAULT_SETTINGS:
+        if config.get(key) is not None:
+            settings[key] = config[key]
+    return settings
+
+
+def copy_database(source_path, target_path, pages=PAGES_PER_STEP, pause=STEP_PAUSE):
+    """Consistent copy of a live database into a new file"""
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True, timeout=30)
+    target = sqlite3.connect(str(target_path))
+    try:
+        seen = {'remaining': None, 'restarts': 0}
+
+        def progress(status, remaining, total):
+            # Another connection wrote to the source: the copy starts over
+            if seen['remaining'] is not None and remaining > seen['remaining']:
+                seen['restarts'] += 1
+                if seen['restarts'] > MAX_RESTARTS:
+                    raise CopyRestarted()
+            seen['remaining'] = remaining
+            time.sleep(pause)
+
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        except CopyRestarted:
+            # Busy shift: one step is one read transaction, which WAL writers don't wait for
+            source.backup(target, pages=-1)
+
+        # A single self-contained file, readable without its -wal
+        target.execute('PRAGMA journal_mode = DELETE')
+        result = target.execute('PRAGMA quick_check').fetchone()[0]
+        if result != 'ok':
+            raise RuntimeError(f"Backup of {Path(source_path).name} failed its integrity check: {result}")
+    finally:
+        target.close()
+        source.close()
+
+
+def folder_size(path):
+    """Total size in bytes of a file or of the files in a folder"""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(item.stat().st_size for item in path.rglob('*') if item.is_file())
+
+
+def run_backup(data_dir, backup_dir):
+    """
+    Backs up the databases (shift_logs.db and the cold storage files in
+    archive/) and config.json into a new backup-YYYYmmdd-HHMMSS folder.
+    Returns {'path', 'size', 'duration', 'finished'}.
+    """
+    data_dir = Path(data_dir)
+    backup_dir = Path(backup_dir)
+    database = data_dir / "shift_logs.db"
+    if not database.exists():
+        raise FileNotFoundError(f"Database not found: {database}")
+
+    started = time.monotonic()
+    name = BACKUP_PREFIX + datetime.now().strftime('%Y%m%d-%H%M%S')
+    target = backup_dir / name
+    # Written under a temporary name, so a half-finished backup is never taken for a good one
+    partial = backup_dir / (name + PARTIAL_SUFFIX)
+    partial.mkdir(parents=True)
+    try:
+        copy_database(database, partial / database.name)
+        cold_files = sorted((data_dir / "archive").glob("shift_logs_*.db"))
+        if cold_files:
+            (partial / "archive").mkdir()
+        for cold_file in cold_files:
+            copy_database(cold_file, partial / "archive" / cold_file.name)
+        for extra in EXTRA_FILES:
+            if (data_dir / extra).exists():
+                shutil.copy2(data_dir / extra, partial / extra)
+        partial.rename(target)
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+
+    return {
+        'path': str(target),
+        'size': folder_size(target),
+        'duration': time.monotonic() - started,
+        'finished': datetime.now(),
+    }
+
+
+def compress_backup(path):
+    """Zips a backup folder into <folder>.zip and removes the folder, returns the zip path"""
+    folder = Path(path)
+    archive = folder.with_name(folder.name + ".zip")
+    partial = folder.with_name(folder.name + ".zip" + PARTIAL_SUFFIX)
+    try:
+        with zipfile.ZipFile(partial, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for item in sorted(folder.rglob('*')):
+                if item.is_file():
+                    zf.write(item, item.relative_to(folder).as_posix())
+        partial.rename(archive)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    shutil.rmtree(folder, ignore_errors=True)
+    return str(archive)
+
+
+def last_modified(path):
+    """Newest modification time of a file, or of a folder and anything in it"""
+    path = Path(path)
+    times = [path.stat().st_mtime]
+    if path.is_dir():
+        times.extend(item.stat().st_mtime for item in path.rglob('*'))
+    return max(times)
+
+
+def list_backups(backup_dir):
+    """Finished backups (folders and zips), oldest first"""
+    backup_dir = Path(backup_dir)
+    if not backup_dir.exists():
+        return []
+    return sorted(
+        (item for item in backup_dir.iterdir()
+         if item.name.startswith(BACKUP_PREFIX) and not item.name.endswith(PARTIAL_SUFFIX)),
+        key=lambda item: item.name
+    )
+
+
+def rotate_backups(backup_dir, keep, stale_before):
+    """
+    Deletes all but the newest keep backups, and leftovers of interrupted ones:
+    .partial entries untouched since stale_before (a time.time() value, the
+    start of the backup just made). Newer ones belong to a backup still being
+    written, e.g. by server-cli.py backup while the launcher runs.
+    """
+    backups = list_backups(backup_dir)
+    removed = []
+    for item in backups[:max(0, len(backups) - keep)]:
+        # A folder whose zip exists was being compressed when the launcher stopped
+        if item.is_dir():
+            shutil.rmtree(item, ignore_errors=True)
+        else:
+            item.unlink(missing_ok=True)
+        removed.append(item.name)
+    for item in Path(backup_dir).glob(BACKUP_PREFIX + "*" + PARTIAL_SUFFIX):
+        try:
+            if last_modified(item) >= stale_before:
+                continue
+        except FileNotFoundError:
+            continue   # Finished (renamed) meanwhile
+        if item.is_dir():
+            shutil.rmtree(item, ignore_errors=True)
+        else:
+            item.unlink(missing_ok=True)
+    return removed
+
+
+class BackupScheduler:
+    """
+    Backs up the data folder every interval_hours on a background thread.
+
+    on_event(event, detail) is called from background threads with
+    'started', 'finished' (result dict), 'compressed' (zip path),
+    'failed' (message) or 'busy' (message: skipped, another backup is still
+    running or being compressed). The result of the last backup is in .last.
+    """
+
+    def __init__(self, data_dir, backup_dir=None, interval_hours=24, keep=14, compress=True, on_event=None):
+        self.data_dir = Path(data_dir)
+        self.backup_dir = Path(backup_dir) if backup_dir else self.data_dir / "backups"
+        self.interval = max(0.1, float(interval_hours)) * 3600
+        self.keep = max(1, int(keep))
+        self.compress = compress
+        self.on_event = on_event
+        self.last = None
+        self._lock = threading.Lock()   # One backup at a time
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls, data_dir, settings, on_event=None):
+        """Scheduler for the settings returned by backup_settings()"""
+        return cls(data_dir, settings['backup_dir'], settings['backup_interval_hours'],
+                   settings['backup_keep'], settings['backup_compress'], on_event)
+
+    def _emit(self, event, detail=None):
+        if self.on_event:
+            self.on_event(event, detail)
+
+    def _first_delay(self):
+        """Seconds until the first backup: one interval after the newest existing one"""
+        backups = list_backups(self.backup_dir)
+        if not backups:
+            return FIRST_BACKUP_DELAY
+        age = time.time() - backups[-1].stat().st_mtime
+        return max(FIRST_BACKUP_DELAY, self.interval - age)
+
+    def start(self):
+        """Starts the schedule (no-op if already running)"""
+        if self._thread and self._thread.is_alive() and not self._stop.is_set():
+            return
+        # A fresh event per run, so a loop that was just stopped cannot pick up the new one
+        self._stop = threading.Event()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._loop, args=(self._stop,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the schedule; a backup in progress finishes on its own"""
+        self._stop.set()
+        self._wake.set()
+
+    def backup_now(self):
+        """Runs a backup now on a background thread"""
+        threading.Thread(target=self.run_once, daemon=True).start()
+
+    def _loop(self, stop):
+        delay = self._first_delay()
+        while not stop.is_set():
+            self._wake.wait(delay)
+            if stop.is_set():
+                break
+            self._wake.clear()
+            self.run_once()
+            delay = self.interval
+
+    def run_once(self):
+        """One backup (plus compression and rotation); returns the result or None"""
+        if not self._lock.acquire(blocking=False):
+            self._emit('busy', "Another backup is still running")
+            return None
+        handed_over = False
+        try:
+            started = time.time()
+            self._emit('started')
+            try:
+                result = run_backup(self.data_dir, self.backup_dir)
+            except Exception as e:
+                self._emit('failed', str(e))
+                return None
+            self.last = result
+            self._emit('finished', result)
+            if self.compress:
+                # Zipping takes longer than the copy and is not needed to restore;
+                # the thread keeps the lock until it has rotated
+                threading.Thread(target=self._compress_and_rotate, args=(result, started), daemon=True).start()
+                handed_over = True
+            else:
+                rotate_backups(self.backup_dir, self.keep, started)
+        finally:
+            if not handed_over:
+                self._lock.release()
+        return result
+
+    def _compress_and_rotate(self, result, started):
+        """Runs with the lock taken by run_once(), releases it"""
+        try:
+            try:
+                archive = compress_backup(result['path'])
+                result['path'] = archive
+                result['compressed_size'] = folder_size(archive)
+                self._emit('compressed', archive)
+            except Exception as e:
+                self._emit('failed', f"Compressing {Path(result['path']).name} failed: {e}")
+            rotate_backups(self.backup_dir, self.keep, started)
+        finally:
+            self._lock.release()
+
+
+def format_size(size):
+    """1536 -> '1.5 KB'"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def describe_backup(result):
+    """One-line summary of a backup result for the launchers"""
+    size = result.get('compressed_size', result['size'])
+    return (f"{result['finished'].strftime('%Y-%m-%d %H:%M')} "
+            f"({result['duration']:.1f}s, {format_size(size)})")
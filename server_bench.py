@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load generator for server-cli.py bench
+Seeds a scratch database and replays a mix of typical requests against a
+running server with a pool of keep-alive http.client connections
+"""
+
+import http.client
+import json
+import math
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_MIX = "list=50,search=20,create=10,archive=10,login=10"
+REQUEST_TIMEOUT = 30.0
+ARCHIVED_SHARE = 0.15       # Share of seeded rows that start archived
+SEED_DAYS = 180             # Seeded rows are spread over this many past days
+BENCH_USER = ('FO', 'pass123')  # Created by server/database/seedUsers.js
+
+# Same shapes as the sample rows in server/database/seed.js
+SAMPLE_LOGS = [
+    ('Guest complaint', 'Room 203 reported noise from construction. Offered room change, guest accepted. Moved to 405.', 'MAR'),
+    ('Maintenance issue', 'Elevator 2 stopped working. Technician called, ETA 14:00.', 'JDO'),
+    ('VIP arrival', 'Mr. Smith (VIP guest) checked in early. Given suite upgrade and welcome gift as per protocol.', 'ANA'),
+    ('Lost property', 'Guest left laptop charger in conference room B. Stored in lost & found, logged item #145.', 'TOM'),
+    ('Shift summary', 'Quiet evening shift. 12 check-ins, 8 check-outs. No issues. Restaurant fully booked for dinner.', 'LIS'),
+]
+SEARCH_TERMS = ['room', 'elevator', 'guest', 'charger', 'shift', 'vip', 'technician', 'restaurant', 'elev rep', 'check']
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate, br',
+}
+
+
+def parse_mix(text):
+    """Parses 'list=50,search=20' into {'list': 50, 'search': 20}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown request type '{name}' (choose from {', '.join(OPERATIONS)})")
+        try:
+            mix[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight for '{name}': {weight}") from None
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The request mix needs at least one positive weight")
+    return mix
+
+
+def iso_date(value):
+    """Same format as JavaScript's toISOString()"""
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + f"{value.microsecond // 1000:03d}Z"
+
+
+def seed_logs(db_path, rows, rng):
+    """Inserts synthetic shift_logs rows into a database the server has initialized"""
+    now = datetime.now(timezone.utc)
+    records = []
+    for i in range(rows):
+        short_description, note, worker_name = SAMPLE_LOGS[i % len(SAMPLE_LOGS)]
+        note = f"{note} Ref {i + 1}."
+        log_date = now - timedelta(minutes=rng.randint(0, SEED_DAYS * 24 * 60))
+        archived = 1 if rng.random() < ARCHIVED_SHARE else 0
+        # Plain-text notes: the search text is the note itself
+        records.append((iso_date(log_date), short_description, note, note, worker_name, archived))
+
+    connection = sqlite3.connect(db_path, timeout=30)
+    try:
+        with connection:
+            connection.executemany(
+                "INSERT INTO shift_logs (log_date, short_description, note, note_text, worker_name, is_archived) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                records
+            )
+        ids = [row[0] for row in connection.execute("SELECT id FROM shift_logs")]
+    finally:
+        connection.close()
+    return ids
+
+
+# Request builders: (rng, log_ids) -> (method, path, body)
+
+def op_list(rng, log_ids):
+    if rng.random() < 0.2:
+        return 'GET', '/api/logs?limit=50&archived=true', None
+    return 'GET', '/api/logs?limit=50', None
+
+
+def op_search(rng, log_ids):
+    query = rng.choice(SEARCH_TERMS).replace(' ', '+')
+    return 'GET', f'/api/logs/search?query={query}', None
+
+
+def op_create(rng, log_ids):
+    short_description, note, worker_name = rng.choice(SAMPLE_LOGS)
+    return 'POST', '/api/logs', {
+        'log_date': iso_date(datetime.now(timezone.utc)),
+        'short_description': short_description,
+        'note': f'<p><strong>{short_description}</strong></p><p>{note}</p>',
+        'worker_name': worker_name,
+    }
+
+
+def op_archive(rng, log_ids):
+    log_id = rng.choice(log_ids)
+    return 'PATCH', f'/api/logs/{log_id}/archive', {'is_archived': rng.random() < 0.5}
+
+
+def op_login(rng, log_ids):
+    username, password = BENCH_USER
+    return 'POST', '/api/auth/user/login', {'username': username, 'password': password}
+
+
+OPERATIONS = {
+    'list': op_list,
+    'search': op_search,
+    'create': op_create,
+    'archive': op_archive,
+    'login': op_login,
+}
+
+
+class ClientResults:
+    """Latencies (seconds) and error counts of one client thread"""
+
+    def __init__(self):
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.errors = {name: 0 for name in OPERATIONS}
+
+
+def run_client(port, mix, log_ids, deadline, rng, results):
+    """One client: sends requests back to back over a keep-alive connection until the deadline"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=REQUEST_TIMEOUT)
+    try:
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path, body = OPERATIONS[name](rng, log_ids)
+            payload = json.dumps(body).encode('utf-8') if body is not None else None
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=payload, headers=HEADERS)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=REQUEST_TIMEOUT)
+            elapsed = time.perf_counter() - started
+            if ok:
+                results.latencies[name].append(elapsed)
+            else:
+                results.errors[name] += 1
+    finally:
+        connection.close()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, seconds):
+    """Throughput and latency percentiles (milliseconds) of one request type"""
+    values = sorted(latencies)
+
+    def to_ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': round(len(values) / seconds, 1) if seconds > 0 else 0.0,
+        'p50_ms': to_ms(percentile(values, 50)),
+        'p95_ms': to_ms(percentile(values, 95)),
+        'p99_ms': to_ms(percentile(values, 99)),
+        'max_ms': to_ms(values[-1] if values else None),
+    }
+
+
+def run_load(port, mix, log_ids, concurrency, duration, seed=None):
+    """Runs concurrency clients for duration seconds, returns the report dict"""
+    master = random.Random(seed)
+    clients = [ClientResults() for _ in range(concurrency)]
+    started = time.monotonic()
+    deadline = started + duration
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(port, mix, log_ids, deadline, random.Random(master.random()), results),
+            daemon=True
+        )
+        for results in clients
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.monotonic() - started
+
+    endpoints = {}
+    all_latencies = []
+    total_errors = 0
+    for name in mix:
+        latencies = [value for client in clients for value in client.latencies[name]]
+        errors = sum(client.errors[name] for client in clients)
+        endpoints[name] = summarize(latencies, errors, seconds)
+        all_latencies.extend(latencies)
+        total_errors += errors
+
+    return {
+        'duration_s': round(seconds, 2),
+        'total': summarize(all_latencies, total_errors, seconds),
+        'endpoints': endpoints,
+    }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Log sink for the Node.js server output (GUI and CLI launchers)
+The supervisor's reader thread only appends each line to an in-memory
+queue, so the pipe is always drained and console.log never blocks the
+server. A writer thread appends the lines as JSON records to
+data/logs/server.jsonl, rotated by size and by day; rotated files are
+gzipped in the background. The terminal and the GUI are lossy
+subscribers: when they fall behind, they skip lines instead of slowing
+the server down.
+"""
+
+import gzip
+import json
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+ACTIVE_NAME = "server.jsonl"
+ROTATED_PREFIX = "server-"
+MAX_BYTES = 10 * 1024 * 1024    # Rotate the active file at this size...
+KEEP_FILES = 30                 # ...or at midnight; older rotated files are deleted
+QUEUE_SIZE = 100000             # Lines waiting for the writer (oldest dropped beyond)
+SUBSCRIBER_QUEUE_SIZE = 2000    # Lines waiting for a display
+FLUSH_INTERVAL = 1.0            # Seconds the writer waits for more lines before flushing
+
+
+class Subscriber:
+    """Delivers lines to a callback on its own thread, dropping the oldest when it lags"""
+
+    def __init__(self, callback, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.callback = callback
+        self.queue = deque(maxlen=queue_size)
+        self.dropped = 0
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def push(self, source, line):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1   # Approximate: only shown as a hint
+        self.queue.append((source, line))
+        self._wake.set()
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                self._deliver(None, f"... {dropped} line(s) not shown (display too slow, see data/logs)")
+            try:
+                while True:
+                    self._deliver(*self.queue.popleft())
+            except IndexError:
+                pass
+
+    def _deliver(self, source, line):
+        try:
+            self.callback(source, line)
+        except Exception:
+            pass  # A broken display must not stop the others
+
+
+class LogSink:
+    """
+    write(source, line) never blocks on disk or display. Records are
+    {"time", "source", "message"} JSON lines; lines dropped because the
+    writer fell behind are counted in a record of their own.
+    """
+
+    def __init__(self, log_dir, max_bytes=MAX_BYTES, keep=KEEP_FILES, queue_size=QUEUE_SIZE):
+        self.log_dir = Path(log_dir)
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self._queue = deque()
+        self._queue_size = queue_size
+        self._dropped = 0
+        self._subscribers = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._file = None
+        self._file_day = None
+        self._thread = None
+
+    def start(self):
+        """Opens the log file and starts the writer thread"""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        # Rotated files left uncompressed by an earlier run
+        pending = sorted(self.log_dir.glob(ROTATED_PREFIX + "*.jsonl"))
+        if pending:
+            threading.Thread(target=self._compress, args=(pending,), daemon=True).start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def subscribe(self, callback, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        """Calls callback(source, line) for every line, on a thread of its own (source None for notices)"""
+        subscriber = Subscriber(callback, queue_size)
+        self._subscribers.append(subscriber)
+        return subscriber
+
+    def write(self, source, line):
+        """Queues one line of server output (safe to call from any thread)"""
+        line = line.rstrip('\r\n')
+        with self._condition:
+            if len(self._queue) >= self._queue_size:
+                self._queue.popleft()
+                self._dropped += 1
+            self._queue.append((time.time(), source, line))
+            self._condition.notify()
+        for subscriber in self._subscribers:
+            subscriber.push(source, line)
+
+    def stop(self):
+        """Writes what is queued, closes the file and stops the subscribers"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+        for subscriber in self._subscribers:
+            subscriber.close()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait(FLUSH_INTERVAL)
+                batch = list(self._queue)
+                self._queue.clear()
+                dropped, self._dropped = self._dropped, 0
+                closed = self._closed
+            try:
+                if batch or dropped:
+                    self._write_batch(batch, dropped)
+            except OSError:
+                pass  # Disk full or file locked: keep draining, try again with the next batch
+            if closed:
+                break
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write_batch(self, batch, dropped):
+        lines = []
+        if dropped:
+            lines.append(json.dumps({
+                'time': datetime.now().isoformat(timespec='milliseconds'),
+                'source': 'launcher',
+                'message': f"{dropped} line(s) dropped, the log writer fell behind",
+            }))
+        for created, source, line in batch:
+            lines.append(json.dumps({
+                'time': datetime.fromtimestamp(created).isoformat(timespec='milliseconds'),
+                'source': source,
+                'message': line,
+            }, ensure_ascii=False))
+        log_file = self._open()
+        log_file.write('\n'.join(lines) + '\n')
+        log_file.flush()
+        if log_file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _open(self):
+        """The active file, rotating it first if it is from another day"""
+        today = datetime.now().date()
+        if self._file and self._file_day != today:
+            self._rotate()
+        if not self._file:
+            path = self.log_dir / ACTIVE_NAME
+            if path.exists() and datetime.fromtimestamp(path.stat().st_mtime).date() != today:
+                self._rotate()
+            self._file = open(path, 'a', encoding='utf-8')
+            self._file_day = today
+        return self._file
+
+    def _rotate(self):
+        """Renames the active file and compresses it in the background"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        path = self.log_dir / ACTIVE_NAME
+        if not path.exists():
+            return
+        rotated = self.log_dir / f"{ROTATED_PREFIX}{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.jsonl"
+        path.rename(rotated)
+        threading.Thread(target=self._compress, args=([rotated],), daemon=True).start()
+
+    def _compress(self, paths):
+        for path in paths:
+            target = path.with_name(path.name + ".gz")
+            try:
+                with open(path, 'rb') as source, gzip.open(target, 'wb') as compressed:
+                    shutil.copyfileobj(source, compressed)
+                path.unlink()
+            except OSError:
+                target.unlink(missing_ok=True)
+                continue
+        rotated = sorted(self.log_dir.glob(ROTATED_PREFIX + "*.jsonl.gz"))
+        for old in rotated[:max(0, len(rotated) - self.keep)]:
+            old.unlink(missing_ok=True)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scraper for the server's /api/metrics (Prometheus text format)
+Turns the metrics of one or more Node.js processes into the few headline
+numbers the launchers show: request rate, p95 latency, errors, memory,
+event loop lag and login blocks
+
+/api/metrics only answers requests carrying the launcher's per-launch
+token (X-Launcher-Token). The launchers also save it to data/launcher.token,
+so `server-cli.py status` can read the metrics of a running server.
+"""
+
+import os
+import re
+import threading
+import time
+import urllib.request
+
+METRICS_PATH = "/api/metrics"
+TOKEN_HEADER = "X-Launcher-Token"
+TOKEN_FILE = "launcher.token"
+SCRAPE_TIMEOUT = 2.0
+POLL_INTERVAL = 10.0
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """Prometheus text -> {name: [(labels dict, value)]}"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        match = SAMPLE.match(line)
+        if not match:
+            continue
+        name, label_text, value = match.groups()
+        labels = {key: raw.replace('\\"', '"').replace('\\n', '\n').replace('\\\\', '\\')
+                  for key, raw in LABEL.findall(label_text or '')}
+        try:
+            samples.setdefault(name, []).append((labels, float(value)))
+        except ValueError:
+            continue
+    return samples
+
+
+def save_launcher_token(data_dir, token):
+    """Saves the token of the server just started, readable by the owner only; False if that failed"""
+    path = os.path.join(data_dir, TOKEN_FILE)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(token)
+    except OSError:
+        return False
+    return True
+
+
+def load_launcher_token(data_dir):
+    """Token saved by the last launch, or None"""
+    try:
+        with open(os.path.join(data_dir, TOKEN_FILE), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def scrape_metrics(port, token, timeout=SCRAPE_TIMEOUT):
+    """Parsed metrics of the server on port, or None if it does not answer (or refuses the token)"""
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{METRICS_PATH}",
+                                     headers={TOKEN_HEADER: token or ''})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if response.status != 200:
+                return None
+            return parse_metrics(response.read().decode('utf-8'))
+    except Exception:
+        return None
+
+
+def total(samples, name, **match):
+    """Sum of the samples of name whose labels match"""
+    return sum(value for labels, value in samples.get(name, ())
+               if all(labels.get(key) == wanted for key, wanted in match.items()))
+
+
+def histogram_quantile(samples, name, quantile):
+    """Quantile over all series of a histogram, interpolated within its bucket"""
+    buckets = {}
+    for labels, value in samples.get(name + '_bucket', ()):
+        bound = float(labels.get('le', 'nan'))
+        buckets[bound] = buckets.get(bound, 0.0) + value
+    if not buckets:
+        return None
+    bounds = sorted(buckets)
+    count = buckets[bounds[-1]]
+    if count <= 0:
+        return None
+    rank = quantile * count
+    previous_bound, previous_count = 0.0, 0.0
+    for bound in bounds:
+        if buckets[bound] >= rank:
+            if bound == float('inf'):
+                return previous_bound
+            share = (rank - previous_count) / max(buckets[bound] - previous_count, 1e-9)
+            return previous_bound + (bound - previous_bound) * share
+        previous_bound, previous_count = bound, buckets[bound]
+    return previous_bound
+
+
+def merge(scrapes):
+    """Metrics of several workers as one set (series are summed or kept side by side)"""
+    merged = {}
+    for samples in scrapes:
+        for name, series in samples.items():
+            merged.setdefault(name, []).extend(series)
+    return merged
+
+
+def headline(samples, previous=None, elapsed=None):
+    """
+    Headline numbers from merged metrics. Request rate and error count are
+    since the previous scrape when previous/elapsed are given, else totals.
+    """
+    requests = total(samples, 'handover_http_requests_total')
+    errors = total(samples, 'handover_http_requests_total', status='5xx')
+    rate = None
+    if previous is not None and elapsed:
+        # A restarted worker starts counting from zero again
+        rate = max(0.0, requests - previous['requests']) / elapsed
+        errors = max(0.0, errors - previous['errors_total'])
+    p95 = histogram_quantile(samples, 'handover_http_request_duration_seconds', 0.95)
+    query_p95 = histogram_quantile(samples, 'handover_db_query_duration_seconds', 0.95)
+    lags = [value for labels, value in samples.get('handover_event_loop_lag_seconds', ())
+            if labels.get('quantile') == '0.99']
+    # Every worker reports the same shared table, as of its last sweep
+    blocked = [value for labels, value in samples.get('handover_login_blocked_clients', ())]
+    return {
+        'requests': requests,
+        'errors_total': total(samples, 'handover_http_requests_total', status='5xx'),
+        'errors': errors,
+        'rate': rate,
+        'p95_ms': None if p95 is None else p95 * 1000,
+        'query_p95_ms': None if query_p95 is None else query_p95 * 1000,
+        'rss_mb': total(samples, 'process_resident_memory_bytes') / (1024 * 1024),
+        'heap_mb': total(samples, 'nodejs_heap_used_bytes') / (1024 * 1024),
+        'lag_ms': max(lags) * 1000 if lags else None,
+        'login_blocked': max(blocked) if blocked else 0,
+        'workers': len(samples.get('handover_info', ())) or 1,
+    }
+
+
+def format_headline(numbers):
+    """One status line, e.g. '2.5 req/s · p95 12 ms · 0 errors · RSS 80 MB · lag 3 ms'"""
+    def ms(value):
+        return '-' if value is None else f"{value:.0f} ms"
+
+    if numbers['rate'] is None:
+        requests = f"{numbers['requests']:.0f} requests"
+    else:
+        requests = f"{numbers['rate']:.1f} req/s"
+    parts = [
+        requests,
+        f"p95 {ms(numbers['p95_ms'])}",
+        f"{numbers['errors']:.0f} errors",
+        f"DB p95 {ms(numbers['query_p95_ms'])}",
+        f"RSS {numbers['rss_mb']:.0f} MB",
+        f"heap {numbers['heap_mb']:.0f} MB",
+        f"lag {ms(numbers['lag_ms'])}",
+    ]
+    if numbers['login_blocked']:
+        parts.append(f"{numbers['login_blocked']:.0f} login(s) blocked")
+    return ' · '.join(parts)
+
+
+class MetricsPoller:
+    """
+    Scrapes the given ports with the launcher token every interval seconds
+    on a background thread and calls on_update(numbers) with headline() of
+    the merged metrics (None when no server answered).
+    """
+
+    def __init__(self, ports, token, on_update, interval=POLL_INTERVAL):
+        self.ports = list(ports)
+        self.token = token
+        self.on_update = on_update
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts polling"""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, args=(self._stop,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops polling (an update in flight may still arrive)"""
+        self._stop.set()
+
+    def _loop(self, stop):
+        previous = None
+        previous_at = None
+        while not stop.wait(self.interval):
+            scrapes = [samples for samples in (scrape_metrics(port, self.token) for port in self.ports)
+                       if samples]
+            if not scrapes:
+                previous = None
+                self.on_update(None)
+                continue
+            now = time.monotonic()
+            numbers = headline(merge(scrapes), previous, now - previous_at if previous else None)
+            previous, previous_at = numbers, now
+            self.on_update(numbers)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resource monitor for the Node.js child process (GUI and CLI launchers)
+Samples CPU, RSS, open file descriptors (handles on Windows) and threads of
+the supervised process at a fixed interval, keeps a bounded time series and
+raises an alarm when RSS keeps growing past its baseline
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque, namedtuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SNAPSHOT_PATH = "/api/internal/heap-snapshot"
+RECENT_SAMPLES = 120        # Full-resolution samples kept (10 minutes at 5s)
+GROUP_SIZE = 12             # Samples averaged into one history point (1 minute at 5s)
+HISTORY_POINTS = 1440       # History points kept (24 hours of 1-minute points at 5s)
+WARMUP = 120.0              # Seconds after a (re)start before the RSS baseline is taken
+
+DEFAULT_SETTINGS = {
+    'monitor_interval': 5,          # Seconds between samples
+    'monitor_rss_alarm_mb': 300,    # RSS growth over the baseline that raises the alarm (0 = off)
+    'monitor_heap_snapshot': False, # Also have Node.js write a heap snapshot into data/ on alarm
+}
+
+# cpu: percent of one core since the previous sample; rss in bytes;
+# fds / threads may be None when the platform doesn't tell
+Sample = namedtuple('Sample', 'time cpu rss fds threads')
+
+
+def monitor_settings(config):
+    """Monitor settings from a server_config.json dict, with defaults"""
+    settings = dict(DEFAULT_SETTINGS)
+    for key in DEFAULT_SETTINGS:
+        if config.get(key) is not None:
+            settings[key] = config[key]
+    return settings
+
+
+def monitoring_available():
+    """True if process stats can be read here (psutil, or /proc on Linux)"""
+    return psutil is not None or os.path.exists('/proc/self/stat')
+
+
+def read_process(pid):
+    """(cpu seconds, rss bytes, fds, threads) of pid, or None if it is gone"""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                times = process.cpu_times()
+                fds = process.num_handles() if sys.platform == 'win32' else process.num_fds()
+                return times.user + times.system, process.memory_info().rss, fds, process.num_threads()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            # The command name may contain spaces: fields start after its ')'
+            fields = f.read().rsplit(')', 1)[1].split()
+    except OSError:
+        return None
+    ticks = os.sysconf('SC_CLK_TCK')
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    threads = int(fields[17])
+    rss = int(fields[21]) * os.sysconf('SC_PAGE_SIZE')
+    try:
+        fds = len(os.listdir(f'/proc/{pid}/fd'))
+    except OSError:
+        fds = None
+    return cpu, rss, fds, threads
+
+
+def combine(samples):
+    """One history point: mean CPU, peak RSS / fds / threads"""
+    def peak(values):
+        values = [value for value in values if value is not None]
+        return max(values) if values else None
+
+    return Sample(
+        time=samples[-1].time,
+        cpu=sum(sample.cpu for sample in samples) / len(samples),
+        rss=max(sample.rss for sample in samples),
+        fds=peak(sample.fds for sample in samples),
+        threads=peak(sample.threads for sample in samples),
+    )
+
+
+class TimeSeries:
+    """Recent samples at full resolution, older ones downsampled in groups; memory is fixed"""
+
+    def __init__(self, recent=RECENT_SAMPLES, group=GROUP_SIZE, history=HISTORY_POINTS):
+        self.recent = deque(maxlen=recent)
+        self.history = deque(maxlen=history)
+        self.group = group
+        self._pending = []
+
+    def add(self, sample):
+        self.recent.append(sample)
+        self._pending.append(sample)
+        if len(self._pending) >= self.group:
+            self.history.append(combine(self._pending))
+            self._pending = []
+
+    def since(self, seconds):
+        """Full-resolution samples of the last seconds"""
+        cutoff = time.monotonic() - seconds
+        return [sample for sample in self.recent if sample.time >= cutoff]
+
+
+def summarize(samples):
+    """CPU average/peak and RSS range of samples, or None if empty"""
+    if not samples:
+        return None
+    last = samples[-1]
+    return {
+        'cpu_avg': sum(sample.cpu for sample in samples) / len(samples),
+        'cpu_max': max(sample.cpu for sample in samples),
+        'rss': last.rss,
+        'rss_min': min(sample.rss for sample in samples),
+        'rss_max': max(sample.rss for sample in samples),
+        'fds': last.fds,
+        'threads': last.threads,
+    }
+
+
+def format_sample(sample):
+    """'CPU 3% · RSS 85 MB · 24 FDs · 11 threads'"""
+    parts = [f"CPU {sample.cpu:.0f}%", f"RSS {sample.rss / (1024 * 1024):.0f} MB"]
+    if sample.fds is not None:
+        parts.append(f"{sample.fds} {'handles' if sys.platform == 'win32' else 'FDs'}")
+    if sample.threads is not None:
+        parts.append(f"{sample.threads} threads")
+    return ' · '.join(parts)
+
+
+def format_summary(summary):
+    """'CPU avg 3% (max 40%) · RSS 85 MB (80-90) · 24 FDs · 11 threads'"""
+    mb = 1024 * 1024
+    parts = [
+        f"CPU avg {summary['cpu_avg']:.0f}% (max {summary['cpu_max']:.0f}%)",
+        f"RSS {summary['rss'] / mb:.0f} MB ({summary['rss_min'] / mb:.0f}-{summary['rss_max'] / mb:.0f})",
+    ]
+    if summary['fds'] is not None:
+        parts.append(f"{summary['fds']} {'handles' if sys.platform == 'win32' else 'FDs'}")
+    if summary['threads'] is not None:
+        parts.append(f"{summary['threads']} threads")
+    return ' · '.join(parts)
+
+
+def request_heap_snapshot(port, token, timeout=120.0):
+    """Asks the server to write a heap snapshot, returns its file name"""
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}{SNAPSHOT_PATH}",
+        data=b'',
+        method='POST',
+        headers={'X-Launcher-Token': token}
+    )
+    # Writing the snapshot blocks the server for a while: a long timeout
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8')).get('file')
+
+
+class ResourceMonitor:
+    """
+    Samples the supervisor's current Node.js process every interval seconds.
+
+    on_event(event, detail) is called from the sampling thread with
+    'sample' (Sample), 'summary' (summarize() of the last summary_interval
+    seconds, only if summary_interval is set) or 'alarm' (message).
+    The series restarts its baseline when the supervisor restarts the server.
+    """
+
+    def __init__(self, supervisor, on_event, interval=5, rss_alarm_mb=300,
+                 snapshot_token=None, summary_interval=None):
+        self.supervisor = supervisor
+        self.on_event = on_event
+        self.interval = max(1.0, float(interval))
+        self.rss_alarm = max(0, float(rss_alarm_mb)) * 1024 * 1024
+        self.snapshot_token = snapshot_token
+        self.summary_interval = summary_interval
+        self.series = TimeSeries()
+        self.last = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls, supervisor, settings, on_event, snapshot_token=None, summary_interval=None):
+        """Monitor for the settings returned by monitor_settings()"""
+        return cls(supervisor, on_event, settings['monitor_interval'], settings['monitor_rss_alarm_mb'],
+                   snapshot_token if settings['monitor_heap_snapshot'] else None, summary_interval)
+
+    def start(self):
+        """Starts sampling"""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, args=(self._stop,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops sampling"""
+        self._stop.set()
+
+    def _loop(self, stop):
+        pid = None
+        previous = None     # (monotonic time, cpu seconds) of the previous reading
+        baseline = None
+        next_alarm = None
+        next_summary = time.monotonic() + (self.summary_interval or 0)
+        while not stop.wait(self.interval):
+            process = self.supervisor.process
+            if process is None or process.poll() is not None:
+                continue
+            if process.pid != pid:
+                # New process (first start or restart): start over
+                pid, previous, baseline, next_alarm = process.pid, None, None, None
+                started = time.monotonic()
+            reading = read_process(pid)
+            if reading is None:
+                continue
+            now = time.monotonic()
+            cpu_seconds, rss, fds, threads = reading
+            if previous is None:
+                previous = (now, cpu_seconds)
+                continue
+            cpu = max(0.0, (cpu_seconds - previous[1]) / (now - previous[0]) * 100)
+            previous = (now, cpu_seconds)
+
+            sample = Sample(now, cpu, rss, fds, threads)
+            self.series.add(sample)
+            self.last = sample
+            self.on_event('sample', sample)
+
+            if self.rss_alarm and now - started >= WARMUP:
+                if baseline is None:
+                    baseline = rss
+                    next_alarm = baseline + self.rss_alarm
+                elif rss >= next_alarm:
+                    # Once per step of growth, not on every sample above it
+                    next_alarm = rss + self.rss_alarm
+                    self._alarm(baseline, rss)
+
+            if self.summary_interval and now >= next_summary:
+                next_summary = now + self.summary_interval
+                summary = summarize(self.series.since(self.summary_interval))
+                if summary:
+                    self.on_event('summary', summary)
+
+    def _alarm(self, baseline, rss):
+        mb = 1024 * 1024
+        self.on_event('alarm', f"Server memory grew from {baseline / mb:.0f} MB to {rss / mb:.0f} MB "
+                               f"since it started (possible leak)")
+        if not self.snapshot_token:
+            return
+        try:
+            name = request_heap_snapshot(self.supervisor.port, self.snapshot_token)
+            self.on_event('alarm', f"Heap snapshot written to data/{name}")
+        except Exception as e:
+            self.on_event('alarm', f"Heap snapshot failed: {e}")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Environment probes for the GUI launcher (auto-start task, firewall rule,
+local IP address)
+The probes shell out to schtasks / PowerShell / ipconfig, which can take
+seconds each, so they run concurrently on a small thread pool and their
+results are cached with a TTL in server_config.json. The commands and the
+function that runs them can be replaced, e.g. with stubs on Linux.
+"""
+
+import re
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+COMMAND_TIMEOUT = 5
+DEFAULT_TTL = 600           # Seconds a cached result is used without probing again
+
+TASK_NAME = "HandoverServer"
+FIREWALL_RULE = "Handover Server"
+
+# Commands by purpose; replace entries to stub them out
+COMMANDS = {
+    'auto_start': ['schtasks', '/Query', '/TN', TASK_NAME],
+    # Empty output when the rule does not exist: one PowerShell start instead of two
+    'firewall_port': ['powershell', '-NoProfile', '-Command',
+                      f'Get-NetFirewallRule -DisplayName "{FIREWALL_RULE}" -ErrorAction SilentlyContinue '
+                      '| Get-NetFirewallPortFilter | Select-Object -ExpandProperty LocalPort'],
+    'ipconfig': ['ipconfig'],
+}
+
+
+def run_command(command):
+    """Runs command, returns (exit code, stdout)"""
+    result = subprocess.run(command, capture_output=True, text=True, timeout=COMMAND_TIMEOUT)
+    return result.returncode, result.stdout
+
+
+def probe_auto_start(run=run_command, commands=COMMANDS):
+    """True if the auto-start scheduled task exists"""
+    returncode, _ = run(commands['auto_start'])
+    return returncode == 0
+
+
+def probe_firewall_port(run=run_command, commands=COMMANDS):
+    """Port of the firewall rule, or None if there is no rule"""
+    returncode, output = run(commands['firewall_port'])
+    if returncode != 0:
+        return None
+    for line in output.splitlines():
+        try:
+            return int(line.strip())
+        except ValueError:
+            continue
+    return None
+
+
+def probe_local_ip(run=run_command, commands=COMMANDS):
+    """LAN address of this computer, or None"""
+    # Method 1: the address of the route to the internet (nothing is sent)
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(('8.8.8.8', 80))
+        ip = s.getsockname()[0]
+        if ip and ip != '127.0.0.1':
+            return ip
+    except OSError:
+        pass
+    finally:
+        s.close()
+
+    # Method 2: first IPv4 address in ipconfig's output
+    returncode, output = run(commands['ipconfig'])
+    if returncode == 0:
+        for line in output.splitlines():
+            if 'IPv4' in line:
+                match = re.search(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})', line)
+                if match:
+                    ip = match.group(1)
+                    if ip != '127.0.0.1' and not ip.startswith('169.254'):
+                        return ip
+    return None
+
+
+PROBES = {
+    'auto_start': probe_auto_start,
+    'firewall_port': probe_firewall_port,
+    'local_ip': probe_local_ip,
+}
+
+
+class ProbeRunner:
+    """
+    Runs the probes concurrently and caches their results.
+
+    refresh() returns at once; on_result(name, value, error) is called from
+    a pool thread for each probe as it finishes (error is None or the
+    exception, value then None). cache is {name: {'value', 'checked_at'}}
+    (epoch seconds), loaded from and saved to server_config.json by the caller.
+    """
+
+    def __init__(self, on_result, cache=None, ttl=DEFAULT_TTL, probes=None, run=run_command, commands=None):
+        self.on_result = on_result
+        self.cache = dict(cache or {})
+        self.ttl = ttl
+        self.probes = probes or PROBES
+        self.run = run
+        self.commands = commands or COMMANDS
+        self._pool = ThreadPoolExecutor(max_workers=len(self.probes), thread_name_prefix='probe')
+        self._lock = threading.Lock()
+        self._running = set()
+
+    def cached(self, name):
+        """Cached value of a probe (stale or not), or None"""
+        entry = self.cache.get(name)
+        return entry['value'] if entry else None
+
+    def is_fresh(self, name):
+        entry = self.cache.get(name)
+        return bool(entry) and time.time() - entry.get('checked_at', 0) < self.ttl
+
+    def refresh(self, names=None, force=False):
+        """Probes names (default: all) that are stale, or all of them with force; returns the names started"""
+        started = []
+        for name in names or list(self.probes):
+            with self._lock:
+                if name in self._running or (not force and self.is_fresh(name)):
+                    continue
+                self._running.add(name)
+            self._pool.submit(self._probe, name)
+            started.append(name)
+        return started
+
+    def _probe(self, name):
+        try:
+            value, error = self.probes[name](self.run, self.commands), None
+        except Exception as e:
+            value, error = None, e
+        with self._lock:
+            self._running.discard(name)
+            if error is None:
+                self.cache[name] = {'value': value, 'checked_at': time.time()}
+        self.on_result(name, value, error)
+
+    def shutdown(self):
+        """Stops the pool without waiting for probes in flight"""
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Front proxy for multi-worker mode (server-cli.py --workers N)
+Spreads client connections across several Node.js workers on internal ports
+"""
+
+import asyncio
+import json
+import threading
+
+HEALTH_PATH = "/api/health"
+HEALTH_INTERVAL = 2.0       # Seconds between health checks of each worker
+HEALTH_TIMEOUT = 2.0
+MAX_HEADER_SIZE = 64 * 1024
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+def error_response(status, reason):
+    """Response the proxy sends itself, closing the connection"""
+    body = json.dumps({'status': 'error', 'message': reason}).encode('utf-8')
+    return (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Connection: close\r\nContent-Length: {len(body)}\r\n\r\n").encode('ascii') + body
+
+
+class Backend:
+    """One Node.js worker behind the proxy"""
+
+    def __init__(self, name, host, port):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.active = 0         # Open client connections
+        self.healthy = False    # Only healthy workers receive connections
+
+
+class LoadBalancingProxy:
+    """
+    Stdlib asyncio TCP proxy with least-connections balancing.
+
+    Request heads are rewritten to carry the real client address in
+    X-Forwarded-For (the server trusts the proxy). Connections of one client
+    may land on different workers, so per-client state has to be shared:
+    login brute-force counters and token cache invalidations are kept in
+    SQLite (server/utils/loginAttempts.js, server/utils/authCache.js).
+    """
+
+    def __init__(self, listen_host, listen_port, backends, log=print):
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.backends = backends
+        self.log = log
+        self.loop = None
+        self.server = None
+        self._thread = None
+        self._started = threading.Event()
+        self._start_error = None
+
+    def pick_backend(self):
+        """Returns the healthy worker with the fewest open connections"""
+        healthy = [b for b in self.backends if b.healthy]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda b: b.active)
+
+    async def handle_client(self, client_reader, client_writer):
+        """Pipes one client connection to the least loaded worker"""
+        backend = self.pick_backend()
+        if backend is None:
+            body = b'{"status":"error","message":"No healthy workers"}'
+            client_writer.write(b"HTTP/1.1 503 Service Unavailable\r\n"
+                                b"Content-Type: application/json\r\nConnection: close\r\n"
+                                b"Content-Length: " + str(len(body)).encode('ascii') + b"\r\n\r\n" + body)
+            await self._close(client_writer)
+            return
+
+        peer = client_writer.get_extra_info('peername')
+        client_ip = peer[0] if peer else 'unknown'
+
+        backend.active += 1
+        try:
+            backend_reader, backend_writer = await asyncio.open_connection(backend.host, backend.port)
+        except OSError:
+            backend.active -= 1
+            backend.healthy = False
+            self.log(f"[Proxy] {backend.name} refused connection, removed from rotation")
+            await self._close(client_writer)
+            return
+
+        forward = asyncio.ensure_future(self._forward_requests(client_reader, backend_writer, client_ip))
+        try:
+            try:
+                await self._copy(backend_reader, client_writer)
+            except OSError:
+                pass
+            # The worker has answered every request it was sent; an error
+            # response for a request the proxy refused comes after them
+            if forward.done() and not forward.cancelled() and forward.exception() is None \
+                    and forward.result() is not None:
+                client_writer.write(forward.result())
+                await client_writer.drain()
+            elif client_writer.can_write_eof():
+                client_writer.write_eof()
+            await asyncio.gather(forward, return_exceptions=True)
+        except asyncio.CancelledError:
+            # Proxy is shutting down
+            pass
+        except OSError:
+            pass
+        finally:
+            forward.cancel()
+            backend.active -= 1
+            await self._close(backend_writer)
+            await self._close(client_writer)
+
+    async def _forward_requests(self, reader, writer, client_ip):
+        """
+        Forwards requests, replacing X-Forwarded-For with the client address.
+        Bodies are framed (Content-Length or chunked), so the head of every
+        request on a keep-alive connection is rewritten. Returns an error
+        response for the client if a request can't be framed, else None.
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    return error_response(431, "Request Header Fields Too Large")
+
+                lines = head[:-4].split(b"\r\n")
+                headers = [lines[0]]
+                content_lengths = set()
+                transfer_encoding = None
+                for line in lines[1:]:
+                    name, _, value = line.partition(b":")
+                    key = name.strip().lower()
+                    if key == b"x-forwarded-for":
+                        continue
+                    if key == b"content-length":
+                        content_lengths.add(value.strip())
+                    elif key == b"transfer-encoding":
+                        transfer_encoding = value.strip().lower()
+                    headers.append(line)
+
+                chunked = transfer_encoding is not None
+                if chunked and (content_lengths or transfer_encoding != b"chunked"):
+                    return error_response(400, "Bad Request")
+                if len(content_lengths) > 1:
+                    return error_response(400, "Bad Request")
+                content_length = 0
+                if content_lengths:
+                    value = content_lengths.pop()
+                    if not value.isdigit():
+                        return error_response(400, "Bad Request")
+                    content_length = int(value)
+
+                headers.append(b"X-Forwarded-For: " + client_ip.encode('ascii', 'replace'))
+                writer.write(b"\r\n".join(headers) + b"\r\n\r\n")
+
+                # A body cut short or malformed ends the connection; the worker
+                # already has the head and answers the incomplete request itself
+                if chunked:
+                    if not await self._forward_chunked(reader, writer):
+                        return None
+                elif not await self._forward_exactly(reader, writer, content_length):
+                    return None
+                await writer.drain()
+        finally:
+            if writer.can_write_eof():
+                try:
+                    writer.write_eof()
+                except OSError:
+                    pass
+        return None
+
+    async def _forward_exactly(self, reader, writer, length):
+        """Forwards length bytes; False if the client closed before"""
+        remaining = length
+        while remaining > 0:
+            chunk = await reader.read(min(remaining, COPY_CHUNK_SIZE))
+            if not chunk:
+                return False
+            writer.write(chunk)
+            remaining -= len(chunk)
+            await writer.drain()
+        return True
+
+    async def _forward_chunked(self, reader, writer):
+        """Forwards one chunked body up to its last trailer; False if it is malformed or cut short"""
+        try:
+            while True:
+                size_line = await reader.readuntil(b"\r\n")
+                size = size_line.split(b";", 1)[0].strip()
+                if not size or any(c not in b"0123456789abcdefABCDEF" for c in size):
+                    return False
+                writer.write(size_line)
+                length = int(size, 16)
+                if length == 0:
+                    break
+                if not await self._forward_exactly(reader, writer, length):
+                    return False
+                if await reader.readexactly(2) != b"\r\n":
+                    return False
+                writer.write(b"\r\n")
+            # Trailers, then the empty line that ends the body
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                writer.write(line)
+                if line == b"\r\n":
+                    return True
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return False
+
+    async def _copy(self, reader, writer):
+        """Copies bytes until EOF (the caller closes writer)"""
+        while True:
+            chunk = await reader.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            writer.write(chunk)
+            await writer.drain()
+
+    async def _close(self, writer):
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    async def check_backend(self, backend):
+        """Returns True if the worker answers its health check"""
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(backend.host, backend.port), HEALTH_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        try:
+            writer.write(f"GET {HEALTH_PATH} HTTP/1.1\r\nHost: {backend.host}\r\n"
+                         f"Connection: close\r\n\r\n".encode('ascii'))
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), HEALTH_TIMEOUT)
+            status_line, _, rest = response.partition(b"\r\n")
+            if b" 200 " not in status_line + b" ":
+                return False
+            body = rest.partition(b"\r\n\r\n")[2]
+            return json.loads(body.decode('utf-8') or '{}').get('status') == 'ok'
+        except Exception:
+            return False
+        finally:
+            await self._close(writer)
+
+    async def health_loop(self):
+        """Keeps each worker's healthy flag up to date"""
+        while True:
+            results = await asyncio.gather(*(self.check_backend(b) for b in self.backends))
+            for backend, healthy in zip(self.backends, results):
+                if healthy != backend.healthy:
+                    state = "back in rotation" if healthy else "removed from rotation"
+                    self.log(f"[Proxy] {backend.name} on port {backend.port} {state}")
+                backend.healthy = healthy
+            await asyncio.sleep(HEALTH_INTERVAL)
+
+    async def _serve(self):
+        self.server = await asyncio.start_server(
+            self.handle_client, self.listen_host, self.listen_port, limit=MAX_HEADER_SIZE)
+        health_task = asyncio.ensure_future(self.health_loop())
+        self._started.set()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            health_task.cancel()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._start_error = e
+            self._started.set()
+        finally:
+            # Let cancelled connection handlers finish before closing the loop
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    def start(self):
+        """Starts the proxy on a background thread, raises if it cannot listen"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._start_error:
+            raise self._start_error
+
+    def _shutdown(self):
+        self.server.close()
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+
+    def stop(self):
+        """Stops accepting connections and shuts the event loop down"""
+        if self.loop and self.server and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._shutdown)
+        if self._thread:
+            self._thread.join(timeout=5)
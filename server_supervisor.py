@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Node.js process supervisor shared by the GUI and CLI launchers
+Detects real readiness by polling /api/health, restarts a crashed server
+and picks up the startup phase timings the server prints
+"""
+
+import json
+import subprocess
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+HEALTH_PATH = "/api/health"
+READY_TIMEOUT = 60.0        # Seconds to wait for the first successful health check
+PROBE_INITIAL_DELAY = 0.1   # First health poll delay, grows up to PROBE_MAX_DELAY
+PROBE_MAX_DELAY = 1.0
+RESTART_INITIAL_DELAY = 1.0  # Crash-restart backoff: 1s, 2s, 4s ... up to RESTART_MAX_DELAY
+RESTART_MAX_DELAY = 30.0
+STABLE_UPTIME = 60.0        # A server that stayed up this long resets the restart backoff
+STOP_TIMEOUT = 5
+STARTUP_PREFIX = "[Startup] "   # Line printed by server/utils/startupTimings.js
+STARTUP_LOG = "startup.jsonl"   # Startup history, in data/logs
+
+
+def probe_health(port, timeout=1.0):
+    """Returns True if the server on port answers the health check"""
+    url = f"http://127.0.0.1:{port}{HEALTH_PATH}"
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            if response.status != 200:
+                return False
+            data = json.loads(response.read().decode('utf-8') or '{}')
+            return data.get('status') == 'ok'
+    except Exception:
+        return False
+
+
+def parse_startup_line(line):
+    """Phase timings of a '[Startup] boot=40ms ... node=v20.20.0' line, or None"""
+    if not line.startswith(STARTUP_PREFIX):
+        return None
+    timings = {}
+    for field in line[len(STARTUP_PREFIX):].split():
+        key, _, value = field.partition('=')
+        if value.endswith('ms') and value[:-2].isdigit():
+            timings[key] = int(value[:-2])
+        else:
+            timings[key] = value
+    return timings
+
+
+def format_startup(timings):
+    """'modules 410 ms · app 12 ms · db 85 ms · listen 3 ms (spawn to listen 0.62s, compile cache off)'"""
+    phases = [f"{key} {value} ms" for key, value in timings.items() if isinstance(value, int) and key != 'total']
+    return (f"{' · '.join(phases)} (spawn to listen {timings.get('spawn_to_listen', 0):.2f}s, "
+            f"compile cache {timings.get('compile_cache', 'off')})")
+
+
+def record_startup(log_dir, source, timings):
+    """Appends one startup to the history in log_dir (errors are ignored)"""
+    record = {'time': datetime.now().isoformat(timespec='seconds'), 'source': source, **timings}
+    try:
+        Path(log_dir).mkdir(parents=True, exist_ok=True)
+        with open(Path(log_dir) / STARTUP_LOG, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+    except OSError:
+        pass
+
+
+class ServerSupervisor:
+    """
+    Runs the Node.js server as a child process and keeps it alive.
+
+    Callbacks are invoked from background threads:
+      on_output(line)          - one line of server output (without newline)
+      on_event(event, detail)  - 'ready' (seconds to ready), 'startup' (phase
+                                 timings of parse_startup_line() plus 'spawn_to_listen'
+                                 in seconds), 'crashed' (exit code), 'restarting'
+                                 (delay in seconds), 'failed' (message), 'stopped' (None)
+    A server that never became ready is reported as 'failed' and not restarted,
+    so configuration errors surface instead of looping.
+    """
+
+    def __init__(self, command, cwd, env, port, on_output=None, on_event=None,
+                 ready_timeout=READY_TIMEOUT, restart=True):
+        self.command = command
+        self.cwd = cwd
+        self.env = env
+        self.port = port
+        self.on_output = on_output or (lambda line: None)
+        self.on_event = on_event or (lambda event, detail: None)
+        self.ready_timeout = ready_timeout
+        self.restart = restart
+
+        self.process = None
+        self.spawned_at = None
+        self.is_ready = False
+        self.last_ready_seconds = None
+        self.restart_count = 0
+        self._stopping = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts the server and the supervising thread"""
+        self._stopping.clear()
+        self._spawn()
+        self._thread = threading.Thread(target=self._supervise, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the server and disables restarts"""
+        with self._lock:
+            self._stopping.set()
+            process = self.process
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=STOP_TIMEOUT)
+
+    def wait(self):
+        """Blocks until the supervisor has stopped for good"""
+        while self._thread and self._thread.is_alive():
+            self._thread.join(timeout=0.5)
+
+    def wait_ready(self, timeout=None):
+        """Blocks until the server first becomes ready, returns False on timeout"""
+        return self._ready.wait(timeout)
+
+    def is_alive(self):
+        """Checks if the supervisor is still managing a server"""
+        return bool(self._thread and self._thread.is_alive())
+
+    def _spawn(self):
+        """Starts a new Node.js child process (None if stop() was called)"""
+        with self._lock:
+            if self._stopping.is_set():
+                return None
+            self.is_ready = False
+            self.spawned_at = time.monotonic()
+            self.process = subprocess.Popen(
+                self.command,
+                cwd=self.cwd,
+                env=self.env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                universal_newlines=True
+            )
+            process = self.process
+            spawned_at = self.spawned_at
+        reader = threading.Thread(target=self._read_output, args=(process, spawned_at), daemon=True)
+        reader.start()
+        return process
+
+    def _read_output(self, process, spawned_at):
+        """Forwards the child's output line by line"""
+        try:
+            for line in iter(process.stdout.readline, ''):
+                if line:
+                    line = line.rstrip()
+                    self.on_output(line)
+                    if line.startswith(STARTUP_PREFIX):
+                        timings = parse_startup_line(line)
+                        timings['spawn_to_listen'] = round(time.monotonic() - spawned_at, 3)
+                        self.on_event('startup', timings)
+            process.stdout.close()
+        except Exception as e:
+            self.on_output(f"Error reading output: {e}")
+
+    def _wait_until_ready(self, process):
+        """Polls the health check with backoff until ready, exited or timed out"""
+        delay = PROBE_INITIAL_DELAY
+        deadline = self.spawned_at + self.ready_timeout
+        while not self._stopping.is_set():
+            if process.poll() is not None:
+                return False
+            if probe_health(self.port):
+                self.is_ready = True
+                self.last_ready_seconds = time.monotonic() - self.spawned_at
+                self._ready.set()
+                self.on_event('ready', self.last_ready_seconds)
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            self._stopping.wait(delay)
+            delay = min(delay * 1.5, PROBE_MAX_DELAY)
+        return False
+
+    def _supervise(self):
+        """Main loop: wait for readiness, watch the process, restart on crash"""
+        restart_delay = RESTART_INITIAL_DELAY
+        ever_ready = False
+        process = self.process
+
+        while True:
+            ready = self._wait_until_ready(process)
+            if not ready and not self._stopping.is_set() and process.poll() is None:
+                self.on_event('failed', f"Server did not become ready within {self.ready_timeout:.0f}s")
+                self._terminate(process)
+                break
+            ever_ready = ever_ready or ready
+
+            exit_code = process.wait()
+            if self._stopping.is_set():
+                break
+
+            self.is_ready = False
+            self.on_event('crashed', exit_code)
+            if not ever_ready:
+                self.on_event('failed', f"Server exited during startup (code {exit_code})")
+                break
+            if not self.restart:
+                break
+
+            if time.monotonic() - self.spawned_at >= STABLE_UPTIME:
+                restart_delay = RESTART_INITIAL_DELAY
+            self.on_event('restarting', restart_delay)
+            if self._stopping.wait(restart_delay):
+                break
+            restart_delay = min(restart_delay * 2, RESTART_MAX_DELAY)
+
+            try:
+                process = self._spawn()
+            except Exception as e:
+                self.on_event('failed', f"Failed to restart server: {e}")
+                break
+            if process is None:
+                break
+            self.restart_count += 1
+
+        self.is_ready = False
+        self.on_event('stopped', None)
+
+    def _terminate(self, process):
+        """Terminates a process that is still running"""
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bulk export and import of shift_logs (server-cli.py export / import)
+Rows are streamed in chunks both ways, so multi-year logs move between
+properties without being loaded into memory
+"""
+
+import csv
+import heapq
+import json
+import os
+import queue
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+from datetime import date, timedelta
+
+CHUNK_SIZE = 5000
+VALIDATE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server', 'database', 'validateImport.js')
+FORMATS = ('csv', 'jsonl')
+
+# Exported columns; ids are not kept, imported rows get new ones
+COLUMNS = [
+    'log_date', 'short_description', 'note', 'worker_name', 'color',
+    'created_at', 'updated_at', 'is_archived', 'is_deleted',
+    'reminder_date', 'original_log_date',
+]
+REQUIRED = ('log_date', 'short_description', 'note', 'worker_name')
+FLAGS = ('is_archived', 'is_deleted')
+
+BLOCK_TAGS = re.compile(r'<\s*(br|/p|/div|/li|/pre)\b[^>]*>', re.IGNORECASE)
+TAGS = re.compile(r'<[^>]*>')
+ENTITIES = re.compile(r'&(nbsp|amp|lt|gt|quot|#(\d+));')
+ENTITY_TEXT = {'nbsp': ' ', 'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"'}
+MAX_CODE_POINT = 0x10FFFF
+SPACES = re.compile(r'\s+')
+
+
+def decode_entity(match):
+    """Text of one entity; character references beyond Unicode are dropped"""
+    if match.group(2) is None:
+        return ENTITY_TEXT[match.group(1)]
+    code_point = int(match.group(2))
+    if code_point > MAX_CODE_POINT:
+        return ''
+    if 0xD800 <= code_point <= 0xDFFF:
+        # Lone surrogates can't be stored as UTF-8; node-sqlite3 writes U+FFFD
+        return '\ufffd'
+    return chr(code_point)
+
+
+def note_to_text(note):
+    """Plain text of a note for the search index (same as noteToText in server/utils/fullTextSearch.js)"""
+    if not note:
+        return ''
+    text = TAGS.sub('', BLOCK_TAGS.sub(' ', str(note)))
+    # One pass, so a decoded "&amp;" never starts another entity
+    text = ENTITIES.sub(decode_entity, text)
+    return SPACES.sub(' ', text).strip()
+
+
+def format_from_path(path, fmt=None):
+    """Explicit format, else the file extension (.csv / .jsonl)"""
+    if fmt:
+        return fmt
+    for candidate in FORMATS:
+        if str(path).lower().endswith('.' + candidate):
+            return candidate
+    raise ValueError("Cannot tell the format from the file name, use --format csv or --format jsonl")
+
+
+def parse_day(value):
+    """YYYY-MM-DD -> date (ValueError with a readable message otherwise)"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD") from None
+
+
+def build_export_query(since=None, until=None, worker=None, archived=None, include_deleted=False, cold=False):
+    """SELECT (id + COLUMNS) for the export filters; until is inclusive (whole day)"""
+    conditions = []
+    params = []
+    if cold:
+        # Cold storage file: only the rows listed in the hot database count
+        conditions.append('EXISTS (SELECT 1 FROM hot.cold_log_ids WHERE cold_log_ids.id = shift_logs.id)')
+    if not include_deleted:
+        conditions.append('is_deleted = 0')
+    if since:
+        conditions.append('log_date >= ?')
+        params.append(parse_day(since).isoformat())
+    if until:
+        conditions.append('log_date < ?')
+        params.append((parse_day(until) + timedelta(days=1)).isoformat())
+    if worker:
+        conditions.append('worker_name = ?')
+        params.append(worker.strip().upper())
+    if archived is not None:
+        conditions.append('is_archived = ?')
+        params.append(1 if archived else 0)
+
+    query = f"SELECT id, {', '.join(COLUMNS)} FROM shift_logs"
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    # Oldest first, so an import adds them in the original order
+    return query + ' ORDER BY log_date, id', params
+
+
+def cold_years(connection, since=None, until=None):
+    """Years in cold storage (server/database/coldStorage.js) within since/until"""
+    try:
+        years = [row[0] for row in connection.execute('SELECT year FROM cold_years ORDER BY year')]
+    except sqlite3.OperationalError:
+        return []  # Database from before cold storage
+    first = parse_day(since).year if since else None
+    last = parse_day(until).year if until else None
+    return [year for year in years
+            if (first is None or year >= first) and (last is None or year <= last)]
+
+
+def fetch_rows(cursor):
+    """Rows of a cursor, read CHUNK_SIZE at a time"""
+    while True:
+        rows = cursor.fetchmany(CHUNK_SIZE)
+        if not rows:
+            return
+        yield from rows
+
+
+def export_logs(db_path, out, fmt, **filters):
+    """
+    Writes matching rows to the open text file out, returns the row count.
+
+    Entries moved to cold storage are read from their year files and merged
+    in, so the output is in log date order as if they were all in shift_logs.
+    """
+    query, params = build_export_query(**filters)
+    cold_query, cold_params = build_export_query(cold=True, **filters)
+    # Read-only: safe while the server is running
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    connections = [connection]
+    count = 0
+    try:
+        sources = [fetch_rows(connection.execute(query, params))]
+        archive_dir = os.path.join(os.path.dirname(os.path.abspath(db_path)), 'archive')
+        for year in cold_years(connection, filters.get('since'), filters.get('until')):
+            cold_path = os.path.join(archive_dir, f'shift_logs_{year}.db')
+            cold = sqlite3.connect(f"file:{cold_path}?mode=ro", uri=True)
+            connections.append(cold)
+            cold.execute('ATTACH DATABASE ? AS hot', (f"file:{db_path}?mode=ro",))
+            sources.append(fetch_rows(cold.execute(cold_query, cold_params)))
+
+        if fmt == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(COLUMNS)
+        # Each source is sorted by (log_date, id) already
+        for row in heapq.merge(*sources, key=lambda row: (str(row[1]), row[0])):
+            values = row[1:]
+            if fmt == 'csv':
+                writer.writerow(['' if value is None else value for value in values])
+            else:
+                out.write(json.dumps(dict(zip(COLUMNS, values)), ensure_ascii=False) + '\n')
+            count += 1
+    finally:
+        for open_connection in connections:
+            open_connection.close()
+    return count
+
+
+def read_records(infile, fmt):
+    """Yields (line number, dict) from a CSV or JSONL export"""
+    if fmt == 'csv':
+        reader = csv.DictReader(infile)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(infile, 1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {line_number}: invalid JSON ({e.msg})") from None
+
+
+def record_values(record):
+    """Export record -> {column: value}, with empty strings as None and the flags as 0/1"""
+    if not isinstance(record, dict):
+        raise ValueError("expected an object with the exported columns")
+    values = {}
+    for column in COLUMNS:
+        value = record.get(column)
+        values[column] = None if value == '' else value
+    for column in REQUIRED:
+        if values[column] is None:
+            raise ValueError(f"'{column}' is missing")
+    for column in FLAGS:
+        flag = values[column]
+        values[column] = 1 if str(flag).lower() in ('1', 'true') else 0
+    return values
+
+
+def to_row(record, line_number):
+    """record_values(), with the line number in any error"""
+    try:
+        return record_values(record)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Line {line_number}: {e}") from None
+
+
+def check_records(records, node_exe, script=VALIDATE_SCRIPT):
+    """
+    Yields (line number, values for INSERT: COLUMNS + note_text) for each
+    (line number, record), after the checks and cleaning of POST /api/logs
+    (server/database/validateImport.js). Raises ValueError naming the line
+    of the first bad record.
+    """
+    process = subprocess.Popen([str(node_exe), str(script)], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               text=True, encoding='utf-8')
+    sent = queue.Queue()    # (line number, values) in the order they were sent, then None
+    failure = []
+
+    # A thread writes while this one reads, so neither pipe fills up
+    def feed():
+        try:
+            for line_number, record in records:
+                values = to_row(record, line_number)
+                sent.put((line_number, values))
+                process.stdin.write(json.dumps(values) + '\n')
+        except BaseException as e:
+            failure.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            sent.put(None)
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        while True:
+            item = sent.get()
+            if item is None:
+                break
+            line_number, values = item
+            answer = process.stdout.readline()
+            if not answer:
+                raise RuntimeError("Record validation stopped unexpectedly (see the error above)")
+            answer = json.loads(answer)
+            if 'errors' in answer:
+                problems = '; '.join(f"{field}: {message}" for field, message in answer['errors'].items())
+                raise ValueError(f"Line {line_number}: {problems}")
+            values.update(answer['row'])
+            yield line_number, [values[column] for column in COLUMNS] + [note_to_text(values['note'])]
+        if failure and not isinstance(failure[0], OSError):
+            raise failure[0]
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+        feeder.join()
+
+
+def import_logs(db_path, infile, fmt, node_exe, batch_size=CHUNK_SIZE, progress=None):
+    """
+    Adds the rows of an export to the database in one transaction, returns the row count.
+
+    Each record is checked and cleaned as the API does it (see check_records),
+    which needs Node.js (node_exe).
+
+    The shift_logs triggers (search index, change feed) and indexes are
+    dropped for the import and recreated afterwards from their saved SQL;
+    the search index is then rebuilt once instead of once per row.
+    All or nothing: on any error the database is left unchanged.
+    """
+    connection = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    count = 0
+    try:
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'shift_logs' not in tables or 'shift_logs_fts' not in tables:
+            raise RuntimeError("Database is not initialized; start the server once first")
+
+        # Older exports may lack the timestamps; they then get the column default
+        placeholders = ['COALESCE(?, CURRENT_TIMESTAMP)' if column in ('created_at', 'updated_at') else '?'
+                        for column in COLUMNS]
+        insert = (f"INSERT INTO shift_logs ({', '.join(COLUMNS)}, note_text) "
+                  f"VALUES ({', '.join(placeholders)}, ?)")
+
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            saved = connection.execute(
+                "SELECT type, name, sql FROM sqlite_master "
+                "WHERE tbl_name = 'shift_logs' AND type IN ('trigger', 'index') AND sql IS NOT NULL"
+            ).fetchall()
+            for kind, name, _ in saved:
+                connection.execute(f'DROP {kind.upper()} "{name}"')
+
+            batch = []
+            for _, row in check_records(read_records(infile, fmt), node_exe):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    connection.executemany(insert, batch)
+                    count += len(batch)
+                    batch = []
+                    if progress:
+                        progress(count)
+            if batch:
+                connection.executemany(insert, batch)
+                count += len(batch)
+
+            for _, _, sql in saved:
+                connection.execute(sql)
+            connection.execute("INSERT INTO shift_logs_fts(shift_logs_fts) VALUES ('rebuild')")
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('PRAGMA optimize')
+    finally:
+        connection.close()
+    return count
+
+
+def open_output(path):
+    """File for writing, or stdout for '-'"""
+    if path == '-':
+        return sys.stdout
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def open_input(path):
+    """File for reading, or stdin for '-'"""
+    if path == '-':
+        return sys.stdin
+    return open(path, 'r', encoding='utf-8', newline='')